@@ -84,7 +84,7 @@ class ClientUser():
         self.photo = self.settings[self.client_id].get("photo")
         self.user_type = self.settings[self.client_id].get("user_type", "client")
 
-    def save_user(self):
+    def save_user(self, now=False):
         self.settings[self.client_id]["name"] = self.name
         self.settings[self.client_id]["nicknames"] = self.nicknames
         self.settings[self.client_id]["public_key"] = self.public_key
@@ -98,7 +98,10 @@ class ClientUser():
         self.settings[self.client_id]["photo"] = self.photo
         self.settings[self.client_id]["user_type"] = self.user_type
         self.settings[self.client_id]["forbidden_messages"] = self.forbidden_messages
-        self.settings.store()
+        if now:
+            self.settings.store()
+        else:
+            self.settings.store_later()
 
     def add_new_ip(self, ip, emit=True):
         if ip not in self.known_ips:
@@ -444,9 +447,9 @@ class ClientManagerSkill(MycroftSkill):
     def stop(self):
         # save all users
         for user in self.facebook_users:
-            self.facebook_users[user].save_user()
+            self.facebook_users[user].save_user(now=True)
         for user in self.users:
-            self.users[user].save_user()
+            self.users[user].save_user(now=True)
 
 
 def create_skill():
@@ -23,6 +23,7 @@ from mycroft.dialog import DialogLoader
 from mycroft.api import Api
 from mycroft.messagebus.message import Message
 from mycroft.skills.core import MycroftSkill, intent_handler
+from mycroft.skills.result_cache import cached
 from mycroft.util.log import getLogger
 from mycroft.util.parse import extract_datetime
 from mycroft.util.format import nice_number
@@ -124,6 +125,19 @@ class WeatherSkill(MycroftSkill):
         else:
             self.owm = OWMApi()
 
+    # Every report asks for the same data, keep it for a while
+    @cached(ttl=600)
+    def weather_at_place(self, location):
+        return self.owm.weather_at_place(location)
+
+    @cached(ttl=600)
+    def three_hours_forecast(self, location):
+        return self.owm.three_hours_forecast(location)
+
+    @cached(ttl=1800)
+    def daily_forecast(self, location):
+        return self.owm.daily_forecast(location)
+
     # Handle: what is the weather like?
     @intent_handler(IntentBuilder("CurrentWeatherIntent").require(
         "Weather").optionally("Location").build())
@@ -144,7 +158,7 @@ class WeatherSkill(MycroftSkill):
             report = self.__initialize_report(message)
 
             # Get current conditions
-            currentWeather = self.owm.weather_at_place(
+            currentWeather = self.weather_at_place(
                 report['full_location']).get_weather()
             report['condition'] = currentWeather.get_detailed_status()
             report['temp'] = self.__get_temperature(currentWeather, 'temp')
@@ -218,7 +232,7 @@ class WeatherSkill(MycroftSkill):
         LOG.info(str(when))
 
         # search the forecast for precipitation
-        for weather in self.owm.daily_forecast(
+        for weather in self.daily_forecast(
                 report["full_location"]).get_forecast().get_weathers():
 
             forecastDate = datetime.fromtimestamp(weather.get_reference_time())
@@ -270,7 +284,7 @@ class WeatherSkill(MycroftSkill):
             report = self.__initialize_report(message)
 
             # Get near-future forecast
-            forecastWeather = self.owm.three_hours_forecast(
+            forecastWeather = self.three_hours_forecast(
                 report["full_location"]).get_forecast().get_weathers()[0]
 
             LOG.info("forecast: " + str(forecastWeather.to_JSON()))
@@ -300,7 +314,7 @@ class WeatherSkill(MycroftSkill):
 
         when = extract_datetime(message.data.get('utterance'))[0]
         if when == extract_datetime(" ")[0]:
-            weather = self.owm.weather_at_place(
+            weather = self.weather_at_place(
                 report['full_location']).get_weather()
         else:
             # Get forecast for that day
@@ -320,7 +334,7 @@ class WeatherSkill(MycroftSkill):
 
         when = extract_datetime(message.data.get('utterance'))[0]
         if when == extract_datetime(" ")[0]:
-            weather = self.owm.weather_at_place(
+            weather = self.weather_at_place(
                 report['full_location']).get_weather()
         else:
             # Get forecast for that day
@@ -383,7 +397,7 @@ class WeatherSkill(MycroftSkill):
 
         when = extract_datetime(message.data.get('utterance'))[0]
         if when == extract_datetime(" ")[0]:
-            weather = self.owm.weather_at_place(
+            weather = self.weather_at_place(
                 report['full_location']).get_weather()
         else:
             # Get forecast for that day
@@ -411,7 +425,7 @@ class WeatherSkill(MycroftSkill):
 
         when = extract_datetime(message.data.get('utterance'))[0]
         if when == extract_datetime(" ")[0]:
-            weather = self.owm.weather_at_place(
+            weather = self.weather_at_place(
                 report['full_location']).get_weather()
         else:
             # Get forecast for that day
@@ -499,7 +513,7 @@ class WeatherSkill(MycroftSkill):
         whenGMT = self.__to_GMT(when)
 
         # search for the requested date in the returned forecast data
-        forecasts = self.owm.daily_forecast(location).get_forecast()
+        forecasts = self.daily_forecast(location).get_forecast()
         for weather in forecasts.get_weathers():
             forecastDate = datetime.fromtimestamp(weather.get_reference_time())
             if forecastDate.date() == whenGMT.date():
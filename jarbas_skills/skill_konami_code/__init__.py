@@ -76,7 +76,8 @@ class KonamiCodeSkill(MycroftSkill):
         layers = [["KonamiUpIntent"], ["KonamiUpIntent"], ["KonamiDownIntent"], ["KonamiDownIntent"],
                     ["KonamiLeftIntent"], ["KonamiRightIntent"], ["KonamiLeftIntent"], ["KonamiRightIntent"],
                     ["KonamiBIntent"], ["KonamiAIntent"]]
-        self.layers = IntentLayers(self.emitter, layers, 60)
+        self.layers = IntentLayers(self.emitter, layers, 60,
+                                   skill_id=self.skill_id)
 
     def handle_up_intent(self, message):
         self.active = True
@@ -24,6 +24,7 @@ from adapt.intent import IntentBuilder
 from os.path import join, dirname
 
 from mycroft.skills.core import MycroftSkill
+from mycroft.skills.result_cache import cached
 from mycroft.util import read_stripped_lines
 from mycroft.util.log import getLogger
 
@@ -54,10 +55,10 @@ class WikipediaSkill(MycroftSkill):
         try:
             title = message.data.get("ArticleTitle")
             self.__feedback_search(title)
-            results = wiki.search(title, self.max_results)
+            results = self.search(title)
             summary = re.sub(
                 r'\([^)]*\)|/[^/]*/', '',
-                wiki.summary(results[0], self.max_phrases))
+                self.summary(results[0]))
             self.speak(summary)
 
         except wiki.exceptions.DisambiguationError as e:
@@ -68,6 +69,14 @@ class WikipediaSkill(MycroftSkill):
         except Exception as e:
             LOGGER.error("Error: {0}".format(e))
 
+    @cached(ttl=3600)
+    def search(self, title):
+        return wiki.search(title, self.max_results)
+
+    @cached(ttl=3600)
+    def summary(self, title):
+        return wiki.summary(title, self.max_phrases)
+
     def __feedback_search(self, title):
         prefix = self.feedback_prefix[randrange(len(self.feedback_prefix))]
         feedback = self.feedback_search[randrange(len(self.feedback_search))]
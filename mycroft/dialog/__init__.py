@@ -19,6 +19,7 @@
 import pystache
 import os
 import random
+from threading import Lock
 from mycroft.util import log, resolve_resource_file
 
 __author__ = 'seanfitz'
@@ -35,6 +36,8 @@ class MustacheDialogRenderer(object):
     """
     def __init__(self):
         self.templates = {}
+        self.parsed = {}  # template text: template parsed by pystache
+        self.renderer = pystache.Renderer()
 
     def load_template_file(self, template_name, filename):
         """
@@ -52,6 +55,16 @@ class MustacheDialogRenderer(object):
 
                 self.templates[template_name].append(template_text)
 
+    def add_templates(self, template_name, templates):
+        """
+        Add templates already read from a template file to the cache.
+
+        Args:
+            template_name (str): a unique identifier for a group of templates
+            templates (list): mustache templates
+        """
+        self.templates.setdefault(template_name, []).extend(templates)
+
     def render(self, template_name, context={}, index=None):
         """
         Given a template name, pick a template and render it using the context
@@ -76,7 +89,15 @@ class MustacheDialogRenderer(object):
             index = random.randrange(len(template_functions))
         else:
             index %= len(template_functions)
-        return pystache.render(template_functions[index], context)
+        template = template_functions[index]
+        parsed = self.parsed.get(template)
+        if parsed is None:
+            text = template
+            if isinstance(text, str):
+                text = text.decode(self.renderer.string_encoding)
+            parsed = pystache.parse(text)
+            self.parsed[template] = parsed
+        return self.renderer.render(parsed, context)
 
 
 class DialogLoader(object):
@@ -109,6 +130,75 @@ class DialogLoader(object):
 
         return self.__renderer
 
+    def load_templates(self, templates):
+        """
+        Load dialog templates already read from a dialog directory.
+
+        Args:
+            templates (dict): templates of each dialog entry name
+
+        Returns:
+            a loaded instance of a dialog renderer
+        """
+        for dialog_entry_name in sorted(templates):
+            self.__renderer.add_templates(dialog_entry_name,
+                                          templates[dialog_entry_name])
+        return self.__renderer
+
+
+def file_mtime(path):
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+
+class DialogCache(object):
+    """
+    Renderers of the dialog resource files, reloaded when a file changes.
+
+    A resolved path is checked with a single stat, the resource is resolved
+    again when that file is gone.
+    """
+    def __init__(self):
+        self.paths = {}  # resource name: resolved file name
+        self.renderers = {}  # file name: (mtime, renderer)
+        self.lock = Lock()
+
+    def get_renderer(self, res_name):
+        """
+        Args:
+            res_name (str): resource name of a dialog file
+
+        Returns:
+            MustacheDialogRenderer: renderer of the file, None if not found
+        """
+        with self.lock:
+            filename = self.paths.get(res_name)
+            mtime = file_mtime(filename) if filename else None
+            if mtime is None:
+                filename = resolve_resource_file(res_name)
+                if not filename:
+                    self.paths.pop(res_name, None)
+                    return None
+                self.paths[res_name] = filename
+                mtime = file_mtime(filename)
+            cached = self.renderers.get(filename)
+            if cached is None or cached[0] != mtime:
+                renderer = MustacheDialogRenderer()
+                renderer.load_template_file("template", filename)
+                cached = (mtime, renderer)
+                self.renderers[filename] = cached
+            return cached[1]
+
+    def clear(self):
+        with self.lock:
+            self.paths = {}
+            self.renderers = {}
+
+
+dialog_cache = DialogCache()
+
 
 def get(phrase, lang=None, context=None):
     """
@@ -130,13 +220,11 @@ def get(phrase, lang=None, context=None):
         lang = ConfigurationManager.instance().get("lang")
 
     filename = "text/"+lang.lower()+"/"+phrase+".dialog"
-    template = resolve_resource_file(filename)
-    if not template:
+    stache = dialog_cache.get_renderer(filename)
+    if not stache:
         logger.debug("Resource file not found: " + filename)
         return phrase
 
-    stache = MustacheDialogRenderer()
-    stache.load_template_file("template", template)
     if not context:
         context = {}
     return stache.render("template", context)
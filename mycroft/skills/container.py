@@ -24,6 +24,7 @@ from mycroft.configuration import ConfigurationManager
 from mycroft.messagebus.client.ws import WebsocketClient
 from mycroft.skills.core import create_skill_descriptor, load_skill
 from mycroft.skills.intent_service import IntentService
+from mycroft.skills.skill_control import skill_control
 from mycroft.util.log import getLogger
 
 __author__ = 'seanfitz'
@@ -80,6 +81,7 @@ class SkillContainer(object):
         if self.enable_intent:
             IntentService(self.ws)
 
+        skill_control.bind(self.ws)
         skill_descriptor = create_skill_descriptor(self.dir)
         # skill_id set to -1 to not interfere with the normal skills
         self.skill = load_skill(skill_descriptor, self.ws, -1)
@@ -18,23 +18,32 @@ import abc
 import imp
 import time
 
-import operator
 import os.path
 import re
 import time
-from os.path import join, dirname, splitext, isdir
+from datetime import datetime
+from os.path import join, dirname, splitext, isdir, expanduser
 
 from functools import wraps
+from threading import Lock
 
 from adapt.intent import Intent, IntentBuilder
 
 from mycroft.client.enclosure.api import EnclosureAPI
 from mycroft.configuration import ConfigurationManager
 from mycroft.dialog import DialogLoader
+from mycroft.skills.executor import SkillExecutor
+from mycroft.skills.fallback_chain import SpeculativeFallbackChain, \
+    HoldingEmitter
 from mycroft.filesystem import FileSystemAccess
 from mycroft.messagebus.message import Message
 from mycroft.util.log import getLogger
+from mycroft.skills.resource_bundle import ResourceCache, \
+    read_vocab_file, read_regex_file
+from mycroft.skills.result_cache import ResultCache
 from mycroft.skills.settings import SkillSettings
+from mycroft.skills.skill_control import skill_control
+from mycroft.skills.startup_profiler import StartupProfiler, ProfilingEmitter
 from mycroft import MYCROFT_ROOT_PATH
 
 __author__ = 'seanfitz'
@@ -49,13 +58,60 @@ else:
 
 BLACKLISTED_SKILLS = skills_config.get("blacklisted_skills", {})
 
+if skills_config.get("resource_cache_enabled", True):
+    resource_cache = ResourceCache(expanduser(skills_config.get(
+        "resource_cache", "~/.jarbas/resource_cache")))
+else:
+    resource_cache = None
+
+profile_config = skills_config.get("startup_profile", {})
+if profile_config.get("enabled", False):
+    startup_profiler = StartupProfiler(profile_config.get(
+        "path", "~/.jarbas/startup_profile.json"))
+else:
+    startup_profiler = None
+
 
 MainModule = '__init__'
 
 logger = getLogger(__name__)
 
+# skill modules are imported one at a time, lazy skills activate on the
+# messagebus thread while the watch loop reloads, and decorated intent
+# handlers are collected in module level lists while importing
+_import_lock = Lock()
+
+
+def register_vocab(vocab, emitter, skill_data=None):
+    """
+        Send vocabulary entries on the message bus for the intent handler.
+
+        Args:
+            vocab:      [start, end, alias_of] entries, see read_vocab_file
+            emitter:    emitter to access the message bus
+            skill_data: optional, data identifying the registering skill
+    """
+    skill_data = skill_data or {}
+    for start, end, alias_of in vocab:
+        data = {'start': start, 'end': end}
+        if alias_of is not None:
+            data['alias_of'] = alias_of
+        data.update(skill_data)
+        emitter.emit(Message("register_vocab", data))
+
+
+def register_regex(regexes, emitter, skill_data=None):
+    """
+        Send regex strings on the message bus for the intent handler.
+    """
+    skill_data = skill_data or {}
+    for regex_str in regexes:
+        data = {'regex': regex_str}
+        data.update(skill_data)
+        emitter.emit(Message("register_vocab", data))
+
 
-def load_vocab_from_file(path, vocab_type, emitter):
+def load_vocab_from_file(path, vocab_type, emitter, skill_data=None):
     """
         Load mycroft vocabulary from file. and send it on the message bus for
         the intent handler.
@@ -64,23 +120,14 @@ def load_vocab_from_file(path, vocab_type, emitter):
             path:       path to vocabulary file (*.voc)
             vocab_type: keyword name
             emitter:    emitter to access the message bus
+            skill_data: optional, data identifying the registering skill
     """
     if path.endswith('.voc'):
-        with open(path, 'r') as voc_file:
-            for line in voc_file.readlines():
-                parts = line.strip().split("|")
-                entity = parts[0]
-
-                emitter.emit(Message("register_vocab", {
-                    'start': entity, 'end': vocab_type
-                }))
-                for alias in parts[1:]:
-                    emitter.emit(Message("register_vocab", {
-                        'start': alias, 'end': vocab_type, 'alias_of': entity
-                    }))
+        register_vocab(read_vocab_file(path, vocab_type), emitter,
+                       skill_data)
 
 
-def load_regex_from_file(path, emitter):
+def load_regex_from_file(path, emitter, skill_data=None):
     """
         Load regex from file and send it on the message bus for
         the intent handler.
@@ -88,27 +135,25 @@ def load_regex_from_file(path, emitter):
         Args:
             path:       path to vocabulary file (*.voc)
             emitter:    emitter to access the message bus
+            skill_data: optional, data identifying the registering skill
     """
     if path.endswith('.rx'):
-        with open(path, 'r') as reg_file:
-            for line in reg_file.readlines():
-                re.compile(line.strip())
-                emitter.emit(
-                    Message("register_vocab", {'regex': line.strip()}))
+        register_regex(read_regex_file(path), emitter, skill_data)
 
 
-def load_vocabulary(basedir, emitter):
+def load_vocabulary(basedir, emitter, skill_data=None):
     for vocab_type in os.listdir(basedir):
         if vocab_type.endswith(".voc"):
             load_vocab_from_file(
-                join(basedir, vocab_type), splitext(vocab_type)[0], emitter)
+                join(basedir, vocab_type), splitext(vocab_type)[0], emitter,
+                skill_data)
 
 
-def load_regex(basedir, emitter):
+def load_regex(basedir, emitter, skill_data=None):
     for regex_type in os.listdir(basedir):
         if regex_type.endswith(".rx"):
             load_regex_from_file(
-                join(basedir, regex_type), emitter)
+                join(basedir, regex_type), emitter, skill_data)
 
 
 def open_intent_envelope(message):
@@ -136,34 +181,65 @@ def load_skill(skill_descriptor, emitter, skill_id):
         if skill_descriptor['name'] in BLACKLISTED_SKILLS:
             logger.info("SKILL IS BLACKLISTED " + skill_descriptor["name"])
             return None
-        skill_module = imp.load_module(
-            skill_descriptor["name"] + MainModule, *skill_descriptor["info"])
-        if (hasattr(skill_module, 'create_skill') and
-                callable(skill_module.create_skill)):
-            # v2 skills framework
-            skill = skill_module.create_skill()
-            if not skill.is_current_language_supported():
-                logger.info("SKILL DOES NOT SUPPORT CURRENT LANGUAGE")
-                return None
-            skill.bind(emitter)
-            skill._dir = dirname(skill_descriptor['info'][1])
-            skill.skill_id = skill_id
-            skill.load_data_files(dirname(skill_descriptor['info'][1]))
-            # Set up intent handlers
-            skill.initialize()
-            logger.info("Loaded " + skill_descriptor["name"] + " with ID " + str(skill_id))
-            skill._register_decorated()
-            return skill
-        else:
-            logger.warn(
-                "Module %s does not appear to be skill" % (
-                    skill_descriptor["name"]))
+        profile = startup_profiler and startup_profiler.start(
+            skill_descriptor["name"], skill_id)
+        if profile:
+            emitter = ProfilingEmitter(emitter, profile)
+        skill = None
+        try:
+            skill = _load_skill_module(skill_descriptor, emitter, skill_id,
+                                       profile)
+        finally:
+            if profile:
+                emitter.profile = None
+                profile.finish(skill is not None)
+        return skill
     except:
         logger.error(
             "Failed to load skill: " + skill_descriptor["name"], exc_info=True)
     return None
 
 
+def _load_skill_module(skill_descriptor, emitter, skill_id, profile=None):
+    with _import_lock:
+        # waiting for the lock is not import time
+        start = time.time()
+        skill_module = imp.load_module(
+            skill_descriptor["name"] + MainModule,
+            *skill_descriptor["info"])
+        decorated = _pop_decorated()
+    if profile:
+        profile.add("import", time.time() - start)
+    if (hasattr(skill_module, 'create_skill') and
+            callable(skill_module.create_skill)):
+        # v2 skills framework
+        skill = skill_module.create_skill()
+        if not skill.is_current_language_supported():
+            logger.info("SKILL DOES NOT SUPPORT CURRENT LANGUAGE")
+            return None
+        skill.bind(emitter)
+        skill._dir = dirname(skill_descriptor['info'][1])
+        skill.skill_id = skill_id
+        start = time.time()
+        skill.load_data_files(dirname(skill_descriptor['info'][1]))
+        if profile:
+            profile.add("load_data", time.time() - start)
+            start = time.time()
+        # Set up intent handlers
+        skill.initialize()
+        logger.info("Loaded " + skill_descriptor["name"] + " with ID " +
+                    str(skill_id))
+        skill._register_decorated(decorated)
+        if profile:
+            profile.add("initialize", time.time() - start)
+        return skill
+    else:
+        logger.warn(
+            "Module %s does not appear to be skill" % (
+                skill_descriptor["name"]))
+    return None
+
+
 def get_skills(skills_folder):
     logger.info("LOADING SKILLS FROM " + skills_folder)
     skills = []
@@ -210,6 +286,15 @@ _intent_list = []
 _intent_file_list = []
 
 
+def _pop_decorated():
+    """ Return and reset the intent handlers decorated since last call """
+    global _intent_list, _intent_file_list
+    decorated = (_intent_list, _intent_file_list)
+    _intent_list = []
+    _intent_file_list = []
+    return decorated
+
+
 def intent_handler(intent_parser):
     """ Decorator for adding a method as an intent handler. """
 
@@ -254,9 +339,12 @@ class MycroftSkill(object):
         self.reload_skill = True
         self.external_reload = True
         self.external_shutdown = True
+        # False when reloading, only the changed registrations are updated
+        self.detach_on_shutdown = True
         self.events = []
         self.skill_id = 0
         self.message_context = self.get_message_context()
+        self.executor = self.create_executor()
 
     def is_current_language_supported(self):
         # for backward compatibility, by default,
@@ -291,6 +379,21 @@ class MycroftSkill(object):
     def lang(self):
         return self.config_core.get('lang')
 
+    @property
+    def cache(self):
+        """ Result cache of the skill, created when first used """
+        try:
+            return self._cache
+        except AttributeError:
+            config = self.config_core.get("skills").get("cache", {})
+            path = None
+            if config.get("persist", False):
+                path = join(self.file_system.path, "cache.pickle")
+            self._cache = ResultCache(self.name,
+                                      config.get("max_size", 128),
+                                      config.get("ttl", 300), path)
+            return self._cache
+
     @property
     def settings(self):
         """ Load settings if not already loaded. """
@@ -309,8 +412,16 @@ class MycroftSkill(object):
             self.emitter = emitter
             self.enclosure = EnclosureAPI(emitter, self.name)
             self.__register_stop()
-            self.emitter.on('enable_intent', self.handle_enable_intent)
-            self.emitter.on('disable_intent', self.handle_disable_intent)
+            if skill_control.emitter is None:
+                # no dispatcher in this process, listen to every message
+                self.emitter.on('enable_intent', self.handle_enable_intent)
+                self.emitter.on('disable_intent',
+                                self.handle_disable_intent)
+                self.control_events = True
+            self.emitter.on('skill.executor.stats.request',
+                            self.handle_executor_stats)
+            self.emitter.on('skill.cache.stats.request',
+                            self.handle_cache_stats)
 
     def __register_stop(self):
         self.stop_time = time.time()
@@ -354,23 +465,62 @@ class MycroftSkill(object):
             used in last 5 minutes
         """
         self.emitter.emit(Message('active_skill_request',
-                                  {"skill_id": self.skill_id}))
+                                  {"skill_id": self.skill_id},
+                                  self.message_context))
 
-    def _register_decorated(self):
+    def _register_decorated(self, decorated=None):
         """
         Register all intent handlers that has been decorated with an intent.
+
+        Args:
+            decorated: (intent list, intent file list) collected when the
+                       skill module was imported, defaults to the handlers
+                       decorated since the last registration
         """
-        global _intent_list, _intent_file_list
-        for intent_parser, handler in _intent_list:
+        intent_list, intent_file_list = decorated or _pop_decorated()
+        for intent_parser, handler in intent_list:
             self.register_intent(intent_parser, handler, need_self=True)
-        for intent_file, handler in _intent_file_list:
+        for intent_file, handler in intent_file_list:
             self.register_intent_file(intent_file, handler, need_self=True)
-        _intent_list = []
-        _intent_file_list = []
+
+    def create_executor(self):
+        """ Executor running the intent handlers of this skill """
+        config = self.config_core.get("skills").get("executor", {})
+        overrides = config.get("skills", {}).get(self.name, {})
+        return SkillExecutor(
+            self.name, overrides.get("max_workers",
+                                     config.get("max_workers", 1)),
+            overrides.get("timeout", config.get("timeout", 30)),
+            self.handle_execution_timeout)
+
+    def handle_execution_timeout(self, name, timeout):
+        self.emitter.emit(Message("intent.execution.error",
+                                  {"status": "timeout", "intent": name,
+                                   "timeout": timeout}))
+
+    def handle_executor_stats(self, message):
+        skill_id = message.data.get("skill_id")
+        if skill_id is not None and str(skill_id) != str(self.skill_id):
+            return
+        self.emitter.emit(message.reply("skill.executor.stats.response", {
+            "skill_id": self.skill_id, "name": self.name,
+            "intents": self.executor.get_stats()}))
+
+    def handle_cache_stats(self, message):
+        skill_id = message.data.get("skill_id")
+        if skill_id is not None and str(skill_id) != str(self.skill_id):
+            return
+        if not hasattr(self, "_cache") and skill_id is None:
+            # skills not using the cache do not answer broadcasts
+            return
+        self.emitter.emit(message.reply("skill.cache.stats.response", {
+            "skill_id": self.skill_id, "name": self.name,
+            "cache": self.cache.get_stats()}))
 
     def add_event(self, name, handler, need_self=False):
         """
-                  Create event handler for executing intent
+                  Create event handler for executing intent, the handler runs
+                  on the executor of the skill
 
                   Args:
                       name:       IntentParser name
@@ -379,10 +529,13 @@ class MycroftSkill(object):
                                      intent handler the function will need the self
                                      variable passed as well.
               """
-        def wrapper(message):
+        def execute(message, queue_time):
+            self.handle_update_message_context(message)
+            start = time.time()
             try:
                 self.emitter.emit(Message("intent.execution.start",
-                                          {"status": "start", "intent": name}))
+                                          {"status": "start", "intent": name,
+                                           "queue_time": queue_time}))
                 if need_self:
                     # When registring from decorator self is required
                     handler(self, message)
@@ -396,17 +549,72 @@ class MycroftSkill(object):
                 logger.error(
                     "An error occurred while processing a request in " +
                     self.name, exc_info=True)
-                self.emitter.emit(Message("intent.execution.error",
-                                          {"status": "failed", "intent": name, "exception": str(e)}))
+                self.emitter.emit(Message(
+                    "intent.execution.error",
+                    {"status": "failed", "intent": name, "exception": str(e),
+                     "queue_time": queue_time,
+                     "execution_time": time.time() - start}))
                 return
             self.emitter.emit(Message("intent.execution.end",
-                                      {"status": "executed", "intent": name}))
+                                      {"status": "executed", "intent": name,
+                                       "queue_time": queue_time,
+                                       "execution_time": time.time() - start}))
+
+        def wrapper(message):
+            self.executor.submit(name, execute, message)
 
         if handler:
-            self.emitter.on(name, self.handle_update_message_context)
             self.emitter.on(name, wrapper)
             self.events.append((name, wrapper))
 
+    def _scheduled_event_name(self, name):
+        # skill ids change between runs, saved events use the skill name
+        return self.name + ':' + name
+
+    def add_scheduled_handler(self, name, handler):
+        """
+            Handle the scheduled event name, including events scheduled
+            before a restart. schedule_event() calls it.
+
+            Args:
+                name (str): event name given to schedule_event()
+                handler: method called with the message of the event
+        """
+        event = self._scheduled_event_name(name)
+        for e, f in [e for e in self.events if e[0] == event]:
+            self.emitter.remove(e, f)
+            self.events.remove((e, f))
+        self.add_event(event, handler)
+
+    def schedule_event(self, handler, when, repeat=None, name=None,
+                       data=None):
+        """
+            Schedule handler on the event scheduler of the skills process,
+            replacing the event of the same name. Events are saved and
+            survive restarts.
+
+            Args:
+                handler: method called with the message of the event
+                when (datetime|float): datetime, or seconds from now
+                repeat (float): seconds between repetitions
+                name (str): event name, defaults to the handler name
+                data (dict): data of the event message
+        """
+        name = name or handler.__name__
+        if isinstance(when, datetime):
+            when = time.mktime(when.timetuple())
+        else:
+            when = time.time() + when
+        self.add_scheduled_handler(name, handler)
+        self.emitter.emit(Message("mycroft.scheduler.schedule_event", {
+            "event": self._scheduled_event_name(name), "time": when,
+            "repeat": repeat, "data": data or {}}))
+
+    def cancel_scheduled_event(self, name):
+        """ Remove the scheduled event name """
+        self.emitter.emit(Message("mycroft.scheduler.remove_event", {
+            "event": self._scheduled_event_name(name)}))
+
     def register_intent(self, intent_parser, handler, need_self=False):
         """
                     Register an Intent with the intent service.
@@ -426,8 +634,11 @@ class MycroftSkill(object):
 
         name = intent_parser.name
         intent_parser.name = str(self.skill_id) + ':' + intent_parser.name
-        self.emitter.emit(Message("register_intent", intent_parser.__dict__))
+        data = dict(intent_parser.__dict__)
+        data.update(self.skill_data)
+        self.emitter.emit(Message("register_intent", data))
         self.registered_intents.append((name, intent_parser))
+        skill_control.add_intent(self, name)
         self.add_event(intent_parser.name, handler)
 
     def register_intent_file(self, intent_file, handler):
@@ -478,28 +689,56 @@ class MycroftSkill(object):
         intent_name = message.data["intent_name"]
         self.disable_intent(intent_name)
 
-    def set_context(self, context, word=''):
+    def set_context(self, context, word='', message_context=None):
         """
             Add context to intent service
 
             Args:
                 context:    Keyword
                 word:       word connected to keyword
+                message_context: context of the session to add it to,
+                                 defaults to the session of the last intent
         """
         if not isinstance(context, basestring):
             raise ValueError('context should be a string')
         if not isinstance(word, basestring):
             raise ValueError('word should be a string')
+        if message_context is None:
+            message_context = self.message_context
         self.emitter.emit(Message('add_context', {'context': context, 'word':
-                          word}))
+                          word}, message_context))
+
+    def set_context_batch(self, contexts, message_context=None):
+        """
+            Add several contexts to intent service with a single message,
+            they are applied together
+
+            Args:
+                contexts:   list of (keyword, word) tuples
+                message_context: context of the session to add them to,
+                                 defaults to the session of the last intent
+        """
+        for context, word in contexts:
+            if not isinstance(context, basestring):
+                raise ValueError('context should be a string')
+            if not isinstance(word, basestring):
+                raise ValueError('word should be a string')
+        if message_context is None:
+            message_context = self.message_context
+        self.emitter.emit(Message('add_context_batch', {'contexts': [
+            {'context': context, 'word': word}
+            for context, word in contexts]}, message_context))
 
-    def remove_context(self, context):
+    def remove_context(self, context, message_context=None):
         """
             remove_context removes a keyword from from the context manager.
         """
         if not isinstance(context, basestring):
             raise ValueError('context should be a string')
-        self.emitter.emit(Message('remove_context', {'context': context}))
+        if message_context is None:
+            message_context = self.message_context
+        self.emitter.emit(Message('remove_context', {'context': context},
+                                  message_context))
 
     def register_vocabulary(self, entity, entity_type):
         """ Register a word to an keyword
@@ -508,13 +747,26 @@ class MycroftSkill(object):
                 entity:         word to register
                 entity_type:    Intent handler entity to tie the word to
         """
-        self.emitter.emit(Message('register_vocab', {
-            'start': entity, 'end': entity_type
-        }))
+        data = {'start': entity, 'end': entity_type}
+        data.update(self.skill_data)
+        self.emitter.emit(Message('register_vocab', data))
 
     def register_regex(self, regex_str):
         re.compile(regex_str)  # validate regex
-        self.emitter.emit(Message('register_vocab', {'regex': regex_str}))
+        data = {'regex': regex_str}
+        data.update(self.skill_data)
+        self.emitter.emit(Message('register_vocab', data))
+
+    @property
+    def skill_data(self):
+        """
+            Data added to registration messages, so the intent service
+            knows which skill folder registered what.
+        """
+        if not getattr(self, '_dir', None):
+            return {}
+        return {'skill_id': self.skill_id,
+                'skill_folder': os.path.basename(self._dir)}
 
     def get_message_context(self, message_context=None):
         if message_context is None:
@@ -528,6 +780,11 @@ class MycroftSkill(object):
                 message_context["mute"] = self.message_context.get("mute", False)
             if "more_speech" not in message_context.keys():
                 message_context["more_speech"] = self.message_context.get("more_speech", False)
+            # context is kept per session, answer in the one of the intent
+            for key in ["user", "session"]:
+                if key not in message_context and \
+                        key in self.message_context:
+                    message_context[key] = self.message_context[key]
         if message_context.get("source", "skills") == "skills":
             message_context["source"] = self.name
         return message_context
@@ -552,10 +809,11 @@ class MycroftSkill(object):
         data = {'utterance': utterance,
                 'expect_response': expect_response,
                 "metadata": metadata}
-        self.emitter.emit(Message("speak", data, self.get_message_context(message_context)))
-        self.set_context('Last_Speech', utterance)
-        for field in metadata:
-            self.set_context(field, metadata[field])
+        message_context = self.get_message_context(message_context)
+        self.emitter.emit(Message("speak", data, message_context))
+        contexts = [('Last_Speech', utterance)]
+        contexts += [(field, metadata[field]) for field in metadata]
+        self.set_context_batch(contexts, message_context)
 
     def speak_dialog(self, key, data=None, expect_response=False, metadata=None, message_context=None):
         """
@@ -582,21 +840,45 @@ class MycroftSkill(object):
             logger.debug('No dialog loaded, ' + dialog_dir + ' does not exist')
 
     def load_data_files(self, root_directory):
+        if resource_cache:
+            self.load_resource_bundle(root_directory)
+            return
         self.init_dialog(root_directory)
         self.load_vocab_files(join(root_directory, 'vocab', self.lang))
         regex_path = join(root_directory, 'regex', self.lang)
         if os.path.exists(regex_path):
             self.load_regex_files(regex_path)
 
+    def load_resource_bundle(self, root_directory):
+        """
+            Load dialog, vocab and regex from the cached resource bundle
+            of the skill, see mycroft.skills.resource_bundle
+        """
+        bundle = resource_cache.load(root_directory, self.lang)
+        if bundle["dialog_dir"]:
+            self.dialog_renderer = DialogLoader().load_templates(
+                bundle["dialog"])
+        else:
+            logger.debug('No dialog loaded, ' +
+                         join(root_directory, 'dialog', self.lang) +
+                         ' does not exist')
+        self.vocab_dir = join(root_directory, 'vocab', self.lang)
+        if bundle["vocab_dir"]:
+            register_vocab(bundle["vocab"], self.emitter, self.skill_data)
+        else:
+            logger.debug('No vocab loaded, ' + self.vocab_dir +
+                         ' does not exist')
+        register_regex(bundle["regex"], self.emitter, self.skill_data)
+
     def load_vocab_files(self, vocab_dir):
         self.vocab_dir = vocab_dir
         if os.path.exists(vocab_dir):
-            load_vocabulary(vocab_dir, self.emitter)
+            load_vocabulary(vocab_dir, self.emitter, self.skill_data)
         else:
             logger.debug('No vocab loaded, ' + vocab_dir + ' does not exist')
 
     def load_regex_files(self, regex_dir):
-        load_regex(regex_dir, self.emitter)
+        load_regex(regex_dir, self.emitter, self.skill_data)
 
     def __handle_stop(self, event):
         """
@@ -634,13 +916,26 @@ class MycroftSkill(object):
         """
         # Store settings
         self.settings.store()
+        self.settings.stop_sync()
 
         # removing events
         for e, f in self.events:
             self.emitter.remove(e, f)
-
-        self.emitter.emit(
-            Message("detach_skill", {"skill_id": str(self.skill_id) + ":"}))
+        self.emitter.remove('skill.executor.stats.request',
+                            self.handle_executor_stats)
+        self.emitter.remove('skill.cache.stats.request',
+                            self.handle_cache_stats)
+        if hasattr(self, "_cache"):
+            self._cache.save()
+        if getattr(self, "control_events", False):
+            self.emitter.remove('enable_intent', self.handle_enable_intent)
+            self.emitter.remove('disable_intent', self.handle_disable_intent)
+        skill_control.remove(self)
+        self.executor.shutdown()
+
+        if getattr(self, "detach_on_shutdown", True):
+            self.emitter.emit(Message("detach_skill",
+                                      {"skill_id": str(self.skill_id) + ":"}))
         try:
             self.stop()
         except:
@@ -659,6 +954,7 @@ class FallbackSkill(MycroftSkill):
     folders = {}
     override = skills_config.get("fallback_override", False)
     order = skills_config.get("fallback_priority", [])
+    speculative = skills_config.get("fallback_speculative", {})
 
     def __init__(self, name=None, emitter=None):
         MycroftSkill.__init__(self, name, emitter)
@@ -666,63 +962,65 @@ class FallbackSkill(MycroftSkill):
         #  list of fallback handlers registered by this instance
         self.instance_fallback_handlers = []
 
+    @classmethod
+    def _ordered_fallbacks(cls):
+        """
+            Fallbacks in the order they are tried
+
+            Returns:
+                list: [(name, handler, context_update_handler)]
+        """
+        if cls.override:
+            # try fallbacks by pre defined order
+            logger.info("Fallback order " + str(cls.order))
+            folders = [f for f in cls.order if f in cls.folders]
+            missing_folders = [f for f in cls.folders if f not in folders]
+            if missing_folders:
+                logger.info("fallbacks not in ordered list, trying them "
+                            "last: " + str(missing_folders))
+            return [(f,) + tuple(cls.folders[f])
+                    for f in folders + missing_folders]
+        # try fallbacks by priority
+        return [(str(priority),) + tuple(cls.fallback_handlers[priority])
+                for priority in sorted(cls.fallback_handlers)]
+
     @classmethod
     def make_intent_failure_handler(cls, ws):
         """Goes through all fallback handlers until one returns true"""
         def handler(message):
-            if cls.override:
-                try:
-                    # try fallbacks by pre defined order
-                    logger.info("Overriding fallback order")
-                    logger.info("Fallback order " + str(cls.order))
-                    missing_folders = cls.folders.keys()
-                    logger.info("Fallbacks " + str(missing_folders))
-                    for folder in cls.order:
-                        for f in cls.folders.keys():
-                            if folder == f:
-                                if f in missing_folders:
-                                    missing_folders.remove(f)
-                                logger.info("Trying ordered fallback: " + folder)
-                                handler, context_update_handler =cls.folders[f]
-                                try:
-                                    context_update_handler(message)
-                                    if handler(message):
-                                        return
-                                except Exception as e:
-                                    logger.info('Exception in fallback: ' + cls.name + " " +
-                                                str(e))
-                    logger.info("Missing fallbacks " + str(missing_folders))
-                    for folder in missing_folders:
-                        logger.info("fallback not in ordered list, trying it now: " +
-                                    folder)
-                        handler, context_update_handler = cls.folders[folder]
-                        try:
-                            context_update_handler(message)
-                            if handler(message):
-                                return
-                        except Exception as e:
-                            logger.info('Exception in fallback: ' + cls.name + " " +
-                                        str(e))
-                except Exception as e:
-                    logger.error(e)
-                    logger.warning("Fallback override is not working")
+            try:
+                fallbacks = cls._ordered_fallbacks()
+            except Exception as e:
+                logger.error(e)
+                logger.warning("Fallback override is not working")
+                fallbacks = []
+            if cls.speculative.get("enabled", False):
+                chain = SpeculativeFallbackChain(
+                    fallbacks, cls.speculative.get("concurrency", 3),
+                    cls.speculative.get("timeout", 10))
+                if chain.run(message):
+                    return
             else:
-                # try fallbacks by priority
-                for _, handler, context_update_handler in sorted(
-                        cls.fallback_handlers.items(),
-                                         key=operator.itemgetter(0)):
+                for name, handler, context_update_handler in fallbacks:
+                    logger.info("Trying fallback: " + name)
                     try:
                         context_update_handler(message)
                         if handler(message):
                             return
                     except Exception as e:
-                        logger.info('Exception in fallback: ' + cls.name + " " +
+                        logger.info('Exception in fallback: ' + name + " " +
                                     str(e))
             ws.emit(Message('complete_intent_failure'))
             logger.warn('No fallback could handle intent.')
 
         return handler
 
+    def bind(self, emitter):
+        """ Register emitter, held while running speculatively """
+        if emitter:
+            emitter = HoldingEmitter(emitter)
+        MycroftSkill.bind(self, emitter)
+
     @classmethod
     def _register_fallback(cls, handler, priority, skill_folder=None,
                            context_update_handler=None):
@@ -0,0 +1,216 @@
+# Copyright 2017 Mycroft AI, Inc.
+#
+# This file is part of Mycroft Core.
+#
+# Mycroft Core is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Mycroft Core is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Mycroft Core.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+    Entity tagger that only evaluates the regex entities that can match.
+
+    Adapt tries every registered regex against every token subsequence of
+    an utterance. Most skill regexes start with a literal word or a group
+    of literal alternatives, e.g. "(reload|restart) skill (?P<Skill>.*)",
+    and since regexes are matched at the start of a subsequence they can
+    only match subsequences starting with one of those words. Regexes are
+    indexed by these first words and only the candidates for the first
+    token of a subsequence are run.
+"""
+
+import sre_constants
+import sre_parse
+
+from adapt.entity_tagger import EntityTagger
+from adapt.tools.text.trie import Trie
+
+MAX_PREFIXES = 64
+
+
+def _expand(states, items):
+    """
+        Extend literal prefixes with the items of a parsed regex.
+
+        Args:
+            states: list of [text, open], open prefixes can still grow
+            items: parsed regex items
+
+        Returns:
+            list of [text, open], None if there are too many prefixes
+    """
+    for op, av in items:
+        open_states = [s for s in states if s[1]]
+        if not open_states:
+            break
+        if op == sre_constants.LITERAL:
+            for state in open_states:
+                state[0] += unichr(av)
+        elif op == sre_constants.SUBPATTERN:
+            closed = [s for s in states if not s[1]]
+            expanded = _expand(open_states, av[-1])
+            if expanded is None:
+                return None
+            states = closed + expanded
+        elif op == sre_constants.BRANCH:
+            closed = [s for s in states if not s[1]]
+            for branch in av[1]:
+                expanded = _expand([list(s) for s in open_states], branch)
+                if expanded is None:
+                    return None
+                closed += expanded
+            states = closed
+        else:
+            # anything but a literal ends the prefix
+            for state in open_states:
+                state[1] = False
+        if len(states) > MAX_PREFIXES:
+            return None
+    return states
+
+
+def get_first_words(regex_str):
+    """
+        Get the words a regex match has to start with.
+
+        Args:
+            regex_str (str): regular expression
+
+        Returns:
+            set: lower case first words, None if the regex can start
+                 with anything
+    """
+    try:
+        parsed = sre_parse.parse(regex_str)
+    except Exception:
+        return None
+    states = _expand([[u"", True]], list(parsed))
+    if not states:
+        return None
+    words = set()
+    for text, _ in states:
+        # only a word followed by a literal space is a complete token
+        if " " not in text:
+            return None
+        word = text.split(" ")[0]
+        if not word:
+            return None
+        words.add(word.lower())
+    return words
+
+
+class PrefilteredEntityTagger(EntityTagger):
+    """
+    EntityTagger running only the regex entities that can match a token
+    subsequence, picked from an index of their first words.
+    """
+    def __init__(self, trie, tokenizer, regex_entities=[], max_tokens=20):
+        super(PrefilteredEntityTagger, self).__init__(
+            trie, tokenizer, regex_entities, max_tokens)
+        self._index = ({}, [])
+        self._indexed = None
+
+    def _get_index(self):
+        """ Rebuild the first word index if the regex entities changed """
+        key = (id(self.regex_entities), len(self.regex_entities))
+        if key != self._indexed:
+            by_word = {}
+            unfiltered = []
+            for regex in list(self.regex_entities):
+                words = get_first_words(regex.pattern)
+                if words is None:
+                    unfiltered.append(regex)
+                else:
+                    for word in words:
+                        by_word.setdefault(word, []).append(regex)
+            self._index = (by_word, unfiltered)
+            self._indexed = key
+        return self._index
+
+    def invalidate(self):
+        """ Rebuild the index, regex entities were removed in place """
+        self._indexed = None
+
+    def candidates(self, first_token):
+        by_word, unfiltered = self._get_index()
+        return by_word.get(first_token.lower(), []) + unfiltered
+
+    def _tag_regex(self, tokens):
+        entities = []
+        for part, idx in self._iterate_subsequences(tokens):
+            groups = []
+            for regex_entity in self.candidates(tokens[idx]):
+                match = regex_entity.match(part)
+                if match:
+                    groups += match.groupdict().items()
+            if not groups:
+                # nothing to tag, skip building a trie for this part
+                continue
+            local_trie = Trie()
+            for key, match_str in groups:
+                local_trie.insert(match_str, (match_str, key))
+            sub_tagger = EntityTagger(local_trie, self.tokenizer,
+                                      max_tokens=self.max_tokens)
+            for sub_entity in sub_tagger.tag(part):
+                sub_entity['start_token'] += idx
+                sub_entity['end_token'] += idx
+                for e in sub_entity['entities']:
+                    e['confidence'] = 0.5
+                entities.append(sub_entity)
+        return entities
+
+    def tag(self, utterance, context_trie=None):
+        """
+        Tag known entities within the utterance, see EntityTagger.tag
+        """
+        tokens = self.tokenizer.tokenize(utterance)
+        entities = []
+        if len(self.regex_entities) > 0:
+            entities = self._tag_regex(tokens)
+        additional_sort = len(entities) > 0
+
+        context_entities = []
+        for i in xrange(len(tokens)):
+            part = ' '.join(tokens[i:])
+
+            for new_entity in self.trie.gather(part):
+                new_entity['data'] = list(new_entity['data'])
+                entities.append({
+                    'match': new_entity.get('match'),
+                    'key': new_entity.get('key'),
+                    'start_token': i,
+                    'entities': [new_entity],
+                    'end_token': i + len(self.tokenizer.tokenize(
+                        new_entity.get('match'))) - 1,
+                    'from_context': False
+                })
+
+            if context_trie:
+                for new_entity in context_trie.gather(part):
+                    new_entity['data'] = list(new_entity['data'])
+                    # context entities get double the weight!
+                    new_entity['confidence'] *= 2.0
+                    context_entities.append({
+                        'match': new_entity.get('match'),
+                        'key': new_entity.get('key'),
+                        'start_token': i,
+                        'entities': [new_entity],
+                        'end_token': i + len(self.tokenizer.tokenize(
+                            new_entity.get('match'))) - 1,
+                        'from_context': True
+                    })
+
+        additional_sort = additional_sort or len(entities) > 0
+
+        if additional_sort:
+            entities = self._sort_and_merge_tags(entities + context_entities)
+
+        return entities
@@ -0,0 +1,203 @@
+# Copyright 2017 Mycroft AI, Inc.
+#
+# This file is part of Mycroft Core.
+#
+# Mycroft Core is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Mycroft Core is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Mycroft Core.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+    Event scheduler of the skills process
+
+    A single thread fires the events scheduled by every skill, kept in a
+    heap ordered by time, by emitting a message named after the event.
+    Events are saved to disk so they survive restarts.
+
+    Bus API:
+        mycroft.scheduler.schedule_event {"event", "time", "repeat", "data"}
+        mycroft.scheduler.remove_event {"event"}
+        mycroft.scheduler.list -> mycroft.scheduler.list.response
+"""
+
+import heapq
+import json
+import os
+import time
+from os.path import dirname, exists, expanduser, isfile
+from threading import Thread, Condition
+
+from mycroft.messagebus.message import Message
+from mycroft.util.log import getLogger
+
+logger = getLogger(__name__)
+
+
+class EventScheduler(object):
+    """
+        Args:
+            emitter: bus to listen on and emit the events to
+            path (str): file the events are saved to, None to not save them
+            autostart (bool): start the scheduler thread
+    """
+    def __init__(self, emitter, path=None, autostart=True):
+        self.emitter = emitter
+        self.path = expanduser(path) if path else None
+        self.events = {}  # name: (time, repeat, data)
+        # (time, name), entries of removed or rescheduled events are
+        # skipped when they come up
+        self.heap = []
+        self.condition = Condition()
+        self.stopped = False
+        self.thread = None
+        self.load()
+        self.emitter.on("mycroft.scheduler.schedule_event",
+                        self.handle_schedule_event)
+        self.emitter.on("mycroft.scheduler.remove_event",
+                        self.handle_remove_event)
+        self.emitter.on("mycroft.scheduler.list", self.handle_list)
+        if autostart:
+            self.start()
+
+    def start(self):
+        self.thread = Thread(target=self._run)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def schedule(self, event, when, repeat=None, data=None):
+        """
+            Schedule an event, replacing an event of the same name
+
+            Args:
+                event (str): name of the message emitted
+                when (float): timestamp to emit it at
+                repeat (float): seconds between repetitions
+                data (dict): data of the message
+        """
+        with self.condition:
+            self.events[event] = (when, repeat, data or {})
+            heapq.heappush(self.heap, (when, event))
+            self.condition.notify()
+        self.save()
+
+    def remove(self, event):
+        """ Remove an event, returns False if it was not scheduled """
+        with self.condition:
+            removed = self.events.pop(event, None) is not None
+        if removed:
+            self.save()
+        return removed
+
+    def get_events(self):
+        """ Scheduled events sorted by time """
+        with self.condition:
+            return [{"event": name, "time": when, "repeat": repeat,
+                     "data": data}
+                    for name, (when, repeat, data) in
+                    sorted(self.events.items(), key=lambda e: e[1][0])]
+
+    def pop_due(self, now):
+        """ Events due at now, rescheduling the repeating ones """
+        due = []
+        with self.condition:
+            while self.heap and self.heap[0][0] <= now:
+                when, name = heapq.heappop(self.heap)
+                event = self.events.get(name)
+                if event is None or event[0] != when:
+                    continue
+                _, repeat, data = event
+                due.append((name, data))
+                if repeat:
+                    # repetitions missed while not running are skipped
+                    when += repeat * max(1, int((now - when) / repeat) + 1)
+                    self.events[name] = (when, repeat, data)
+                    heapq.heappush(self.heap, (when, name))
+                else:
+                    del self.events[name]
+        return due
+
+    def _run(self):
+        while True:
+            with self.condition:
+                if self.stopped:
+                    return
+                if self.heap:
+                    delay = self.heap[0][0] - time.time()
+                    if delay > 0:
+                        self.condition.wait(delay)
+                else:
+                    self.condition.wait()
+                if self.stopped:
+                    return
+            due = self.pop_due(time.time())
+            for name, data in due:
+                try:
+                    self.emitter.emit(Message(name, data))
+                except Exception as e:
+                    logger.error("Could not emit " + name + ": " + str(e))
+            if due:
+                self.save()
+
+    def stop(self):
+        with self.condition:
+            self.stopped = True
+            self.condition.notify()
+        self.save()
+
+    def load(self):
+        if not self.path or not isfile(self.path):
+            return
+        try:
+            with open(self.path) as f:
+                events = json.load(f)
+        except Exception as e:
+            logger.error("Could not load scheduled events: " + str(e))
+            return
+        with self.condition:
+            for name, event in events.items():
+                self.events[name] = (event["time"], event.get("repeat"),
+                                     event.get("data", {}))
+                heapq.heappush(self.heap, (event["time"], name))
+
+    def save(self):
+        """ Write the events to a temporary file renamed over the file """
+        if not self.path:
+            return
+        with self.condition:
+            events = dict((name, {"time": when, "repeat": repeat,
+                                  "data": data})
+                          for name, (when, repeat, data) in
+                          self.events.items())
+        try:
+            if not exists(dirname(self.path)):
+                os.makedirs(dirname(self.path))
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(events, f)
+            os.rename(tmp_path, self.path)
+        except Exception as e:
+            logger.error("Could not save scheduled events: " + str(e))
+
+    def handle_schedule_event(self, message):
+        event = message.data.get("event")
+        when = message.data.get("time")
+        if not event or when is None:
+            logger.error("Event name and time are required")
+            return
+        self.schedule(event, when, message.data.get("repeat"),
+                      message.data.get("data"))
+
+    def handle_remove_event(self, message):
+        self.remove(message.data.get("event"))
+
+    def handle_list(self, message):
+        self.emitter.emit(message.reply("mycroft.scheduler.list.response",
+                                        {"events": self.get_events()}))
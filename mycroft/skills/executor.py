@@ -0,0 +1,155 @@
+# Copyright 2017 Mycroft AI, Inc.
+#
+# This file is part of Mycroft Core.
+#
+# Mycroft Core is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Mycroft Core is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Mycroft Core.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+    Executor running the handlers of a skill on threads of its own, so a
+    blocked handler does not hold a thread of the messagebus client. With
+    the default single worker the handlers of a skill run one at a time,
+    in the order of their messages, as they did on the messagebus thread.
+"""
+
+import time
+from Queue import Queue
+from threading import Thread, Timer, Lock
+
+from mycroft.util.log import getLogger
+
+logger = getLogger(__name__)
+
+
+class SkillExecutor(object):
+    """
+        Runs jobs on at most max_workers threads, started when needed.
+        Jobs running longer than the timeout are reported to on_timeout,
+        they are not interrupted.
+
+        Args:
+            name (str): skill name, used for thread names and logs
+            max_workers (int): jobs running at the same time
+            timeout (float): seconds before a job is reported, 0 disables
+            on_timeout (callable): called with the job name and timeout
+    """
+    def __init__(self, name, max_workers=1, timeout=30, on_timeout=None):
+        self.name = name
+        self.max_workers = max(1, max_workers)
+        self.timeout = timeout
+        self.on_timeout = on_timeout
+        self.queue = Queue()
+        self.lock = Lock()
+        self.threads = []
+        self.busy = 0  # threads running a job
+        self.stats = {}  # {job name: timings, see get_stats}
+        self.last_active = None  # time the last job finished
+
+    def submit(self, name, func, *args):
+        """
+            Queue func(*args, queue_time) to run, queue_time being the
+            seconds the job waited for a thread.
+        """
+        self.queue.put((name, func, args, time.time()))
+        with self.lock:
+            # start a thread when the queued jobs outnumber the idle ones
+            idle = len(self.threads) - self.busy
+            if self.queue.qsize() > idle and \
+                    len(self.threads) < self.max_workers:
+                thread = Thread(target=self._work,
+                                name=self.name + "-" + str(len(self.threads)))
+                thread.daemon = True
+                self.threads.append(thread)
+                thread.start()
+
+    def _work(self):
+        while True:
+            job = self.queue.get()
+            if job is None:
+                return
+            with self.lock:
+                self.busy += 1
+            name, func, args, submitted = job
+            started = time.time()
+            timer = None
+            if self.timeout:
+                timer = Timer(self.timeout, self._timed_out, (name,))
+                timer.daemon = True
+                timer.start()
+            try:
+                func(*(args + (started - submitted,)))
+            except Exception:
+                logger.exception("Failed to run " + name + " of " +
+                                 self.name)
+            finally:
+                if timer:
+                    timer.cancel()
+                self._record(name, started - submitted,
+                             time.time() - started)
+                self.last_active = time.time()
+                with self.lock:
+                    self.busy -= 1
+
+    def _get_stats(self, name):
+        if name not in self.stats:
+            self.stats[name] = {"count": 0, "timeouts": 0,
+                                "queue_time": 0.0, "max_queue_time": 0.0,
+                                "execution_time": 0.0,
+                                "max_execution_time": 0.0}
+        return self.stats[name]
+
+    def _record(self, name, queue_time, execution_time):
+        with self.lock:
+            stats = self._get_stats(name)
+            stats["count"] += 1
+            stats["queue_time"] += queue_time
+            stats["max_queue_time"] = max(stats["max_queue_time"],
+                                          queue_time)
+            stats["execution_time"] += execution_time
+            stats["max_execution_time"] = max(stats["max_execution_time"],
+                                              execution_time)
+
+    def _timed_out(self, name):
+        logger.warning(name + " of " + self.name + " is running for more "
+                       "than " + str(self.timeout) + " seconds")
+        with self.lock:
+            self._get_stats(name)["timeouts"] += 1
+        if self.on_timeout:
+            self.on_timeout(name, self.timeout)
+
+    def get_stats(self):
+        """
+            Timings of the jobs that finished, by job name
+
+            Returns:
+                dict: {name: {"count", "timeouts", "queue_time",
+                              "max_queue_time", "execution_time",
+                              "max_execution_time"}}, times in seconds,
+                      queue_time and execution_time are averages
+        """
+        with self.lock:
+            stats = {}
+            for name, values in self.stats.items():
+                values = dict(values)
+                if values["count"]:
+                    values["queue_time"] /= values["count"]
+                    values["execution_time"] /= values["count"]
+                stats[name] = values
+            return stats
+
+    def shutdown(self):
+        """ Let the threads exit once the queued jobs are done """
+        with self.lock:
+            threads, self.threads = self.threads, []
+        for _ in threads:
+            self.queue.put(None)
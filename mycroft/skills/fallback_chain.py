@@ -0,0 +1,182 @@
+# Copyright 2017 Mycroft AI, Inc.
+#
+# This file is part of Mycroft Core.
+#
+# Mycroft Core is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Mycroft Core is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Mycroft Core.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+    Speculative fallback chain
+
+    Runs several fallbacks at the same time instead of one after the other.
+    A fallback only wins once every fallback before it in the chain declined,
+    so the answer is the one the sequential chain would have given. Every
+    message a fallback skill emits while running is held, the winner's
+    messages are replayed and those of the others are dropped. Messages
+    emitted from threads a fallback starts itself are not held, fallbacks
+    must not start any when run speculatively.
+"""
+
+import time
+from threading import Thread, Condition, local
+
+from mycroft.util.log import getLogger
+
+logger = getLogger(__name__)
+
+_local = local()
+
+
+def held_output():
+    """
+        Output list of the speculative fallback running on this thread,
+        None when output is not held
+    """
+    run = getattr(_local, "run", None)
+    return run.output if run else None
+
+
+def fallback_cancelled():
+    """
+        True when the speculative fallback running on this thread lost,
+        long running fallbacks can check it to stop early
+    """
+    run = getattr(_local, "run", None)
+    return run is not None and run.cancelled
+
+
+class HoldingEmitter(object):
+    """
+        Emitter of a fallback skill, holds the messages emitted by a
+        speculative fallback and drops them once it lost
+    """
+    def __init__(self, emitter):
+        self.emitter = emitter
+
+    def __getattr__(self, name):
+        return getattr(self.emitter, name)
+
+    def emit(self, message):
+        output = held_output()
+        if output is None:
+            return self.emitter.emit(message)
+        if fallback_cancelled():
+            logger.debug("Dropped " + message.type + " of a cancelled "
+                         "fallback")
+            return
+        output.append((self.emitter.emit, (message,), {}))
+
+
+class FallbackRun(object):
+    """ One fallback of the chain, run on its own thread """
+    def __init__(self, name, handler, context_update_handler):
+        self.name = name
+        self.handler = handler
+        self.context_update_handler = context_update_handler
+        self.output = []  # [(function, args, kwargs)]
+        self.result = None  # None while running, then True or False
+        self.started = False
+        self.cancelled = False
+
+    def replay(self):
+        for func, args, kwargs in self.output:
+            func(*args, **kwargs)
+
+
+class SpeculativeFallbackChain(object):
+    """
+        Args:
+            fallbacks (list): [(name, handler, context_update_handler)] in
+                              the order the fallbacks are tried
+            concurrency (int): fallbacks running at the same time
+            timeout (float): seconds before the chain gives up
+    """
+    def __init__(self, fallbacks, concurrency=3, timeout=10):
+        self.runs = [FallbackRun(*f) for f in fallbacks]
+        self.concurrency = max(1, concurrency)
+        self.timeout = timeout
+        self.condition = Condition()
+
+    def _run(self, run, message):
+        _local.run = run
+        try:
+            if run.context_update_handler:
+                run.context_update_handler(message)
+            result = bool(run.handler(message))
+        except Exception as e:
+            logger.info('Exception in fallback: ' + run.name + " " + str(e))
+            result = False
+        finally:
+            _local.run = None
+        with self.condition:
+            run.result = result
+            self.condition.notify()
+
+    def _start(self, run, message):
+        run.started = True
+        thread = Thread(target=self._run, args=(run, message),
+                        name="fallback-" + run.name)
+        thread.daemon = True
+        thread.start()
+
+    def _winner(self):
+        """
+            First fallback that did not decline, if it succeeded
+
+            Returns:
+                FallbackRun: winner, None while undecided or when every
+                             fallback declined
+                bool: True once decided
+        """
+        for run in self.runs:
+            if run.result is None:
+                return None, False
+            if run.result:
+                return run, True
+        return None, True
+
+    def run(self, message):
+        """
+            Run the chain for the message
+
+            Returns:
+                bool: True if a fallback handled the message
+        """
+        deadline = time.time() + self.timeout
+        with self.condition:
+            while True:
+                winner, decided = self._winner()
+                if decided:
+                    break
+                running = len([r for r in self.runs
+                               if r.started and r.result is None])
+                for run in self.runs:
+                    if running >= self.concurrency:
+                        break
+                    if not run.started:
+                        self._start(run, message)
+                        running += 1
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    logger.warning("Fallbacks timed out after " +
+                                   str(self.timeout) + " seconds")
+                    break
+                self.condition.wait(remaining)
+            for run in self.runs:
+                if run is not winner:
+                    run.cancelled = True
+        if winner:
+            logger.info("Fallback " + winner.name + " handled the utterance")
+            winner.replay()
+            return True
+        return False
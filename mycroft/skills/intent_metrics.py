@@ -0,0 +1,247 @@
+# Copyright 2017 Mycroft AI, Inc.
+#
+# This file is part of Mycroft Core.
+#
+# Mycroft Core is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Mycroft Core is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Mycroft Core.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+    Intent handler latency metrics
+
+    Collects the intent.execution.end and intent.execution.error messages
+    of every skill into latency histograms by intent and by skill, with
+    error counts and throughput. Metrics are sent on skills.metrics.request
+    and served as text and JSON over HTTP:
+
+        curl http://127.0.0.1:6790/metrics
+        curl http://127.0.0.1:6790/metrics.json
+"""
+
+import json
+import time
+from BaseHTTPServer import HTTPServer, BaseHTTPRequestHandler
+from bisect import bisect_left
+from collections import deque
+from threading import Thread, Lock
+
+from mycroft.util.log import getLogger
+
+logger = getLogger(__name__)
+
+# upper bounds of the histogram buckets, in seconds
+BUCKETS = [0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0,
+           2.5, 5.0, 10.0, 30.0, 60.0, float("inf")]
+QUANTILES = [0.5, 0.95, 0.99]
+
+
+class LatencyHistogram(object):
+    """
+        Handler latencies in fixed buckets, with errors and the completion
+        times of the last window seconds for throughput
+
+        Args:
+            window (float): seconds the throughput is computed over
+    """
+    def __init__(self, window=60):
+        self.window = window
+        self.buckets = [0] * len(BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self.errors = 0
+        self.timeouts = 0
+        self.recent = deque()
+
+    def add(self, seconds, failed=False, now=None):
+        self.buckets[bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+        if failed:
+            self.errors += 1
+        now = now or time.time()
+        self.recent.append(now)
+        self._expire(now)
+
+    def _expire(self, now):
+        limit = now - self.window
+        while self.recent and self.recent[0] < limit:
+            self.recent.popleft()
+
+    def throughput(self, now=None):
+        """ Handlers completed per second over the window """
+        self._expire(now or time.time())
+        return len(self.recent) / float(self.window)
+
+    def quantile(self, q):
+        """ Latency under which a q fraction of the handlers completed """
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            if count and seen + count >= rank:
+                lower = BUCKETS[index - 1] if index else 0.0
+                upper = min(BUCKETS[index], self.max)
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return self.max
+
+    def serialize(self, now=None):
+        data = {"count": self.count, "errors": self.errors,
+                "timeouts": self.timeouts, "max": self.max,
+                "mean": self.sum / self.count if self.count else None,
+                "error_rate": (float(self.errors) / self.count
+                               if self.count else 0.0),
+                "throughput": self.throughput(now)}
+        for q in QUANTILES:
+            data["p%d" % round(q * 100)] = self.quantile(q)
+        return data
+
+
+class IntentMetrics(object):
+    """
+        Latency metrics of the intent handlers of every skill
+
+        Args:
+            emitter: messagebus emitter
+            config (dict): "metrics" section of the skills config
+            get_skill_name (callable): skill name of a skill id, None if
+                                       unknown
+    """
+    def __init__(self, emitter, config=None, get_skill_name=None):
+        self.emitter = emitter
+        self.config = config or {}
+        self.window = self.config.get("window", 60)
+        self.get_skill_name = get_skill_name or (lambda skill_id: None)
+        self.lock = Lock()
+        self.intents = {}
+        self.skills = {}
+        self.server = None
+        self.emitter.on("intent.execution.end", self.handle_end)
+        self.emitter.on("intent.execution.error", self.handle_error)
+        self.emitter.on("skills.metrics.request", self.handle_request)
+
+    def _histograms(self, intent):
+        skill_id = intent.split(":")[0]
+        if intent not in self.intents:
+            self.intents[intent] = LatencyHistogram(self.window)
+        if skill_id not in self.skills:
+            self.skills[skill_id] = LatencyHistogram(self.window)
+        return self.intents[intent], self.skills[skill_id]
+
+    def record(self, intent, seconds, failed=False):
+        now = time.time()
+        with self.lock:
+            for histogram in self._histograms(intent):
+                histogram.add(seconds, failed, now)
+
+    def handle_end(self, message):
+        intent = message.data.get("intent")
+        seconds = message.data.get("execution_time")
+        if intent and seconds is not None:
+            self.record(intent, seconds)
+
+    def handle_error(self, message):
+        intent = message.data.get("intent")
+        if not intent:
+            return
+        if message.data.get("status") == "timeout":
+            # the handler is still running, its end or error comes later
+            with self.lock:
+                for histogram in self._histograms(intent):
+                    histogram.timeouts += 1
+            return
+        seconds = message.data.get("execution_time")
+        if seconds is not None:
+            self.record(intent, seconds, failed=True)
+
+    def get_metrics(self):
+        """
+            Returns:
+                dict: {"intents": {intent: metrics},
+                       "skills": {skill id: metrics}}, skill metrics have
+                      the skill name
+        """
+        now = time.time()
+        with self.lock:
+            intents = dict((intent, h.serialize(now))
+                           for intent, h in self.intents.items())
+            skills = dict((skill_id, h.serialize(now))
+                          for skill_id, h in self.skills.items())
+        for skill_id, metrics in skills.items():
+            metrics["name"] = self.get_skill_name(skill_id)
+        return {"intents": intents, "skills": skills}
+
+    def handle_request(self, message):
+        self.emitter.emit(message.reply("skills.metrics.response",
+                                        self.get_metrics()))
+
+    def format_text(self):
+        """ Metrics in the Prometheus text format """
+        metrics = self.get_metrics()
+        lines = []
+        for kind, label in [("intents", "intent"), ("skills", "skill")]:
+            for key, data in sorted(metrics[kind].items()):
+                labels = '%s="%s"' % (label, key)
+                if data.get("name"):
+                    labels += ',name="%s"' % data["name"]
+                prefix = "mycroft_%s_" % label
+                for q in QUANTILES:
+                    value = data["p%d" % round(q * 100)]
+                    if value is not None:
+                        lines.append('%slatency_seconds{%s,quantile="%s"} %f'
+                                     % (prefix, labels, q, value))
+                for name in ["count", "errors", "timeouts"]:
+                    lines.append("%s%s_total{%s} %d" %
+                                 (prefix, name, labels, data[name]))
+                lines.append("%sthroughput{%s} %f" %
+                             (prefix, labels, data["throughput"]))
+        return "\n".join(lines) + "\n"
+
+    def start_server(self):
+        """ Serve the metrics over HTTP on the configured host and port """
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == "/metrics":
+                    body, content_type = metrics.format_text(), "text/plain"
+                elif self.path == "/metrics.json":
+                    body = json.dumps(metrics.get_metrics())
+                    content_type = "application/json"
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+        self.server = HTTPServer((self.config.get("host", "127.0.0.1"),
+                                  self.config.get("port", 6790)), Handler)
+        thread = Thread(target=self.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        logger.info("Serving intent metrics on port " +
+                    str(self.server.server_address[1]))
+
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
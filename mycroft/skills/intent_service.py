@@ -17,40 +17,93 @@
 
 
 from adapt.engine import IntentDeterminationEngine
+from adapt.intent import Intent
+import heapq
 import time
+from collections import deque
+from multiprocessing.pool import ThreadPool
+from os.path import expanduser, join
 from time import sleep
-from threading import Timer
+from threading import Timer, Event, Lock, RLock
+from uuid import uuid4
 from mycroft.messagebus.message import Message
-from mycroft.skills.core import open_intent_envelope
+from mycroft.skills.core import open_intent_envelope, SKILLS_DIR, \
+    BLACKLISTED_SKILLS
+from mycroft.skills.entity_tagger import PrefilteredEntityTagger
+from mycroft.skills.intent_snapshot import IntentSnapshot
+from mycroft.skills.skill_cache import skill_fingerprint
 from mycroft.util.log import getLogger
 from mycroft.util.parse import normalize
 from mycroft.configuration import ConfigurationManager
 
 from adapt.context import ContextManagerFrame
-import time
 __author__ = 'seanfitz'
 
 source_name = "server_skills"
+DEFAULT_SESSION = "default"
 
 logger = getLogger(__name__)
 
 
-class ContextManager(object):
+def vocab_keys(vocab):
+    """ Entities registered for a [start, end, alias_of] vocab entry """
+    start, end, alias_of = vocab
+    keys = [("vocab", start, end, alias_of)]
+    if not alias_of:
+        # adapt registers the entity type as a concept too
+        keys.append(("concept", end))
+    return keys
+
+
+class SessionContext(object):
     """
-    ContextManager
-    Use to track context throughout the course of a conversational session.
-    How to manage a session's lifecycle is not captured here.
+    SessionContext
+    Context frames of a single conversational session, newest first.
+    Frames older than the timeout are dropped lazily when the context is
+    read, since they are kept in insertion order.
     """
     def __init__(self, timeout):
-        self.frame_stack = []
-        self.timeout = timeout * 60  # minutes to seconds
+        self.frame_stack = []  # [(frame, timestamp)], newest first
+        self.keywords = {}  # {keyword: number of frames holding it}
+        self.timeout = timeout
+        self.last_used = time.time()
+        self.lock = RLock()
 
     def clear_context(self):
-        self.frame_stack = []
+        with self.lock:
+            self.frame_stack = []
+            self.keywords = {}
+
+    @staticmethod
+    def _frame_keywords(frame):
+        return set(e['data'][0][1] for e in frame.entities if e.get('data'))
+
+    def _index(self, frame, step):
+        for keyword in self._frame_keywords(frame):
+            count = self.keywords.get(keyword, 0) + step
+            if count > 0:
+                self.keywords[keyword] = count
+            else:
+                self.keywords.pop(keyword, None)
+
+    def _expire(self, now):
+        """ Drop frames older than the timeout from the tail of the stack """
+        while self.frame_stack and \
+                now - self.frame_stack[-1][1] >= self.timeout:
+            frame, _ = self.frame_stack.pop()
+            self._index(frame, -1)
 
     def remove_context(self, context_id):
-        self.frame_stack = [(f, t) for (f, t) in self.frame_stack
-                            if context_id in f.entities[0].get('data', [])]
+        with self.lock:
+            if context_id not in self.keywords:
+                return
+            kept = []
+            for frame, t in self.frame_stack:
+                if context_id in self._frame_keywords(frame):
+                    self._index(frame, -1)
+                else:
+                    kept.append((frame, t))
+            self.frame_stack = kept
 
     def inject_context(self, entity, metadata={}):
         """
@@ -63,13 +116,41 @@ class ContextManager(object):
             metadata(object): dict, arbitrary metadata about the entity being
             added
         """
-        top_frame = self.frame_stack[0] if len(self.frame_stack) > 0 else None
-        if top_frame and top_frame[0].metadata_matches(metadata):
-            top_frame[0].merge_context(entity, metadata)
-        else:
-            frame = ContextManagerFrame(entities=[entity],
-                                        metadata=metadata.copy())
-            self.frame_stack.insert(0, (frame, time.time()))
+        with self.lock:
+            self.last_used = time.time()
+            top_frame = self.frame_stack[0] if self.frame_stack else None
+            if top_frame and top_frame[0].metadata_matches(metadata):
+                self._index(top_frame[0], -1)
+                top_frame[0].merge_context(entity, metadata)
+                self._index(top_frame[0], 1)
+            else:
+                frame = ContextManagerFrame(entities=[entity],
+                                            metadata=metadata.copy())
+                self.frame_stack.insert(0, (frame, self.last_used))
+                self._index(frame, 1)
+
+    def inject_context_batch(self, entities, metadata={}):
+        """
+        Inject several entities at once, get_context() sees all of them or
+        none. Like inject_context() they are merged into the top frame when
+        its metadata matches, else they take a single new frame where
+        injecting them one by one took a frame each.
+        """
+        if not entities:
+            return
+        with self.lock:
+            self.last_used = time.time()
+            top_frame = self.frame_stack[0] if self.frame_stack else None
+            if top_frame and top_frame[0].metadata_matches(metadata):
+                self._index(top_frame[0], -1)
+                for entity in entities:
+                    top_frame[0].merge_context(entity, metadata)
+                self._index(top_frame[0], 1)
+            else:
+                frame = ContextManagerFrame(entities=list(entities),
+                                            metadata=metadata.copy())
+                self.frame_stack.insert(0, (frame, self.last_used))
+                self._index(frame, 1)
 
     def get_context(self, max_frames=None, missing_entities=[]):
         """
@@ -83,94 +164,366 @@ class ContextManager(object):
         Returns:
             list: a list of entities
         """
-        relevant_frames = [frame[0] for frame in self.frame_stack if
-                           time.time() - frame[1] < self.timeout]
+        with self.lock:
+            self.last_used = time.time()
+            self._expire(self.last_used)
+            # entities of each frame, the top frame may be merged into
+            relevant_frames = [list(frame[0].entities)
+                               for frame in self.frame_stack]
         if not max_frames or max_frames > len(relevant_frames):
             max_frames = len(relevant_frames)
 
+        # NOTE: this implies that we will only ever get one of an entity
+        # kind from context, unless specified multiple times in
+        # missing_entities. Cannot get an arbitrary number of an entity kind.
         missing_entities = list(missing_entities)
-        context = []
+
+        # Only use the latest instance of each keyword
+        result = []
+        processed = set()
         for i in xrange(max_frames):
-            frame_entities = [entity.copy() for entity in
-                              relevant_frames[i].entities]
-            for entity in frame_entities:
+            for entity in relevant_frames[i]:
+                if missing_entities:
+                    if entity.get('data') not in missing_entities:
+                        continue
+                    missing_entities.remove(entity.get('data'))
+                keyword = entity['data'][0][1]
+                if keyword in processed:
+                    continue
+                processed.add(keyword)
+                entity = entity.copy()
                 entity['confidence'] = entity.get('confidence', 1.0) \
                     / (2.0 + i)
-            context += frame_entities
+                result.append(entity)
+        return result
 
-        result = []
-        if len(missing_entities) > 0:
-            for entity in context:
-                if entity.get('data') in missing_entities:
-                    result.append(entity)
-                    # NOTE: this implies that we will only ever get one
-                    # of an entity kind from context, unless specified
-                    # multiple times in missing_entities. Cannot get
-                    # an arbitrary number of an entity kind.
-                    missing_entities.remove(entity.get('data'))
-        else:
-            result = context
 
-        # Only use the latest instance of each keyword
-        stripped = []
-        processed = []
-        for f in result:
-            keyword = f['data'][0][1]
-            if keyword not in processed:
-                stripped.append(f)
-                processed.append(keyword)
-        result = stripped
-        return result
+class ContextManager(object):
+    """
+    ContextManager
+    Use to track context throughout the course of a conversational session.
+    Context is kept separately for each session, sessions that have not
+    been used for longer than the timeout are forgotten.
+    """
+    def __init__(self, timeout):
+        self.timeout = timeout * 60  # minutes to seconds
+        self.sessions = {}  # {session_id: SessionContext}
+        self.expiry_heap = []  # [(expiry time, session_id)]
+        self.lock = Lock()  # sessions are used from the pool threads
+
+    def _prune(self, now):
+        """
+        Forget sessions that were idle for longer than the timeout, called
+        with the lock held
+        """
+        while self.expiry_heap and self.expiry_heap[0][0] <= now:
+            _, session_id = heapq.heappop(self.expiry_heap)
+            session = self.sessions.get(session_id)
+            if session is None:
+                continue
+            expires = session.last_used + self.timeout
+            if expires <= now:
+                del self.sessions[session_id]
+            else:
+                heapq.heappush(self.expiry_heap, (expires, session_id))
+
+    def get_session(self, session_id=DEFAULT_SESSION):
+        """
+        Get the context of a session, creating it if needed. The returned
+        object can be handed to adapt as a context manager.
+        """
+        with self.lock:
+            now = time.time()
+            self._prune(now)
+            session = self.sessions.get(session_id)
+            if session is None:
+                session = SessionContext(self.timeout)
+                self.sessions[session_id] = session
+                heapq.heappush(self.expiry_heap,
+                               (now + self.timeout, session_id))
+            return session
+
+    def clear_context(self, session_id=None):
+        """ Clear the context of a session, or of every session if None """
+        with self.lock:
+            if session_id is None:
+                self.sessions = {}
+                self.expiry_heap = []
+                return
+            session = self.sessions.get(session_id)
+        if session:
+            session.clear_context()
+
+    def remove_context(self, context_id, session_id=DEFAULT_SESSION):
+        with self.lock:
+            session = self.sessions.get(session_id)
+        if session:
+            session.remove_context(context_id)
+
+    def inject_context(self, entity, metadata={},
+                       session_id=DEFAULT_SESSION):
+        self.get_session(session_id).inject_context(entity, metadata)
+
+    def inject_context_batch(self, entities, metadata={},
+                             session_id=DEFAULT_SESSION):
+        self.get_session(session_id).inject_context_batch(entities, metadata)
+
+    def get_context(self, max_frames=None, missing_entities=[],
+                    session_id=DEFAULT_SESSION):
+        return self.get_session(session_id).get_context(max_frames,
+                                                        missing_entities)
+
+
+def remove_from_trie(trie, word, data):
+    """
+        Remove the data of a word from an adapt trie, and the nodes left
+        without data or children.
+
+        Returns:
+            bool: True if the data was found
+    """
+    path = [trie.root]
+    for char in word:
+        node = path[-1].children.get(char)
+        if node is None:
+            return False
+        path.append(node)
+    leaf = path[-1]
+    if data not in leaf.data:
+        return False
+    leaf.data.remove(data)
+    if not leaf.data:
+        leaf.is_terminal = False
+    for index in range(len(word), 0, -1):
+        node = path[index]
+        if node.is_terminal or node.children:
+            break
+        del path[index - 1].children[word[index - 1]]
+    return True
+
+
+def get_session_id(message_context):
+    """
+    Get the conversational session a message belongs to, messages without
+    session or user information share the default session.
+    """
+    if not message_context:
+        return DEFAULT_SESSION
+    session_id = message_context.get("session") or \
+        message_context.get("user")
+    if session_id is None:
+        return DEFAULT_SESSION
+    return str(session_id)
 
 
 class IntentService(object):
     def __init__(self, emitter):
         self.config = ConfigurationManager.get().get('context', {})
         self.engine = IntentDeterminationEngine()
+        # only run the regex entities that can match a part of the utterance
+        self.engine.tagger = PrefilteredEntityTagger(
+            self.engine.trie, self.engine.tokenizer,
+            self.engine.regular_expressions_entities)
         self.context_keywords = self.config.get('keywords', ['Location'])
         self.context_max_frames = self.config.get('max_frames', 3)
         self.context_timeout = self.config.get('timeout', 2)
         self.context_greedy = self.config.get('greedy', False)
         self.context_manager = ContextManager(self.context_timeout)
+        skills_config = ConfigurationManager.get().get('skills', {})
+        # utterances of different sessions are handled concurrently,
+        # utterances of the same session in the order they arrived
+        self.pool = ThreadPool(skills_config.get('utterance_workers', 4))
+        self.utterance_queues = {}  # {session_id: deque of messages}
+        self.queue_lock = Lock()
+        self.converse_requests = {}  # {request_id: [Event, result]}
+        self.start_time = time.time()
+        self.first_intent_time = None
+        # registrations of each skill, restored from and saved to snapshot
+        self.registrations = {}  # {skill_folder: registrations}
+        self.restored = {}  # {skill_folder: registrations from snapshot}
+        self.restored_intents = {}  # {skill_folder: [Intent]}
+        # utterances matching a restored intent wait until its skill loaded
+        self.waiting_intents = {}  # {intent name: skill_folder}
+        self.waiting_utterances = {}  # {skill_folder: [message]}
+        self.snapshot = IntentSnapshot(expanduser(skills_config.get(
+            'intent_snapshot', '~/.jarbas/intent_snapshot.json')))
+        self.snapshot_delay = skills_config.get('intent_snapshot_delay', 10)
+        self.snapshot_timer = None
+        # vocab and regex entities are removed once no skill holds them,
+        # the lock also serialises changes to the engine with matching
+        self.registration_lock = RLock()
+        self.entity_refs = {}  # {entity key: number of registrations}
+        self.permanent_entities = set()  # registered without skill folder
         self.emitter = emitter
         self.emitter.on('register_vocab', self.handle_register_vocab)
+        self.emitter.on('detach_vocab', self.handle_detach_vocab)
         self.emitter.on('register_intent', self.handle_register_intent)
         self.emitter.on('recognizer_loop:utterance', self.handle_utterance)
         self.emitter.on('detach_intent', self.handle_detach_intent)
         self.emitter.on('detach_skill', self.handle_detach_skill)
+        self.emitter.on('skill.loaded', self.handle_skill_loaded)
+        self.emitter.on('skill.loaded.fail', self.handle_skill_load_failed)
+        self.emitter.on('skill.deferred', self.handle_skill_loaded)
         self.emitter.on('skill.converse.response',
                         self.handle_conversation_response)
         self.emitter.on('intent_request', self.handle_intent_request)
         self.emitter.on('intent_to_skill_request', self.handle_intent_to_skill_request)
         self.emitter.on('active_skill_request', self.handle_active_skill_request)
-        self.active_skills = []  # [skill_id , timestamp]
+        self.active_skills = {}  # {session_id: [[skill_id, timestamp]]}
+        self.active_lock = RLock()
         self.skill_ids = {}  # {skill_id: [intents]}
         self.converse_timeout = 5  # minutes to prune active_skills
+        self.converse_response_timeout = 5  # seconds to wait for converse
         # Context related handlers
         self.emitter.on('add_context', self.handle_add_context)
+        self.emitter.on('add_context_batch', self.handle_add_context_batch)
         self.emitter.on('remove_context', self.handle_remove_context)
         self.emitter.on('clear_context', self.handle_clear_context)
+        self.skills_dir = SKILLS_DIR
+        if skills_config.get('intent_snapshot_enabled', True):
+            self.restore_snapshot()
+
+    def restore_snapshot(self):
+        """
+            Register the vocab, regexes and intents of every skill that did
+            not change since the snapshot was saved, so intents can be
+            matched before the skills finish loading. Utterances matching
+            them are held until their skill loaded.
+        """
+        self.snapshot.load()
+        self.restored = self.snapshot.valid_skills(self.skills_dir,
+                                                   BLACKLISTED_SKILLS)
+        for folder, skill in self.restored.items():
+            self.registrations[folder] = skill
+            for vocab in skill.get("vocab", []):
+                start, end, alias_of = vocab
+                self.engine.register_entity(start, end, alias_of=alias_of)
+                self.hold_entities(vocab_keys(vocab))
+            for regex_str in skill.get("regex", []):
+                self.engine.register_regex_entity(regex_str)
+                self.hold_entities([("regex", regex_str)])
+            intents = [Intent(intent.get('name'), intent.get('requires'),
+                              intent.get('at_least_one'),
+                              intent.get('optional'))
+                       for intent in skill.get("intents", {}).values()]
+            for intent in intents:
+                self.register_intent(intent)
+                self.waiting_intents[intent.name] = folder
+            self.restored_intents[folder] = intents
+        logger.info("Restored %d of %d skills from intent snapshot in %.3f s"
+                    % (len(self.restored), len(self.snapshot.skills),
+                       time.time() - self.start_time))
+
+    def get_registrations(self, message):
+        """
+            Registrations of the skill that sent a register message, None
+            for messages without a skill folder.
+        """
+        folder = message.data.get('skill_folder')
+        if not folder:
+            return None
+        skill_id = message.data.get('skill_id')
+        restored = self.restored.get(folder)
+        if restored and restored.get("skill_id") != skill_id:
+            # the skill got another id, its restored intents are stale
+            self.drop_restored(folder)
+        registrations = self.registrations.get(folder)
+        # the restored registrations are released once the skill loaded
+        if registrations is None or registrations is restored or \
+                registrations.get("skill_id") != skill_id:
+            registrations = {
+                "skill_id": skill_id,
+                "fingerprint": skill_fingerprint(join(self.skills_dir,
+                                                      folder)),
+                "vocab": [], "regex": [], "intents": {}}
+            self.registrations[folder] = registrations
+        self.schedule_snapshot()
+        return registrations
+
+    def hold_entities(self, keys, registrations=True):
+        """
+            Count a registration of entities
+
+            Args:
+                keys (list): entity keys, see vocab_keys
+                registrations (dict): registrations of the skill, None for
+                                      entities registered without skill
+                                      folder, they are never removed
+        """
+        for key in keys:
+            if registrations is None:
+                self.permanent_entities.add(key)
+            else:
+                self.entity_refs[key] = self.entity_refs.get(key, 0) + 1
+
+    def release_entity(self, key):
+        """ Returns True when the entity is not registered anymore """
+        count = self.entity_refs.get(key, 0) - 1
+        if count > 0:
+            self.entity_refs[key] = count
+            return False
+        self.entity_refs.pop(key, None)
+        return key not in self.permanent_entities
+
+    def remove_vocab(self, vocab):
+        start, end, alias_of = vocab
+        if self.release_entity(("vocab", start, end, alias_of)):
+            remove_from_trie(self.engine.trie, start.lower(),
+                             (alias_of or start, end))
+        if not alias_of and self.release_entity(("concept", end)):
+            remove_from_trie(self.engine.trie, end.lower(), (end, 'Concept'))
+
+    def remove_regex(self, regex_str):
+        if self.release_entity(("regex", regex_str)):
+            self.engine._regex_strings.discard(regex_str)
+            self.engine.regular_expressions_entities[:] = [
+                r for r in self.engine.regular_expressions_entities
+                if r.pattern != regex_str]
+            self.engine.tagger.invalidate()
+
+    def release_registrations(self, registrations):
+        """ Remove the entities nothing else registered """
+        for vocab in registrations.get("vocab", []):
+            self.remove_vocab(vocab)
+        for regex_str in registrations.get("regex", []):
+            self.remove_regex(regex_str)
+
+    def schedule_snapshot(self):
+        """ Save the snapshot once registrations stop coming in """
+        if self.snapshot_timer:
+            self.snapshot_timer.cancel()
+        self.snapshot_timer = Timer(self.snapshot_delay, self.save_snapshot)
+        self.snapshot_timer.daemon = True
+        self.snapshot_timer.start()
+
+    def save_snapshot(self):
+        skills = dict(self.snapshot.skills)
+        skills.update(self.registrations)
+        self.snapshot.skills = skills
+        try:
+            self.snapshot.save()
+        except Exception as e:
+            logger.error("Could not save intent snapshot: " + str(e))
 
-    def update_context(self, intent):
+    def update_context(self, intent, session_id=DEFAULT_SESSION):
+        session = self.context_manager.get_session(session_id)
         for tag in intent['__tags__']:
             context_entity = tag.get('entities')[0]
             if self.context_greedy:
-                self.context_manager.inject_context(context_entity)
+                session.inject_context(context_entity)
             elif context_entity['data'][0][1] in self.context_keywords:
-                self.context_manager.inject_context(context_entity)
+                session.inject_context(context_entity)
 
-    def do_conversation(self, utterances, skill_id, lang):
+    def do_conversation(self, utterances, skill_id, lang, context=None):
+        request_id = str(uuid4())
+        request = [Event(), False]
+        self.converse_requests[request_id] = request
         self.emitter.emit(Message("skill.converse.request", {
-            "skill_id": skill_id, "utterances": utterances, "lang": lang}))
-        self.waiting = True
-        self.result = False
-        start_time = time.time()
-        t = 0
-        while self.waiting and t < 5:
-            t = time.time() - start_time
-            sleep(0.1)
-        self.waiting = False
-        return self.result
+            "skill_id": skill_id, "utterances": utterances, "lang": lang,
+            "request_id": request_id}, context))
+        request[0].wait(self.converse_response_timeout)
+        self.converse_requests.pop(request_id, None)
+        return request[1]
 
     def handle_intent_to_skill_request(self, message):
         intent = message.data["intent_name"]
@@ -185,28 +538,44 @@ class IntentService(object):
         return 0
 
     def handle_conversation_response(self, message):
-        # id = message.data["skill_id"]
-        # no need to crosscheck id because waiting before new request is made
-        # no other skill will make this request is safe assumption
-        result = message.data["result"]
-        self.result = result
-        self.waiting = False
-
-    def remove_active_skill(self, skill_id):
-        for skill in self.active_skills:
-            if skill[0] == skill_id:
-                self.active_skills.remove(skill)
-
-    def add_active_skill(self, skill_id):
-        # you have to search the list for an existing entry that already contains it and remove that reference
-        self.remove_active_skill(skill_id)
-        # add skill with timestamp to start of skill_list
-        self.active_skills.insert(0, [skill_id, time.time()])
+        # several converse requests can be pending at once, one per
+        # session, the request id tells them apart
+        request = self.converse_requests.get(message.data.get("request_id"))
+        if request is None:
+            return
+        request[1] = message.data["result"]
+        request[0].set()
+
+    def get_active_skills(self, session_id=DEFAULT_SESSION):
+        """ Active skills of a session, pruning the timed out ones """
+        now = time.time()
+        with self.active_lock:
+            active = [skill for skill in self.active_skills.get(session_id, [])
+                      if now - skill[1] <= self.converse_timeout * 60]
+            if active:
+                self.active_skills[session_id] = active
+            else:
+                self.active_skills.pop(session_id, None)
+            return list(active)
+
+    def remove_active_skill(self, skill_id, session_id=DEFAULT_SESSION):
+        with self.active_lock:
+            self.active_skills[session_id] = [
+                skill for skill in self.active_skills.get(session_id, [])
+                if skill[0] != skill_id]
+
+    def add_active_skill(self, skill_id, session_id=DEFAULT_SESSION):
+        with self.active_lock:
+            # remove the existing entry of the skill, if any
+            self.remove_active_skill(skill_id, session_id)
+            # add skill with timestamp to start of skill_list
+            self.active_skills.setdefault(session_id, []).insert(
+                0, [skill_id, time.time()])
 
     def handle_active_skill_request(self, message):
         # allow external sources to ensure converse method of this skill is called
         skill_id = message.data["skill_id"]
-        self.add_active_skill(skill_id)
+        self.add_active_skill(skill_id, get_session_id(message.context))
 
     def handle_intent_request(self, message):
         utterance = message.data["utterance"]
@@ -217,8 +586,9 @@ class IntentService(object):
         best_intent = None
         try:
             # normalize() changes "it's a boy" to "it is boy", etc.
-            best_intent = next(self.engine.determine_intent(
-                normalize(utterance, lang), 100))
+            with self.registration_lock:
+                best_intent = next(self.engine.determine_intent(
+                    normalize(utterance, lang), 100))
 
             # TODO - Should Adapt handle this?
             best_intent['utterance'] = utterance
@@ -251,6 +621,34 @@ class IntentService(object):
         destinatary = message.context.get("destinatary", "skills")
         if destinatary != "skills" and destinatary != "all":
             return
+        session_id = get_session_id(message.context)
+        with self.queue_lock:
+            queue = self.utterance_queues.get(session_id)
+            if queue is not None:
+                # a worker is busy with this session, it will pick this up
+                queue.append(message)
+                return
+            self.utterance_queues[session_id] = deque([message])
+        self.pool.apply_async(self._process_session, (session_id,))
+
+    def _process_session(self, session_id):
+        """
+            Handle the queued utterances of a session one at a time, until
+            the queue is empty.
+        """
+        while True:
+            with self.queue_lock:
+                queue = self.utterance_queues[session_id]
+                if not queue:
+                    del self.utterance_queues[session_id]
+                    return
+                message = queue.popleft()
+            try:
+                self.process_utterance(message, session_id)
+            except Exception as e:
+                logger.exception(e)
+
+    def process_utterance(self, message, session_id=DEFAULT_SESSION):
         # Get language of the utterance
         lang = message.data.get('lang', None)
         if not lang:
@@ -258,27 +656,26 @@ class IntentService(object):
 
         utterances = message.data.get('utterances', '')
         context = self.get_message_context(message.context)
-        # check for conversation time-out
-        self.active_skills = [skill for skill in self.active_skills
-                              if time.time() - skill[1] <= self.converse_timeout * 60]
 
         # check if any skill wants to handle utterance
-        for skill in self.active_skills:
-            if self.do_conversation(utterances, skill[0], lang):
+        for skill in self.get_active_skills(session_id):
+            if self.do_conversation(utterances, skill[0], lang, context):
                 # update timestamp, or there will be a timeout where
                 # intent stops conversing whether its being used or not
-                self.add_active_skill(skill[0])
+                self.add_active_skill(skill[0], session_id)
                 return
 
         # no skill wants to handle utterance, proceed
         best_intent = None
+        session = self.context_manager.get_session(session_id)
         for utterance in utterances:
             try:
                 # normalize() changes "it's a boy" to "it is boy", etc.
-                best_intent = next(self.engine.determine_intent(
-                                   normalize(utterance, lang), 100,
-                                   include_tags=True,
-                                   context_manager=self.context_manager))
+                with self.registration_lock:
+                    best_intent = next(self.engine.determine_intent(
+                                       normalize(utterance, lang), 100,
+                                       include_tags=True,
+                                       context_manager=session))
                 # TODO - Should Adapt handle this?
                 best_intent['utterance'] = utterance
             except StopIteration, e:
@@ -286,13 +683,19 @@ class IntentService(object):
                 continue
 
         if best_intent and best_intent.get('confidence', 0.0) > 0.0:
-            self.update_context(best_intent)
+            if self.hold_utterance(best_intent['intent_type'], message):
+                return
+            if self.first_intent_time is None:
+                self.first_intent_time = time.time() - self.start_time
+                logger.info("Time to first intent: %.3f s" %
+                            self.first_intent_time)
+            self.update_context(best_intent, session_id)
             reply = message.reply(
                 best_intent.get('intent_type'), best_intent, context)
             self.emitter.emit(reply)
             # update active skills
             skill_id = int(best_intent['intent_type'].split(":")[0])
-            self.add_active_skill(skill_id)
+            self.add_active_skill(skill_id, session_id)
 
         else:
             self.emitter.emit(Message("intent_failure", {
@@ -305,15 +708,66 @@ class IntentService(object):
         end_concept = message.data.get('end')
         regex_str = message.data.get('regex')
         alias_of = message.data.get('alias_of')
-        if regex_str:
-            self.engine.register_regex_entity(regex_str)
-        else:
-            self.engine.register_entity(
-                start_concept, end_concept, alias_of=alias_of)
+        with self.registration_lock:
+            registrations = self.get_registrations(message)
+            if regex_str:
+                self.engine.register_regex_entity(regex_str)
+                if registrations is None or \
+                        regex_str not in registrations["regex"]:
+                    self.hold_entities([("regex", regex_str)],
+                                       registrations)
+                if registrations is not None and \
+                        regex_str not in registrations["regex"]:
+                    registrations["regex"].append(regex_str)
+            else:
+                self.engine.register_entity(
+                    start_concept, end_concept, alias_of=alias_of)
+                vocab = [start_concept, end_concept, alias_of]
+                if registrations is None or \
+                        vocab not in registrations["vocab"]:
+                    self.hold_entities(vocab_keys(vocab), registrations)
+                if registrations is not None and \
+                        vocab not in registrations["vocab"]:
+                    registrations["vocab"].append(vocab)
+
+    def handle_detach_vocab(self, message):
+        """ Remove a vocab or regex entity registered by a skill folder """
+        registrations = self.registrations.get(
+            message.data.get('skill_folder'))
+        if registrations is None:
+            return
+        regex_str = message.data.get('regex')
+        with self.registration_lock:
+            if regex_str:
+                if regex_str in registrations["regex"]:
+                    registrations["regex"].remove(regex_str)
+                    self.remove_regex(regex_str)
+            else:
+                vocab = [message.data.get('start'), message.data.get('end'),
+                         message.data.get('alias_of')]
+                if vocab in registrations["vocab"]:
+                    registrations["vocab"].remove(vocab)
+                    self.remove_vocab(vocab)
+        self.schedule_snapshot()
 
     def handle_register_intent(self, message):
         intent = open_intent_envelope(message)
-        self.engine.register_intent_parser(intent)
+        with self.registration_lock:
+            registrations = self.get_registrations(message)
+            if registrations is not None:
+                registrations["intents"][intent.name] = {
+                    "name": intent.name, "requires": intent.requires,
+                    "at_least_one": intent.at_least_one,
+                    "optional": intent.optional}
+        self.register_intent(intent)
+
+    def register_intent(self, intent):
+        # replace an intent registered again under the same name
+        with self.registration_lock:
+            self.engine.intent_parsers = [
+                p for p in self.engine.intent_parsers
+                if p.name != intent.name]
+            self.engine.register_intent_parser(intent)
         #  map intent_name to skill_id
         skill_id = int(intent.name.split(":")[0])
         intent_name = intent.name.split(":")[1]
@@ -324,32 +778,145 @@ class IntentService(object):
 
     def handle_detach_intent(self, message):
         intent_name = message.data.get('intent_name')
-        new_parsers = [
-            p for p in self.engine.intent_parsers if p.name != intent_name]
-        self.engine.intent_parsers = new_parsers
+        with self.registration_lock:
+            self.engine.intent_parsers = [
+                p for p in self.engine.intent_parsers
+                if p.name != intent_name]
+        # a skill folder is given when the intent is removed, not disabled
+        registrations = self.registrations.get(
+            message.data.get('skill_folder'))
+        if registrations is not None and \
+                registrations["intents"].pop(intent_name, None):
+            self.remove_skill_intent(intent_name)
+            self.schedule_snapshot()
+
+    def remove_skill_intent(self, intent_name):
+        """ Remove an intent name from the intents of its skill id """
+        skill_id, name = intent_name.split(":", 1)
+        intents = self.skill_ids.get(int(skill_id), [])
+        if name in intents:
+            intents.remove(name)
+
+    def drop_restored(self, folder):
+        """
+            Remove the intents and vocab restored from snapshot for a skill
+            folder. The skill id of the snapshot may belong to another
+            skill by now, so only the restored intents themselves are
+            removed, not everything registered under their skill id.
+        """
+        with self.registration_lock:
+            restored = self.restored.pop(folder, None)
+            if restored is None:
+                return
+            dropped = set(id(i) for i in
+                          self.restored_intents.pop(folder, []))
+            for name, waiting in self.waiting_intents.items():
+                if waiting == folder:
+                    del self.waiting_intents[name]
+            # intents registered again replaced the restored ones already
+            self.engine.intent_parsers = [
+                p for p in self.engine.intent_parsers if id(p) not in dropped]
+            names = set(p.name for p in self.engine.intent_parsers)
+            for name in restored.get("intents", {}):
+                if name not in names:
+                    self.remove_skill_intent(name)
+            if self.registrations.get(folder) is restored:
+                del self.registrations[folder]
+            self.release_registrations(restored)
+            self.snapshot.skills.pop(folder, None)
+        self.schedule_snapshot()
+
+    def hold_utterance(self, intent_name, message):
+        """
+            Keep an utterance matching an intent restored from snapshot
+            until the skill of the intent loaded and handles it.
+
+            Returns:
+                bool: True if the utterance is held
+        """
+        with self.registration_lock:
+            folder = self.waiting_intents.get(intent_name)
+            if folder is None:
+                return False
+            self.waiting_utterances.setdefault(folder, []).append(message)
+        logger.debug("Holding utterance for " + intent_name + " until " +
+                     folder + " loaded")
+        return True
+
+    def release_utterances(self, folder):
+        """ Handle again the utterances held for a skill folder """
+        with self.registration_lock:
+            messages = self.waiting_utterances.pop(folder, [])
+        for message in messages:
+            self.handle_utterance(message)
+
+    def handle_skill_loaded(self, message):
+        # restored intents the skill did not register again have no handler
+        folder = message.data.get('skill_folder')
+        self.drop_restored(folder)
+        self.release_utterances(folder)
+
+    def handle_skill_load_failed(self, message):
+        folder = message.data.get('skill_folder')
+        self.drop_restored(folder)
+        skill_id = message.data.get('skill')
+        if skill_id is not None:
+            self.detach_skill(str(skill_id) + ":")
+        self.release_utterances(folder)
 
     def handle_detach_skill(self, message):
-        skill_id = message.data.get('skill_id')
-        new_parsers = [
-            p for p in self.engine.intent_parsers if
-            not p.name.startswith(skill_id)]
-        self.engine.intent_parsers = new_parsers
+        self.detach_skill(message.data.get('skill_id'))
+
+    def detach_skill(self, skill_id):
+        # the skill registers again when it is reloaded
+        with self.registration_lock:
+            for folder, registrations in self.registrations.items():
+                if registrations is self.restored.get(folder):
+                    continue  # released by drop_restored
+                if str(registrations.get("skill_id")) + ":" == skill_id:
+                    del self.registrations[folder]
+                    self.release_registrations(registrations)
+        try:
+            self.skill_ids.pop(int(skill_id.rstrip(":")), None)
+        except (AttributeError, ValueError):
+            pass
+        with self.registration_lock:
+            restored = set(id(i) for intents in self.restored_intents.values()
+                           for i in intents)
+            self.engine.intent_parsers = [
+                p for p in self.engine.intent_parsers if
+                id(p) in restored or not p.name.startswith(skill_id)]
+
+    @staticmethod
+    def context_entity(context, word):
+        word = word or ''
+        return {'confidence': 1.0, 'data': [(word, context)], 'match': word,
+                'key': word}
 
     def handle_add_context(self, message):
-        entity = {'confidence': 1.0}
-        context = message.data.get('context')
-        word = message.data.get('word') or ''
-        entity['data'] = [(word, context)]
-        entity['match'] = word
-        entity['key'] = word
-        self.context_manager.inject_context(entity)
+        entity = self.context_entity(message.data.get('context'),
+                                     message.data.get('word'))
+        self.context_manager.inject_context(
+            entity, session_id=get_session_id(message.context))
+
+    def handle_add_context_batch(self, message):
+        """ Add every {"context", "word"} of the message at once """
+        entities = [self.context_entity(c.get('context'), c.get('word'))
+                    for c in message.data.get('contexts', [])]
+        self.context_manager.inject_context_batch(
+            entities, session_id=get_session_id(message.context))
 
     def handle_remove_context(self, message):
         context = message.data.get('context')
-        self.context_manager.remove_context(context)
+        self.context_manager.remove_context(
+            context, get_session_id(message.context))
 
     def handle_clear_context(self, message):
-        self.context_manager.clear_context()
+        if message.data.get('all'):
+            self.context_manager.clear_context()
+        else:
+            self.context_manager.clear_context(
+                get_session_id(message.context))
 
 
 class IntentParser():
@@ -395,8 +962,10 @@ class IntentParser():
 
 
 class IntentLayers():
-    def __init__(self, emitter, layers = [], timer = 500):
+    def __init__(self, emitter, layers=[], timer=500, skill_id=None):
         self.emitter = emitter
+        # skill owning the intents, the messages only go to that skill
+        self.skill_id = skill_id
         # make intent tree for N layers
         self.layers = []
         self.current_layer = 0
@@ -407,13 +976,21 @@ class IntentLayers():
         self.activate_layer(0)
         self.emitter.on("intent_layer_timer_end", self.stop_timer)
 
+    def _intent_data(self, intent_name):
+        data = {"intent_name": intent_name}
+        if self.skill_id is not None:
+            data["skill_id"] = self.skill_id
+        return data
+
     def disable_intent(self, intent_name):
         """Disable a registered intent"""
-        self.emitter.emit(Message("disable_intent", {"intent_name": intent_name}))
+        self.emitter.emit(Message("disable_intent",
+                                  self._intent_data(intent_name)))
 
     def enable_intent(self, intent_name):
         """Reenable a registered intent"""
-        self.emitter.emit(Message("enable_intent", {"intent_name": intent_name}))
+        self.emitter.emit(Message("enable_intent",
+                                  self._intent_data(intent_name)))
 
     def start_timer(self):
 
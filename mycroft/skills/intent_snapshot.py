@@ -0,0 +1,42 @@
+# Copyright 2017 Mycroft AI, Inc.
+#
+# This file is part of Mycroft Core.
+#
+# Mycroft Core is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Mycroft Core is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Mycroft Core.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+    Snapshot of the vocabulary, regexes and intents registered by each
+    skill, so the IntentService can restore them on restart instead of
+    waiting for every skill to replay its registrations.
+
+    Entries whose skill changed since the snapshot are not restored, see
+    SkillCache.
+"""
+
+from mycroft.skills.skill_cache import SkillCache
+
+
+class IntentSnapshot(SkillCache):
+    """
+        Registrations of every skill, keyed by skill folder name
+
+        {skill_folder: {"skill_id": int,
+                        "fingerprint": str,
+                        "vocab": [[start, end, alias_of]],
+                        "regex": [regex],
+                        "intents": {intent_name: intent dict}}}
+
+        Args:
+            path (str): snapshot file
+    """
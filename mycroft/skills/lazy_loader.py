@@ -0,0 +1,250 @@
+# Copyright 2017 Mycroft AI, Inc.
+#
+# This file is part of Mycroft Core.
+#
+# Mycroft Core is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Mycroft Core is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Mycroft Core.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+    Lazy skill activation.
+
+    When a skill is loaded its vocab, regex, intent and Padatious
+    registrations and the messages it listens to are recorded in a
+    manifest. On the next start a skill that did not change is not
+    imported, its registrations are replayed from the manifest and it is
+    only loaded when one of its messages first arrives. Messages arriving
+    while the skill loads are queued and delivered once it is ready.
+"""
+
+from threading import Lock, Thread
+
+from mycroft.messagebus.message import Message
+from mycroft.skills.core import FallbackSkill
+from mycroft.skills.skill_cache import SkillCache, skill_fingerprint
+from mycroft.util.log import getLogger
+
+logger = getLogger(__name__)
+
+# messages every skill listens to, they do not activate a skill
+IGNORED_EVENTS = ["enable_intent", "disable_intent", "mycroft.stop",
+                  "skill.executor.stats.request", "skill.cache.stats.request"]
+REGISTRATION_TYPES = ["register_vocab", "register_intent",
+                      "padatious:register_intent"]
+
+
+class RecordingEmitter(object):
+    """
+        Emitter given to a skill while it loads, records the messages the
+        skill listens to and the registrations it sends.
+
+        Args:
+            emitter: messagebus emitter
+            attached (bool): if False handlers are only added to the
+                             emitter when attach is called
+            send_registrations (bool): if False registrations are only
+                                       recorded
+    """
+    def __init__(self, emitter, attached=True, send_registrations=True):
+        self.emitter = emitter
+        self.attached = attached
+        self.send_registrations = send_registrations
+        self.lock = Lock()
+        self.events = []  # names of the messages listened to
+        self.handlers = []  # [(event, handler)] added with on
+        self.pending = []  # [(method, event, handler)] until attached
+        self.registrations = []  # [{"type": str, "data": dict}]
+
+    def __getattr__(self, name):
+        return getattr(self.emitter, name)
+
+    def _add(self, method, event, f):
+        with self.lock:
+            if event not in self.events and event not in IGNORED_EVENTS:
+                self.events.append(event)
+            if method == "on":
+                self.handlers.append((event, f))
+            if not self.attached:
+                self.pending.append((method, event, f))
+                return
+        getattr(self.emitter, method)(event, f)
+
+    def on(self, event, f):
+        self._add("on", event, f)
+
+    def once(self, event, f):
+        self._add("once", event, f)
+
+    def remove(self, event, f):
+        with self.lock:
+            if (event, f) in self.handlers:
+                self.handlers.remove((event, f))
+            self.pending = [p for p in self.pending if p[1:] != (event, f)]
+        self.emitter.remove(event, f)
+
+    def emit(self, message):
+        if message.type in REGISTRATION_TYPES:
+            self.registrations.append({"type": message.type,
+                                       "data": dict(message.data)})
+            if not self.send_registrations:
+                return
+        self.emitter.emit(message)
+
+    def attach(self):
+        """ Add the handlers collected so far to the emitter """
+        with self.lock:
+            pending, self.pending = self.pending, []
+            self.attached = True
+        for method, event, f in pending:
+            getattr(self.emitter, method)(event, f)
+
+    def deliver(self, message):
+        """ Call the handlers of the skill for a message """
+        for event, f in list(self.handlers):
+            if event == message.type:
+                try:
+                    f(message)
+                except Exception:
+                    logger.exception("Failed to handle " + event)
+
+
+class SkillManifest(SkillCache):
+    """
+        What each skill registers and listens to, keyed by skill folder
+
+        {skill_folder: {"skill_id": int,
+                        "fingerprint": str,
+                        "name": str,
+                        "fallback": bool,
+                        "events": [message type],
+                        "registrations": [{"type": str, "data": dict}]}}
+
+        Args:
+            path (str): manifest file
+    """
+    def record(self, skill_folder, skill_dir, skill, emitter):
+        """
+            Record a loaded skill
+
+            Args:
+                skill_folder (str): folder name of the skill
+                skill_dir (str): path to the skill folder
+                skill (MycroftSkill): the loaded skill
+                emitter (RecordingEmitter): emitter the skill was loaded with
+        """
+        entry = {
+            "skill_id": skill.skill_id,
+            "fingerprint": skill_fingerprint(skill_dir),
+            "name": skill.name,
+            "fallback": isinstance(skill, FallbackSkill),
+            "events": list(emitter.events),
+            "registrations": list(emitter.registrations)}
+        with self.lock:
+            self.skills[skill_folder] = entry
+
+
+def _renumber(value, old_id, new_id):
+    """ Move intent names of a manifest entry to a new skill id """
+    old_prefix = str(old_id) + ":"
+    if isinstance(value, basestring) and value.startswith(old_prefix):
+        return str(new_id) + ":" + value[len(old_prefix):]
+    return value
+
+
+class LazySkill(object):
+    """
+        Stands in for a skill that was not loaded yet.
+
+        Args:
+            skill_folder (str): folder name of the skill
+            entry (dict): manifest entry of the skill
+            emitter: messagebus emitter
+            skill_id (int): id of the skill
+            activate (callable): loads the skill folder with an unattached
+                                 RecordingEmitter and returns (skill,
+                                 emitter), the skill is None on failure
+    """
+    def __init__(self, skill_folder, entry, emitter, skill_id, activate):
+        self.skill_folder = skill_folder
+        self.emitter = emitter
+        self.skill_id = skill_id
+        self.activate = activate
+        self.name = entry.get("name", skill_folder)
+        old_id = entry.get("skill_id")
+        self.events = [_renumber(e, old_id, skill_id)
+                       for e in entry.get("events", [])]
+        self.registrations = []
+        for registration in entry.get("registrations", []):
+            data = dict(registration["data"])
+            for key in ["name", "intent_name"]:
+                if key in data:
+                    data[key] = _renumber(data[key], old_id, skill_id)
+            if "skill_id" in data:
+                data["skill_id"] = skill_id
+            self.registrations.append({"type": registration["type"],
+                                       "data": data})
+        self.lock = Lock()
+        self.state = "deferred"  # activating, active or cancelled
+        self.queue = []
+
+    def register(self):
+        """ Replay the registrations and wait for the skill messages """
+        for registration in self.registrations:
+            self.emitter.emit(Message(registration["type"],
+                                      registration["data"]))
+        for event in self.events:
+            self.emitter.on(event, self.handle_message)
+
+    def _remove_handlers(self):
+        for event in self.events:
+            self.emitter.remove(event, self.handle_message)
+
+    def handle_message(self, message):
+        with self.lock:
+            if self.state in ["active", "cancelled"]:
+                return
+            self.queue.append(message)
+            if self.state == "activating":
+                return
+            self.state = "activating"
+        logger.info("Activating " + self.skill_folder + " for " +
+                    message.type)
+        thread = Thread(target=self._activate)
+        thread.daemon = True
+        thread.start()
+
+    def _activate(self):
+        skill, emitter = self.activate(self.skill_folder)
+        with self.lock:
+            cancelled = self.state == "cancelled"
+            self.state = "active"
+            queue, self.queue = self.queue, []
+            if not cancelled:
+                self._remove_handlers()
+                emitter.attach()
+        if cancelled:
+            if skill:
+                skill.shutdown()
+            return
+        for message in queue:
+            emitter.deliver(message)
+
+    def cancel(self):
+        """ Stop waiting for the skill messages, drop its registrations """
+        with self.lock:
+            if self.state == "active":
+                return
+            if self.state == "deferred":
+                self._remove_handlers()
+            self.state = "cancelled"
+        self.emitter.emit(Message("detach_skill",
+                                  {"skill_id": str(self.skill_id) + ":"}))
@@ -18,26 +18,39 @@
 
 import json
 import os
-import subprocess
 import sys
 import time
-from os.path import exists, join
-from threading import Timer
+from os.path import exists, join, isfile, expanduser
+from threading import Timer, Thread, Event, Lock as ThreadLock
 
 from mycroft import MYCROFT_ROOT_PATH
 from mycroft.configuration import ConfigurationManager
 from mycroft.lock import Lock  # Creates PID file for single instance
 from mycroft.messagebus.client.ws import WebsocketClient
 from mycroft.messagebus.message import Message
+from mycroft.skills import core
 from mycroft.skills.core import load_skill, create_skill_descriptor, \
     MainModule, FallbackSkill
+from mycroft.skills.event_scheduler import EventScheduler
+from mycroft.skills.intent_metrics import IntentMetrics
 from mycroft.skills.intent_service import IntentService
+from mycroft.skills.lazy_loader import LazySkill, RecordingEmitter, \
+    SkillManifest
 from mycroft.skills.padatious_service import PadatiousService
+from mycroft.skills.skill_control import skill_control
+from mycroft.skills.skill_profiler import SkillProfiler, profile_path
+from mycroft.skills.memory_report import memory_report, select_unload
+from mycroft.skills.startup_profiler import get_rss
+from mycroft.skills.reload_diff import diff_registrations, detach_message
+from mycroft.skills.skill_group import SkillGroupSupervisor
+from mycroft.skills.skill_loader import SkillLoader, read_load_after
+from mycroft.skills.skill_manager import SkillManager, SkillsIndex, \
+    SKILLS_INDEX
+from mycroft.skills.skill_watcher import create_watcher
 from mycroft.util import connected
 from mycroft.util.log import getLogger
 from mycroft.api import is_paired
 import mycroft.dialog
-from mycroft import MYCROFT_ROOT_PATH
 
 logger = getLogger("Skills")
 
@@ -51,10 +64,18 @@ loaded_skills = {}
 last_modified_skill = 0
 skills_directories = []
 skill_reload_thread = None
+skill_watcher = None
+skill_groups = None
+intent_metrics = None
+event_scheduler = None
 skills_manager_timer = None
+# held while the skill manager updates the skills, the watcher waits
+skills_update_lock = ThreadLock()
+updated_skills = set()  # folders updated or installed, to (re)load
+memory_check = Event()  # set to check the memory budget in the watch loop
 id_counter = 0
-installer_config = ConfigurationManager.instance().get("SkillInstallerSkill")
-MSM_BIN = installer_config.get("path", join(MYCROFT_ROOT_PATH, 'msm', 'msm'))
+startup_report = None
+skill_profilers = {}  # {skill id: SkillProfiler}
 
 skills_config = ConfigurationManager.instance().get("skills")
 config_dir = skills_config.get("directory", "default")
@@ -65,6 +86,20 @@ else:
 
 PRIORITY_SKILLS = skills_config["priority_skills"]
 BLACKLISTED_SKILLS = skills_config["blacklisted_skills"]
+LOAD_WORKERS = skills_config.get("load_workers", 4)
+LOAD_AFTER = skills_config.get("load_after", {})
+LAZY_CONFIG = skills_config.get("lazy_loading", {})
+GROUP_CONFIG = skills_config.get("skill_groups", {})
+INCREMENTAL_RELOAD = skills_config.get("incremental_reload", True)
+skill_manifest = SkillManifest(expanduser(
+    LAZY_CONFIG.get("manifest", "~/.jarbas/skill_manifest.json")))
+MANAGER_CONFIG = skills_config.get("skill_manager", {})
+MEMORY_CONFIG = skills_config.get("memory", {})
+skill_manager = SkillManager(
+    SKILLS_DIR, SkillsIndex(MANAGER_CONFIG.get("index_url", SKILLS_INDEX),
+                            MANAGER_CONFIG.get("index_cache"),
+                            MANAGER_CONFIG.get("index_ttl", 3600)),
+    MANAGER_CONFIG.get("workers", 4), MANAGER_CONFIG.get("branch", "master"))
 
 
 def connect():
@@ -74,28 +109,36 @@ def connect():
 
 def install_default_skills(speak=True):
     """
-        Install default skill set using msm.
+        Install the default skill set and update the installed skills.
+        The watcher then reloads the skills of skills.update.summary that
+        were updated or installed, and only those.
 
         Args:
             speak (optional): Enable response for success. Default True
     """
-    if exists(MSM_BIN):
-        res = subprocess.call(MSM_BIN + " default", stderr=subprocess.STDOUT,
-                              stdout=subprocess.PIPE, shell=True)
-        if res == 0 and speak:
-            # ws.emit(Message("speak", {
-            #     'utterance': mycroft.dialog.get("skills updated")}))
-            pass
-        elif not connected():
-            ws.emit(Message("speak", {
-                'utterance': mycroft.dialog.get("no network connection")}))
-        elif res != 0:
-            ws.emit(Message("speak", {
-                'utterance': mycroft.dialog.get(
-                             "sorry I couldn't install default skills")}))
-
-    else:
-        logger.error("Unable to invoke Mycroft Skill Manager: " + MSM_BIN)
+    if not skills_update_lock.acquire(False):
+        logger.debug("Skills are already being updated")
+        return
+    try:
+        summary = skill_manager.install_defaults(
+            MANAGER_CONFIG.get("default_skills"))
+        updated_skills.update(summary["updated"] + summary["installed"])
+    finally:
+        skills_update_lock.release()
+    logger.info("Skills installed: %s, updated: %s, failed: %s" % (
+        summary["installed"], summary["updated"], summary["failed"]))
+    ws.emit(Message("skills.update.summary", summary))
+    if not summary["failed"] and speak:
+        # ws.emit(Message("speak", {
+        #     'utterance': mycroft.dialog.get("skills updated")}))
+        pass
+    elif not connected():
+        ws.emit(Message("speak", {
+            'utterance': mycroft.dialog.get("no network connection")}))
+    elif summary["failed"]:
+        ws.emit(Message("speak", {
+            'utterance': mycroft.dialog.get(
+                         "sorry I couldn't install default skills")}))
 
 
 def skills_manager(message):
@@ -109,7 +152,7 @@ def skills_manager(message):
                              mycroft.dialog.get("checking for updates")}))
 
             # Install default skills and look for updates via Github
-            logger.debug("==== Invoking Mycroft Skill Manager: " + MSM_BIN)
+            logger.debug("==== Invoking Mycroft Skill Manager")
             install_default_skills(False)
 
     # Perform check again once and hour
@@ -124,7 +167,7 @@ def _skills_manager_dispatch():
 
 def _load_skills():
     global ws, loaded_skills, last_modified_skill, skills_directories, \
-        skill_reload_thread
+        skill_reload_thread, skill_watcher, event_scheduler
 
     check_connection()
 
@@ -141,13 +184,59 @@ def _load_skills():
 
     PadatiousService(ws)
     IntentService(ws)
+    # enable_intent and disable_intent go to the skill owning the intent
+    skill_control.bind(ws)
+    _start_intent_metrics()
+
+    # Fires the events scheduled by all the skills, started once the
+    # startup skills added their handlers so the events that came due
+    # while stopped are not lost
+    event_scheduler = EventScheduler(ws, skills_config.get(
+        "scheduler", {}).get("path", "~/.jarbas/schedule.json"),
+        autostart=False)
+    if MEMORY_CONFIG.get("budget_mb", 0):
+        interval = MEMORY_CONFIG.get("check_interval", 300)
+        ws.on("skills.memory.check", handle_memory_check)
+        event_scheduler.schedule("skills.memory.check",
+                                 time.time() + interval, interval)
 
     # Create a thread that monitors the loaded skills, looking for updates
+    skill_watcher = create_watcher(SKILLS_DIR,
+                                   skills_config.get("watcher", {}))
     skill_reload_thread = Timer(0, _watch_skills)
     skill_reload_thread.daemon = True
     skill_reload_thread.start()
 
 
+def _start_intent_metrics():
+    global intent_metrics
+
+    config = skills_config.get("metrics", {})
+    if not config.get("enabled", True):
+        return
+    intent_metrics = IntentMetrics(ws, config, get_skill_name)
+    if config.get("http", False):
+        try:
+            intent_metrics.start_server()
+        except Exception as e:
+            logger.error("Could not serve intent metrics: " + str(e))
+
+
+def get_skill_name(skill_id):
+    """ Name of the skill with this id, None if not loaded """
+    for skill in loaded_skills.values():
+        if str(skill.get("id")) == str(skill_id):
+            if skill.get("lazy"):
+                return skill["lazy"].name
+            if skill.get("instance"):
+                return skill["instance"].name
+    if skill_groups:
+        for skill in skill_groups.get_skills():
+            if str(skill["id"]) == str(skill_id):
+                return skill["name"]
+    return None
+
+
 def check_connection():
     if connected():
         ws.emit(Message('mycroft.internet.connected'))
@@ -167,40 +256,336 @@ def check_connection():
         thread.start()
 
 
-def _get_last_modified_date(path):
-    last_date = 0
-    # getting all recursive paths
-    for root, _, _ in os.walk(path):
-        f = root.replace(path, "")
-        # checking if is a hidden path
-        if not f.startswith(".") and not f.startswith("/."):
-            last_date = max(last_date, os.path.getmtime(path + f))
+def _load_skill_folder(skill_folder, emitter):
+    """
+        Load a skill with a RecordingEmitter and record it in the manifest
+    """
+    skill = loaded_skills[skill_folder]
+    skill["path"] = os.path.join(SKILLS_DIR, skill_folder)
+    rss = get_rss()
+    instance = load_skill(create_skill_descriptor(skill["path"]), emitter,
+                          skill["id"])
+    if rss is not None:
+        # skills loading at the same time, or lazy skills activated
+        # meanwhile, are counted for each other
+        skill["load_rss"] = get_rss() - rss
+    skill["loaded_at"] = time.time()
+    if instance:
+        skill["registrations"] = emitter.registrations
+        skill_manifest.record(skill_folder, skill["path"], instance, emitter)
+        ws.emit(Message("skill.loaded", {"skill": skill["id"],
+                                         "skill_folder": skill_folder}))
+    else:
+        ws.emit(Message("skill.loaded.fail", {"skill": skill["id"],
+                                              "skill_folder": skill_folder}))
+    return instance
 
-    return last_date
 
+def _reload_skill(skill_folder):
+    """
+        Reload a changed skill, only sending the registrations that were
+        added, changed or removed since it was last loaded
+    """
+    skill = loaded_skills[skill_folder]
+    old = skill.pop("registrations", None)
+    instance = skill.pop("instance", None)
+    if instance is not None:
+        logger.debug("Shutting down Skill: " + skill_folder)
+        instance.detach_on_shutdown = old is None
+        instance.shutdown()
+    if old is None:
+        return _load_skill_folder(skill_folder, RecordingEmitter(ws))
+
+    emitter = RecordingEmitter(ws, send_registrations=False)
+    instance = _load_skill_folder(skill_folder, emitter)
+    if instance is None:
+        ws.emit(Message("detach_skill",
+                        {"skill_id": str(skill["id"]) + ":"}))
+        return None
+    added, removed = diff_registrations(old, emitter.registrations)
+    for registration in added:
+        ws.emit(Message(registration["type"], registration["data"]))
+    for registration in removed:
+        ws.emit(detach_message(registration))
+    logger.info("Reloaded " + skill_folder + ", " + str(len(added)) +
+                " registrations added and " + str(len(removed)) +
+                " removed")
+    return instance
+
+
+def _save_manifest():
+    if LAZY_CONFIG.get("enabled", False):
+        try:
+            skill_manifest.save()
+        except Exception as e:
+            logger.error("Could not save skill manifest: " + str(e))
+
+
+def _load_startup_skill(skill_folder):
+    skill = loaded_skills[skill_folder]
+    skill["last_modified"] = skill_watcher.get_last_modified(skill_folder)
+    skill["loaded"] = True
+    skill["instance"] = _load_skill_folder(skill_folder,
+                                           RecordingEmitter(ws))
+
+
+def _activate_skill(skill_folder):
+    """ Load a deferred skill, its handlers are attached by LazySkill """
+    emitter = RecordingEmitter(ws, attached=False)
+    instance = _load_skill_folder(skill_folder, emitter)
+    skill = loaded_skills[skill_folder]
+    if skill.pop("lazy", None):
+        skill["instance"] = instance
+    _save_manifest()
+    return instance, emitter
+
+
+def _defer_skill(skill_folder, entry):
+    """ Register a skill from its manifest entry without importing it """
+    skill = loaded_skills[skill_folder]
+    skill["path"] = os.path.join(SKILLS_DIR, skill_folder)
+    skill["last_modified"] = skill_watcher.get_last_modified(skill_folder)
+    skill["loaded"] = True
+    skill["lazy"] = LazySkill(skill_folder, entry, ws, skill["id"],
+                              _activate_skill)
+    skill["lazy"].register()
+    ws.emit(Message("skill.deferred", {"skill": skill["id"],
+                                       "skill_folder": skill_folder}))
+
+
+def start_skill_groups(folders):
+    """
+        Start the worker processes running the skills configured in
+        skill_groups, returns the skill folders they run.
+    """
+    global skill_groups
+    if not GROUP_CONFIG.get("enabled", False):
+        return []
+    skills = dict((f, loaded_skills[f]["id"]) for f in folders
+                  if f in GROUP_CONFIG.get("skills", []))
+    if not skills:
+        return []
+    skill_groups = SkillGroupSupervisor(ws, SKILLS_DIR, GROUP_CONFIG)
+    for skill_folder, group in skill_groups.start(skills).items():
+        skill = loaded_skills[skill_folder]
+        skill["path"] = os.path.join(SKILLS_DIR, skill_folder)
+        skill["last_modified"] = \
+            skill_watcher.get_last_modified(skill_folder)
+        skill["loaded"] = True
+        skill["group"] = group
+    return skills.keys()
+
+
+def _watch_group_skill(skill_folder, skill):
+    """ Ask the worker running a skill to reload it when it changed """
+    modified = skill_watcher.get_last_modified(skill_folder)
+    if modified > skill.get("last_modified", 0):
+        skill["last_modified"] = modified
+        ws.emit(Message("reload_skill_request", {"skill_id": skill["id"]}))
+
+
+def handle_group_refused(message):
+    """ Load a fallback skill refused by its worker in this process """
+    skill = loaded_skills.get(message.data.get("skill_folder"))
+    if skill and skill.get("group") is not None:
+        logger.info("Loading " + message.data["skill_folder"] +
+                    " out of its skill group")
+        skill.pop("group")
+        skill["loaded"] = False
+
+
+def is_group_skill(skill_id):
+    """ Check if a skill runs in a skill group worker process """
+    for skill in loaded_skills.values():
+        if skill["id"] == skill_id:
+            return skill.get("group") is not None
+    return False
+
+
+def get_lazy_skills(folders):
+    """
+        Manifest entries of the skills that can be loaded on first use,
+        those that did not change since they were recorded and are not
+        priority, fallback or eager skills.
+    """
+    if not LAZY_CONFIG.get("enabled", False):
+        return {}
+    skill_manifest.load()
+    eager = PRIORITY_SKILLS + LAZY_CONFIG.get("eager_skills", [])
+    lazy = {}
+    for skill_folder, entry in skill_manifest.valid_skills(
+            SKILLS_DIR, BLACKLISTED_SKILLS).iteritems():
+        if skill_folder in folders and skill_folder not in eager and \
+                not entry.get("fallback"):
+            lazy[skill_folder] = entry
+    return lazy
+
+
+def load_startup_skills():
+    """
+        Load every skill in the skills folder, several at a time. Priority
+        skills are all loaded before any other skill.
+    """
+    global last_modified_skill, startup_report
+
+    start = time.time()
+    folders = [f for f in loaded_skills
+               if f not in BLACKLISTED_SKILLS and
+               isfile(join(SKILLS_DIR, f, MainModule + ".py"))]
+    grouped = start_skill_groups(folders)
+    folders = [f for f in folders if f not in grouped]
+    lazy = get_lazy_skills(folders)
+    for skill_folder in sorted(lazy):
+        _defer_skill(skill_folder, lazy[skill_folder])
+    folders = [f for f in folders if f not in lazy]
+    dependencies = {}
+    for skill_folder in folders:
+        dependencies[skill_folder] = \
+            LOAD_AFTER.get(skill_folder, []) + \
+            read_load_after(join(SKILLS_DIR, skill_folder))
+
+    loader = SkillLoader(_load_startup_skill, LOAD_WORKERS)
+    priority = [f for f in PRIORITY_SKILLS if f in folders]
+    for skill_folder in PRIORITY_SKILLS:
+        if skill_folder not in loaded_skills:
+            logger.error(skill_folder + " does not seem to exist")
+    loader.load_all(priority, dependencies)
+    loader.load_all([f for f in folders if f not in priority],
+                    dependencies)
+    _save_manifest()
 
-def load_priority():
-    global ws, loaded_skills, SKILLS_DIR, PRIORITY_SKILLS, id_counter
+    # skills loaded now are not reloaded by the watch loop
+    last_modified_skill = max([s.get("last_modified", 0)
+                               for s in loaded_skills.values()] or [0])
+    logger.info("Loaded " + str(len(folders)) + " skills in " +
+                str(round(time.time() - start, 2)) + " seconds, " +
+                str(len(lazy)) + " skills load on first use")
+    if core.startup_profiler:
+        startup_report = core.startup_profiler.stop()
+        ws.emit(Message("skills.startup.report", startup_report))
+
+
+def handle_startup_report_request(message):
+    if startup_report:
+        ws.emit(Message("skills.startup.report", startup_report))
+
+
+def get_skill_instance(skill_id):
+    """ Loaded skill with this id, None if not loaded in this process """
+    for skill in loaded_skills.values():
+        if str(skill.get("id")) == str(skill_id):
+            return skill.get("instance")
+    return None
+
+
+def handle_profile_start(message):
+    """
+        Sample the handlers of a skill for "duration" seconds, or until
+        skill.profile.stop, the result is emitted as skill.profile.result
+    """
+    skill_id = message.data.get("skill_id")
+    skill = get_skill_instance(skill_id)
+    if skill is None or str(skill_id) in skill_profilers:
+        error = "already profiled" if skill else "not loaded"
+        ws.emit(message.reply("skill.profile.result",
+                              {"skill_id": skill_id, "error": error}))
+        return
+    config = skills_config.get("profile", {})
+
+    def on_stop(profiler):
+        skill_profilers.pop(str(skill_id), None)
+        result = profiler.report()
+        result["skill_id"] = skill_id
+        try:
+            result["path"] = profiler.save(profile_path(
+                config.get("directory", "~/.jarbas/profiles"), skill.name))
+        except Exception as e:
+            logger.error("Could not save profile: " + str(e))
+        ws.emit(message.reply("skill.profile.result", result))
+
+    profiler = SkillProfiler(
+        skill, message.data.get("interval", config.get("interval", 0.005)),
+        message.data.get("duration", config.get("duration", 30)), on_stop)
+    skill_profilers[str(skill_id)] = profiler
+    profiler.start()
+    logger.info("Profiling " + skill.name)
 
-    if exists(SKILLS_DIR):
-        for skill_folder in PRIORITY_SKILLS:
-            try:
-                skill = loaded_skills.get(skill_folder)
-                skill["path"] = os.path.join(SKILLS_DIR, skill_folder)
-                # checking if is a skill
-                if not MainModule + ".py" in os.listdir(skill["path"]):
-                    continue
-                # getting the newest modified date of skill
-                skill["last_modified"] = _get_last_modified_date(skill["path"])
-                # checking if skill is loaded
-                if skill.get("loaded"):
-                    continue
 
-                skill["instance"] = load_skill(
-                    create_skill_descriptor(skill["path"]), ws, skill["id"])
-                skill["loaded"] = True
-            except TypeError:
-                logger.error(skill_folder + " does not seem to exist")
+def handle_profile_stop(message):
+    profiler = skill_profilers.get(str(message.data.get("skill_id")))
+    if profiler:
+        profiler.stop()
+
+
+def _can_unload(skill_folder, instance):
+    """ If the skill can be deferred again until its next use """
+    entry = skill_manifest.skills.get(skill_folder)
+    return entry is not None and not entry.get("fallback") and \
+        skill_folder not in PRIORITY_SKILLS and instance.external_shutdown
+
+
+def _loaded_instances():
+    """ {"folder", "skill_id", "instance", "load_rss", "idle"} """
+    now = time.time()
+    skills = []
+    for skill_folder, skill in loaded_skills.items():
+        instance = skill.get("instance")
+        if not instance:
+            continue
+        idle = None
+        if _can_unload(skill_folder, instance):
+            idle = now - max(instance.executor.last_active or 0,
+                             skill.get("loaded_at", now))
+        skills.append({"folder": skill_folder, "skill_id": skill["id"],
+                       "instance": instance,
+                       "load_rss": skill.get("load_rss"), "idle": idle})
+    return skills
+
+
+def handle_memory_report_request(message):
+    """
+        Memory used by each skill loaded in this process, measured on a
+        thread of its own as walking the skills blocks for a while
+    """
+    def report():
+        ws.emit(message.reply("skills.memory.report",
+                              memory_report(_loaded_instances(), get_rss())))
+    thread = Thread(target=report, name="memory-report")
+    thread.daemon = True
+    thread.start()
+
+
+def handle_memory_check(message):
+    """ Skills are unloaded by the watch loop, which (re)loads them """
+    memory_check.set()
+
+
+def _unload_skill(skill_folder):
+    """ Shut a loaded skill down, it loads again on its next message """
+    skill = loaded_skills[skill_folder]
+    instance = skill.pop("instance", None)
+    if not instance:
+        return
+    logger.info("Unloading idle skill " + skill_folder)
+    skill.pop("registrations", None)
+    instance.shutdown()
+    _defer_skill(skill_folder, skill_manifest.skills[skill_folder])
+
+
+def check_memory_budget():
+    """ Unload idle skills, biggest first, while over the memory budget """
+    budget = MEMORY_CONFIG.get("budget_mb", 0) * 1024 * 1024
+    rss = get_rss()
+    if not budget or rss is None or rss <= budget:
+        return
+    report = memory_report(_loaded_instances(), rss)
+    for skill_folder in select_unload(
+            report["skills"], rss, budget,
+            MEMORY_CONFIG.get("idle_minutes", 30) * 60):
+        try:
+            _unload_skill(skill_folder)
+        except Exception as e:
+            logger.error("Could not unload " + skill_folder + ": " + str(e))
 
 
 def _watch_skills():
@@ -209,7 +594,7 @@ def _watch_skills():
 
     # Scan the folder that contains Skills.
     list = filter(lambda x: os.path.isdir(
-        os.path.join(SKILLS_DIR, x)), os.listdir(SKILLS_DIR))
+        os.path.join(SKILLS_DIR, x)), sorted(os.listdir(SKILLS_DIR)))
     for skill_folder in list:
         if skill_folder not in loaded_skills:
             # register unique ID
@@ -217,12 +602,21 @@ def _watch_skills():
             loaded_skills[skill_folder] = {"id": id_counter, "loaded": False, "do_not_reload": False,
                                            "do_not_load": False, "reload_request": False, "shutdown": False}
 
-    # Load priority skills first
-    load_priority()
+    # Load all skills, priority skills first
+    load_startup_skills()
+    event_scheduler.start()
 
     # Scan the file folder that contains Skills.  If a Skill is updated,
     # unload the existing version from memory and reload from the disk.
     while True:
+        # waits for the skill manager, the skills it updated or installed
+        # are reloaded even if their files look older than the last scan
+        with skills_update_lock:
+            updated = set(updated_skills)
+            updated_skills.clear()
+        if memory_check.is_set():
+            memory_check.clear()
+            check_memory_budget()
         if exists(SKILLS_DIR):
             # checking skills dir and getting all skills there
             list = filter(lambda x: os.path.isdir(
@@ -238,10 +632,21 @@ def _watch_skills():
                     loaded_skills[skill_folder] = {"id": id_counter, "loaded": False, "do_not_reload": False,
                                                    "do_not_load": False, "reload_request": False, "shutdown": False}
                 skill = loaded_skills.get(skill_folder)
+                # skill groups reload and shutdown their own skills
+                if skill.get("group") is not None:
+                    _watch_group_skill(skill_folder, skill)
+                    continue
                 # see if this skill was supposed to be shutdown
                 if skill["shutdown"]:
                     logger.debug("Skill " + skill_folder + " shutdown was requested")
                     skill["shutdown"] = False
+                    if skill.get("lazy"):
+                        skill.pop("lazy").cancel()
+                        skill["loaded"] = False
+                        ws.emit(Message("shutdown_skill_response",
+                                        {"status": "shutdown",
+                                         "skill_id": skill["id"]}))
+                        continue
                     if skill.get("loaded"):
                         if skill.get("instance"):
                             if skill["instance"].external_shutdown:
@@ -264,19 +669,23 @@ def _watch_skills():
                     continue
                 skill["path"] = os.path.join(SKILLS_DIR, skill_folder)
                 # checking if is a skill
-                if not MainModule + ".py" in os.listdir(skill["path"]):
+                if not isfile(join(skill["path"], MainModule + ".py")):
                     continue
-                # getting the newest modified date of skill
-                skill["last_modified"] = _get_last_modified_date(skill["path"])
+                # getting the newest modified date of skill, ignored data
+                # folders of skills are never looked at
+                skill["last_modified"] = \
+                    skill_watcher.get_last_modified(skill_folder)
                 modified = skill.get("last_modified", 0)
+                changed = modified > last_modified_skill or \
+                    skill_folder in updated
 
                 # checking if skill is loaded and wasn't modified
-                if skill.get(
-                        "loaded") and (modified <= last_modified_skill and not skill["reload_request"]):
+                if skill.get("loaded") and \
+                        not changed and not skill["reload_request"]:
                         continue
                 # checking if skill was modified or reload was requested
-                elif skill.get(
-                        "instance") and (modified > last_modified_skill or skill["reload_request"]):
+                elif skill.get("instance") and \
+                        (changed or skill["reload_request"]):
                     # checking if skill reload was requested
                     if skill["reload_request"]:
                         logger.debug("External reload for " + skill_folder + " requested")
@@ -296,26 +705,26 @@ def _watch_skills():
                     # check if we are suposed to reload skill
                     if not skill["do_not_reload"]:
                         logger.debug("Reloading Skill: " + skill_folder)
+                        skill["loaded"] = True
+                        if INCREMENTAL_RELOAD:
+                            skill["instance"] = _reload_skill(skill_folder)
+                            _save_manifest()
+                            continue
                         # removing listeners and stopping threads
-                        if skill.get("instance") is not None:
-                            logger.debug("Shutting down Skill: " + skill_folder)
-                            skill["instance"].shutdown()
-                            del skill["instance"]
-                        else:
-                            logger.debug("Skill " + skill_folder + " is already shutdown")
+                        logger.debug("Shutting down Skill: " + skill_folder)
+                        skill.pop("registrations", None)
+                        skill["instance"].shutdown()
+                        del skill["instance"]
 
                 # load skill
                 if not skill["do_not_reload"]:
+                    if skill.get("lazy"):
+                        # changed before it was ever used
+                        skill.pop("lazy").cancel()
                     skill["loaded"] = True
-                    skill["instance"] = load_skill(
-                    create_skill_descriptor(skill["path"]), ws, skill["id"])
-
-                    if skill["instance"]:
-                        ws.emit(Message("skill.loaded",
-                                    {"skill":skill["id"]}))
-                    else:
-                        ws.emit(Message("skill.loaded.fail",
-                                        {"skill": skill["id"]}))
+                    skill["instance"] = _load_skill_folder(
+                        skill_folder, RecordingEmitter(ws))
+                    _save_manifest()
 
         # get the last modified skill
         modified_dates = map(lambda x: x.get("last_modified"),
@@ -323,13 +732,15 @@ def _watch_skills():
         if len(modified_dates) > 0:
             last_modified_skill = max(modified_dates)
 
-        # Pause briefly before beginning next scan
-        time.sleep(2)
+        # Pause until a skill changes or the next scan is due
+        skill_watcher.wait()
 
 
 def handle_shutdown_skill_request(message):
     global loaded_skills
     skill_id = message.data["skill_id"]
+    if is_group_skill(skill_id):
+        return
     for skill in loaded_skills:
         if loaded_skills[skill]["id"] == skill_id:
             # avoid auto-reload
@@ -344,6 +755,8 @@ def handle_shutdown_skill_request(message):
 def handle_reload_skill_request(message):
     global loaded_skills, ws
     skill_id = message.data["skill_id"]
+    if is_group_skill(skill_id):
+        return
     for skill in loaded_skills:
         if loaded_skills[skill]["id"] == skill_id:
             loaded_skills[skill]["reload_request"] = True
@@ -358,7 +771,10 @@ def handle_conversation_request(message):
     skill_id = int(message.data["skill_id"])
     utterances = message.data["utterances"]
     lang = message.data["lang"]
+    request_id = message.data.get("request_id")
     global ws, loaded_skills
+    if is_group_skill(skill_id):
+        return
     # loop trough skills list and call converse for skill with skill_id
     for skill in loaded_skills:
         if loaded_skills[skill]["id"] == skill_id:
@@ -366,31 +782,47 @@ def handle_conversation_request(message):
                 instance = loaded_skills[skill]["instance"]
             except:
                 logger.error("converse requested but skill not loaded")
-                ws.emit(Message("skill.converse.response", {
-                    "skill_id": 0, "result": False}))
+                ws.emit(message.reply("skill.converse.response", {
+                    "skill_id": 0, "result": False,
+                    "request_id": request_id}))
                 return
             try:
+                instance.handle_update_message_context(message)
                 result = instance.converse(utterances, lang)
-                ws.emit(Message("skill.converse.response", {
-                    "skill_id": skill_id, "result": result}))
+                ws.emit(message.reply("skill.converse.response", {
+                    "skill_id": skill_id, "result": result,
+                    "request_id": request_id}))
                 return
             except:
                 logger.error("Converse method malformed for skill " + str(skill_id))
-    ws.emit(Message("skill.converse.response", {
-        "skill_id": 0, "result": False}))
+    ws.emit(message.reply("skill.converse.response", {
+        "skill_id": 0, "result": False, "request_id": request_id}))
 
 
 def handle_loaded_skills_request(message):
     global ws, loaded_skills
     skills = []
+    group_skills = {}
+    if skill_groups:
+        for skill in skill_groups.get_skills():
+            group_skills[skill["folder"]] = skill
     # loop trough skills list
     for skill in loaded_skills:
+        if skill in group_skills:
+            skills.append({"folder": skill,
+                           "name": group_skills[skill]["name"],
+                           "id": loaded_skills[skill]["id"],
+                           "group": loaded_skills[skill]["group"]})
+            continue
         loaded = {}
         loaded.setdefault("folder", skill)
         try:
             loaded.setdefault("name", loaded_skills[skill]["instance"].name)
         except:
-            loaded.setdefault("name", "unloaded")
+            if loaded_skills[skill].get("lazy"):
+                loaded.setdefault("name", loaded_skills[skill]["lazy"].name)
+            else:
+                loaded.setdefault("name", "unloaded")
         loaded.setdefault("id", loaded_skills[skill]["id"])
         skills.append(loaded)
     ws.emit(Message("loaded_skills_response", {"skills": skills}))
@@ -428,6 +860,11 @@ def main():
     ws.on('reload_skill_request', handle_reload_skill_request)
     ws.on('shutdown_skill_request', handle_shutdown_skill_request)
     ws.on('loaded_skills_request', handle_loaded_skills_request)
+    ws.on('skills.startup.report.request', handle_startup_report_request)
+    ws.on('skills.group.refused', handle_group_refused)
+    ws.on('skill.profile.start', handle_profile_start)
+    ws.on('skill.profile.stop', handle_profile_stop)
+    ws.on('skills.memory.report.request', handle_memory_report_request)
     ws.run_forever()
 
 
@@ -440,6 +877,14 @@ if __name__ == "__main__":
             skill.shutdown()
         if skill_reload_thread:
             skill_reload_thread.cancel()
+        if skill_watcher:
+            skill_watcher.stop()
+        if skill_groups:
+            skill_groups.stop()
+        if intent_metrics:
+            intent_metrics.stop()
+        if event_scheduler:
+            event_scheduler.stop()
 
     finally:
         sys.exit()
@@ -0,0 +1,150 @@
+# Copyright 2017 Mycroft AI, Inc.
+#
+# This file is part of Mycroft Core.
+#
+# Mycroft Core is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Mycroft Core is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Mycroft Core.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+    Memory used by each skill
+
+    The size of a skill is the size of the objects reachable from its
+    instance. Modules, classes and functions are not followed, nor are the
+    objects shared by every skill such as the messagebus client and the
+    configuration. An object reachable from several skills is counted for
+    the first one only. Native memory, like the buffers of a TF graph, is
+    not seen, the RSS growth while the skill loaded accounts for it.
+"""
+
+import gc
+import sys
+import time
+import types
+
+from mycroft.util.log import getLogger
+
+logger = getLogger(__name__)
+
+# not followed, shared by the skills or reaching the whole process
+SKIPPED_TYPES = (types.ModuleType, type, types.ClassType,
+                 types.FunctionType, types.BuiltinFunctionType,
+                 types.CodeType, types.FrameType)
+# attributes of every skill holding objects shared with the others
+SHARED_ATTRIBUTES = ["emitter", "enclosure", "config_core"]
+
+
+def reachable_size(root, seen, max_objects=500000):
+    """
+        Args:
+            root: object to measure
+            seen (set): ids of the objects not to count, the objects
+                        counted are added to it
+            max_objects (int): objects visited before giving up
+
+        Returns:
+            int: bytes used by the objects reachable from root
+            int: number of those objects
+    """
+    size = 0
+    count = 0
+    pending = [root]
+    while pending and count < max_objects:
+        obj = pending.pop()
+        if id(obj) in seen or isinstance(obj, SKIPPED_TYPES):
+            continue
+        seen.add(id(obj))
+        count += 1
+        try:
+            size += sys.getsizeof(obj)
+        except TypeError:
+            pass
+        pending.extend(gc.get_referents(obj))
+    return size, count
+
+
+def skill_sizes(skills):
+    """
+        Args:
+            skills (list): MycroftSkill instances
+
+        Returns:
+            list: (size, objects) of each skill
+    """
+    seen = set(id(s) for s in skills)
+    for skill in skills:
+        for attribute in SHARED_ATTRIBUTES:
+            shared = getattr(skill, attribute, None)
+            if shared is not None:
+                seen.add(id(shared))
+    sizes = []
+    for skill in skills:
+        seen.discard(id(skill))
+        sizes.append(reachable_size(skill, seen))
+    return sizes
+
+
+def select_unload(skills, rss, budget, idle_time):
+    """
+        Idle skills to unload to bring the process under its budget,
+        biggest first
+
+        Args:
+            skills (list): {"folder", "size", "idle"} of the loaded skills,
+                           idle in seconds, None for skills never unloaded
+            rss (int): resident memory of the process
+            budget (int): bytes the process should stay under
+            idle_time (float): seconds a skill must be idle to be unloaded
+
+        Returns:
+            list: folders of the skills to unload
+    """
+    excess = rss - budget
+    if excess <= 0:
+        return []
+    candidates = sorted([s for s in skills if s.get("idle") is not None and
+                         s["idle"] >= idle_time],
+                        key=lambda s: -s["size"])
+    folders = []
+    for skill in candidates:
+        if excess <= 0:
+            break
+        folders.append(skill["folder"])
+        # the RSS growth while loading includes the objects of the skill
+        excess -= max(skill["size"], skill.get("load_rss") or 0)
+    return folders
+
+
+def memory_report(skills, rss):
+    """
+        Args:
+            skills (list): {"folder", "skill_id", "instance", "load_rss",
+                            "idle"} of the loaded skills
+            rss (int): resident memory of the process
+
+        Returns:
+            dict: {"rss", "duration", "skills": [{"folder", "skill_id",
+                   "name", "size", "objects", "load_rss", "idle"}]}, skills
+                  sorted by size
+    """
+    start = time.time()
+    sizes = skill_sizes([s["instance"] for s in skills])
+    report = []
+    for skill, (size, objects) in zip(skills, sizes):
+        report.append({"folder": skill["folder"],
+                       "skill_id": skill["skill_id"],
+                       "name": skill["instance"].name,
+                       "size": size, "objects": objects,
+                       "load_rss": skill.get("load_rss"),
+                       "idle": skill.get("idle")})
+    report.sort(key=lambda s: -s["size"])
+    return {"rss": rss, "duration": time.time() - start, "skills": report}
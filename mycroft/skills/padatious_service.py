@@ -54,6 +54,7 @@ class PadatiousService(object):
 
         self.emitter = emitter
         self.emitter.on('padatious:register_intent', self.register_intent)
+        self.emitter.on('padatious:detach_intent', self.detach_intent)
         self.emitter.on('padatious:fallback.request', self.handle_fallback)
         self.finished_training_event = Event()
 
@@ -88,6 +89,21 @@ class PadatiousService(object):
         self.train_time = get_time() + self.train_delay
         self.wait_and_train()
 
+    def detach_intent(self, message):
+        intent_name = message.data['intent_name']
+        # older padatious versions can not remove intents
+        if not hasattr(self.container, 'remove_intent'):
+            return
+        logger.debug('Detaching Padatious intent: ' + intent_name)
+        try:
+            self.container.remove_intent(intent_name)
+        except Exception as e:
+            logger.error('Could not detach Padatious intent ' +
+                         intent_name + ': ' + str(e))
+            return
+        self.train_time = get_time() + self.train_delay
+        self.wait_and_train()
+
     def handle_fallback(self, message):
         utt = message.data.get('utterance')
         logger.debug("Padatious fallback attempt: " + utt)
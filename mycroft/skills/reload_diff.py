@@ -0,0 +1,73 @@
+# Copyright 2017 Mycroft AI, Inc.
+#
+# This file is part of Mycroft Core.
+#
+# Mycroft Core is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Mycroft Core is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Mycroft Core.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+    Differences between the registrations of two loads of a skill, so a
+    reloaded skill only sends the vocab, regex and intents that changed.
+"""
+
+from mycroft.messagebus.message import Message
+
+
+def registration_key(registration):
+    """ What a registration registers, two loads register it the same """
+    data = registration["data"]
+    if registration["type"] == "register_vocab":
+        if data.get("regex"):
+            return "regex", data["regex"]
+        return "vocab", data.get("start"), data.get("end"), \
+            data.get("alias_of")
+    if registration["type"] == "register_intent":
+        return "intent", data.get("name")
+    return registration["type"], data.get("intent_name")
+
+
+def diff_registrations(old, new):
+    """
+        Args:
+            old (list): [{"type", "data"}] recorded by the previous load
+            new (list): [{"type", "data"}] recorded by the new load
+
+        Returns:
+            list: registrations of new to send, added or changed ones,
+                  Padatious intents are always sent since their file may
+                  have changed
+            list: registrations of old to detach
+    """
+    old_keys = dict((registration_key(r), r) for r in old)
+    new_keys = set(registration_key(r) for r in new)
+    added = []
+    for registration in new:
+        previous = old_keys.get(registration_key(registration))
+        if previous is None or previous["data"] != registration["data"] or \
+                registration["type"] == "padatious:register_intent":
+            added.append(registration)
+    removed = [r for r in old if registration_key(r) not in new_keys]
+    return added, removed
+
+
+def detach_message(registration):
+    """ Message undoing a registration """
+    data = registration["data"]
+    if registration["type"] == "register_vocab":
+        return Message("detach_vocab", dict(data))
+    detach = {"skill_folder": data.get("skill_folder")}
+    if registration["type"] == "register_intent":
+        detach["intent_name"] = data.get("name")
+        return Message("detach_intent", detach)
+    detach["intent_name"] = data.get("intent_name")
+    return Message("padatious:detach_intent", detach)
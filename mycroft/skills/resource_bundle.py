@@ -0,0 +1,190 @@
+# Copyright 2017 Mycroft AI, Inc.
+#
+# This file is part of Mycroft Core.
+#
+# Mycroft Core is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Mycroft Core is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Mycroft Core.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+    Compiled resource bundles of skills.
+
+    The vocab, regex and dialog files of a skill, for one language, are
+    parsed once into a bundle that is cached on disk as a single marshal
+    file, the fastest format to read back for plain lists and dicts.
+    Vocab aliases are already split and regexes already validated. The
+    bundle is keyed by the names, modification times and sizes of the
+    resource files and is rebuilt when any of them changes.
+"""
+
+import hashlib
+import marshal
+import os
+import re
+from os.path import join, splitext, basename, exists
+from stat import S_ISREG
+
+from mycroft.util.log import getLogger
+
+logger = getLogger(__name__)
+
+BUNDLE_VERSION = 1
+
+
+def read_vocab_file(path, vocab_type):
+    """
+        Read a vocabulary file (*.voc)
+
+        Returns:
+            list: [start, end, alias_of] entries, alias_of is None for
+                  entities and the entity for its aliases
+    """
+    vocab = []
+    with open(path, 'r') as voc_file:
+        for line in voc_file.readlines():
+            parts = line.strip().split("|")
+            entity = parts[0]
+            vocab.append([entity, vocab_type, None])
+            for alias in parts[1:]:
+                vocab.append([alias, vocab_type, entity])
+    return vocab
+
+
+def read_regex_file(path):
+    """
+        Read a regex file (*.rx), every regex is compiled to validate it.
+
+        Returns:
+            list: regex strings
+    """
+    regexes = []
+    with open(path, 'r') as reg_file:
+        for line in reg_file.readlines():
+            re.compile(line.strip())
+            regexes.append(line.strip())
+    return regexes
+
+
+def _resource_files(skill_dir, lang):
+    """
+        Files of the vocab, regex and dialog folders of a skill
+
+        Returns:
+            dict: {folder: [(file name, stat)]}, None for missing folders
+    """
+    files = {}
+    for folder in ["vocab", "regex", "dialog"]:
+        path = join(skill_dir, folder, lang)
+        try:
+            names = os.listdir(path)
+        except OSError:
+            files[folder] = None
+            continue
+        files[folder] = []
+        for name in sorted(names):
+            stat = os.stat(path + os.sep + name)
+            if S_ISREG(stat.st_mode):
+                files[folder].append((name, stat))
+    return files
+
+
+def _bundle_key(files):
+    md5 = hashlib.md5()
+    for folder in sorted(files):
+        for name, stat in files[folder] or []:
+            md5.update("%s/%s %r %d\n" % (folder, name, stat.st_mtime,
+                                          stat.st_size))
+    return md5.hexdigest()
+
+
+def build_bundle(skill_dir, lang, files=None):
+    """
+        Read the resource files of a skill into a bundle
+
+        {"vocab_dir": bool, "vocab": [[start, end, alias_of]],
+         "regex_dir": bool, "regex": [regex],
+         "dialog_dir": bool, "dialog": {dialog entry name: [template]}}
+
+        Raises:
+            re.error: if a regex is not valid
+    """
+    files = files or _resource_files(skill_dir, lang)
+    bundle = {"vocab_dir": files["vocab"] is not None, "vocab": [],
+              "regex_dir": files["regex"] is not None, "regex": [],
+              "dialog_dir": files["dialog"] is not None, "dialog": {}}
+    for name, _ in files["vocab"] or []:
+        if name.endswith(".voc"):
+            bundle["vocab"] += read_vocab_file(
+                join(skill_dir, "vocab", lang, name), splitext(name)[0])
+    for name, _ in files["regex"] or []:
+        if name.endswith(".rx"):
+            bundle["regex"] += read_regex_file(
+                join(skill_dir, "regex", lang, name))
+    for name, _ in files["dialog"] or []:
+        with open(join(skill_dir, "dialog", lang, name), 'r') as f:
+            templates = [line.strip() for line in f]
+        bundle["dialog"].setdefault(splitext(name)[0], []).extend(templates)
+    return bundle
+
+
+class ResourceCache(object):
+    """
+        Resource bundles of skills cached in a folder, one file per skill
+        and language.
+
+        Args:
+            cache_dir (str): folder holding the bundle files
+    """
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+
+    def get_path(self, skill_dir, lang):
+        skill_dir = skill_dir.rstrip(os.sep)
+        name = "%s.%s.%s.bundle" % (
+            basename(skill_dir), lang, hashlib.md5(skill_dir).hexdigest()[:8])
+        return join(self.cache_dir, name)
+
+    def load(self, skill_dir, lang):
+        """
+            Get the resource bundle of a skill, from the cache if none of
+            its resource files changed.
+        """
+        files = _resource_files(skill_dir, lang)
+        key = _bundle_key(files)
+        path = self.get_path(skill_dir, lang)
+        if exists(path):
+            try:
+                with open(path, 'rb') as f:
+                    data = marshal.load(f)
+                if data.get("version") == BUNDLE_VERSION and \
+                        data.get("key") == key:
+                    return data["bundle"]
+            except Exception as e:
+                logger.warning("Could not read resource bundle " + path +
+                               ": " + str(e))
+        bundle = build_bundle(skill_dir, lang, files)
+        try:
+            self.save(path, key, bundle)
+        except Exception as e:
+            logger.error("Could not save resource bundle " + path + ": " +
+                         str(e))
+        return bundle
+
+    def save(self, path, key, bundle):
+        """ Write a bundle file, replacing the old one atomically """
+        if not exists(self.cache_dir):
+            os.makedirs(self.cache_dir)
+        tmp_path = path + ".%d.tmp" % os.getpid()
+        with open(tmp_path, 'wb') as f:
+            marshal.dump({"version": BUNDLE_VERSION, "key": key,
+                          "bundle": bundle}, f)
+        os.rename(tmp_path, path)
@@ -0,0 +1,221 @@
+# Copyright 2017 Mycroft AI, Inc.
+#
+# This file is part of Mycroft Core.
+#
+# Mycroft Core is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Mycroft Core is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Mycroft Core.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+    Result cache of the skills
+
+    Keeps the results of slow calls, usually web requests, for a time to
+    live, evicting the least recently used once full. Concurrent fetches
+    of a missing key wait for the first one instead of fetching again.
+
+    Example:
+        class WeatherSkill(MycroftSkill):
+            @cached(ttl=600)
+            def weather_at_place(self, location):
+                return self.owm.weather_at_place(location)
+"""
+
+import cPickle as pickle
+import os
+import time
+from collections import OrderedDict
+from functools import wraps
+from os.path import isfile
+from threading import Lock, Event
+
+from mycroft.util.log import getLogger
+
+logger = getLogger(__name__)
+
+
+class _Fetch(object):
+    """ A fetch in progress, waited on by the other callers of the key """
+    def __init__(self):
+        self.done = Event()
+        self.value = None
+        self.error = None
+
+
+class ResultCache(object):
+    """
+        Args:
+            name (str): name of the skill owning the cache
+            max_size (int): entries kept in memory
+            ttl (float): default seconds an entry is valid
+            path (str): file the cache is saved to, None to keep it in memory
+    """
+    def __init__(self, name, max_size=128, ttl=300, path=None):
+        self.name = name
+        self.max_size = max_size
+        self.ttl = ttl
+        self.path = path
+        self.lock = Lock()
+        self.entries = OrderedDict()  # key: (expires, value), oldest first
+        self.fetches = {}  # key: _Fetch
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.load()
+
+    def _get(self, key, now):
+        """ Valid entry of key moved to the end, call with the lock """
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return None
+        if entry[0] <= now:
+            return None
+        self.entries[key] = entry
+        return entry
+
+    def _set(self, key, value, ttl, now):
+        self.entries.pop(key, None)
+        self.entries[key] = (now + (self.ttl if ttl is None else ttl), value)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def get(self, key, default=None):
+        with self.lock:
+            entry = self._get(key, time.time())
+            if entry is None:
+                self.misses += 1
+                return default
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value, ttl=None):
+        """
+            Args:
+                key: hashable key
+                value: result to keep
+                ttl (float): seconds the value is valid, default ttl if None
+        """
+        with self.lock:
+            self._set(key, value, ttl, time.time())
+
+    def invalidate(self, key=None):
+        """ Drop the entry of key, or every entry if None """
+        with self.lock:
+            if key is None:
+                self.entries.clear()
+            else:
+                self.entries.pop(key, None)
+
+    def get_or_fetch(self, key, fetch, ttl=None):
+        """
+            Value of key, calling fetch() and keeping its result when it is
+            missing or expired. Callers asking for a key being fetched wait
+            for that fetch, its exception is raised to all of them.
+        """
+        with self.lock:
+            entry = self._get(key, time.time())
+            if entry is not None:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            pending = self.fetches.get(key)
+            if pending is None:
+                pending = self.fetches[key] = _Fetch()
+                owner = True
+            else:
+                self.coalesced += 1
+                owner = False
+
+        if not owner:
+            pending.done.wait()
+            if pending.error is not None:
+                raise pending.error
+            return pending.value
+
+        try:
+            pending.value = fetch()
+        except Exception as e:
+            pending.error = e
+            raise
+        else:
+            with self.lock:
+                self._set(key, pending.value, ttl, time.time())
+        finally:
+            with self.lock:
+                self.fetches.pop(key, None)
+            pending.done.set()
+        return pending.value
+
+    def get_stats(self):
+        with self.lock:
+            requests = self.hits + self.misses
+            return {"size": len(self.entries), "max_size": self.max_size,
+                    "hits": self.hits, "misses": self.misses,
+                    "coalesced": self.coalesced,
+                    "hit_rate": float(self.hits) / requests if requests
+                    else 0.0}
+
+    def load(self):
+        if not self.path or not isfile(self.path):
+            return
+        try:
+            with open(self.path, 'rb') as f:
+                entries = pickle.load(f)
+        except Exception as e:
+            logger.error("Could not load cache of " + self.name + ": " +
+                         str(e))
+            return
+        now = time.time()
+        with self.lock:
+            for key, entry in entries:
+                if entry[0] > now:
+                    self.entries[key] = entry
+
+    def save(self):
+        """ Write the valid entries to a temporary file renamed over path """
+        if not self.path:
+            return
+        now = time.time()
+        with self.lock:
+            entries = [(k, e) for k, e in self.entries.items() if e[0] > now]
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(entries, f, pickle.HIGHEST_PROTOCOL)
+            os.rename(tmp_path, self.path)
+        except Exception as e:
+            # results that can't be pickled are only kept in memory
+            logger.error("Could not save cache of " + self.name + ": " +
+                         str(e))
+
+
+def cached(ttl=None, key=None):
+    """
+        Decorator keeping the results of a skill method in the cache of the
+        skill, by method name and arguments.
+
+        Args:
+            ttl (float): seconds a result is valid, the cache default if None
+            key: function building the key from the arguments of the method,
+                 the arguments themselves by default
+    """
+    def real_decorator(func):
+        @wraps(func)
+        def cached_method(self, *args, **kwargs):
+            if key:
+                cache_key = (func.__name__, key(*args, **kwargs))
+            else:
+                cache_key = (func.__name__, args,
+                             tuple(sorted(kwargs.items())))
+            return self.cache.get_or_fetch(
+                cache_key, lambda: func(self, *args, **kwargs), ttl)
+        return cached_method
+    return real_decorator
@@ -18,7 +18,7 @@
 
 import abc
 from datetime import datetime
-from threading import Timer, Lock
+import threading
 from time import mktime
 
 import parsedatetime as pdt
@@ -32,6 +32,9 @@ __author__ = 'jdorleans'
 
 logger = getLogger(__name__)
 
+# skills scheduling with their own timers import Timer from here
+Timer = threading.Timer
+
 
 class ScheduledSkill(MycroftSkill):
     """
@@ -69,21 +72,25 @@ class ScheduledSkill(MycroftSkill):
         times = sorted(self.get_times())
 
         if len(times) > 0:
-            self.cancel()
             t = times[0]
             now = self.get_utc_time()
             delay = max(float(t) - now, 1)
-            self.timer = Timer(delay, self.notify, [t])
-            self.timer.daemon = True
-            self.start()
+            # replaces the notification scheduled before
+            self.schedule_event(self.handle_notify, delay, name='notify',
+                                data={'timestamp': t})
+
+    def handle_notify(self, message):
+        self.notify(message.data.get('timestamp'))
 
     def start(self):
+        """ Start self.timer, for skills still scheduling with a Timer """
         if self.timer:
             self.timer.start()
 
     def cancel(self):
         if self.timer:
             self.timer.cancel()
+        self.cancel_scheduled_event('notify')
 
     def convert_local(self, utc_time):
         return utc_time + self.DELTA_TIME
@@ -138,7 +145,7 @@ class ScheduledCRUDSkill(ScheduledSkill):
         #. "Mycroft, remind me to contribute to Mycroft project"
     """
 
-    LOCK = Lock()
+    LOCK = threading.Lock()
     REPEAT_TASK = 'repeat'
     PENDING_TASK = 'pending'
     ONE_DAY_SECS = 86400
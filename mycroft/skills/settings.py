@@ -26,18 +26,48 @@
         s['meaning of life'] = 42
         s['flower pot sayings'] = 'Not again...'
         s.store()
+
+    The keys set or deleted since the last store are compared with the
+    file, and so is every key holding a list or dict: nested values can
+    change in place unseen, so each store serializes all of them again.
+    The file is rewritten only if one of these keys changed. store_later()
+    writes after a debounce window instead, pending writes are flushed on
+    exit.
 """
 
+import atexit
 import json
+import os
 import sys
-from threading import Timer
+from threading import Timer, Lock
 from os.path import isfile, join, exists, expanduser
+
+from mycroft.configuration import ConfigurationManager
 from mycroft.util.log import getLogger
-from mycroft.api import DeviceApi
+from mycroft.skills.settings_sync import get_settings_sync
 
 logger = getLogger(__name__)
 SKILLS_DIR = "/opt/mycroft/skills"
 
+# SkillSettings with a write pending, SkillSettings are dicts so they are
+# compared by identity
+_pending = []
+_pending_lock = Lock()
+
+
+def flush_pending():
+    """ Write the settings still waiting for their debounce window """
+    with _pending_lock:
+        pending = list(_pending)
+    for settings in pending:
+        try:
+            settings.store()
+        except Exception as e:
+            logger.error("Could not store settings: " + str(e))
+
+
+atexit.register(flush_pending)
+
 
 # TODO: allow deleting skill when skill is deleted
 class SkillSettings(dict):
@@ -48,10 +78,22 @@ class SkillSettings(dict):
 
         Args:
             settings_file (str): Path to storage file
+            sync (SettingsSync): backend sync, defaults to the one shared
+                                 by all skills
+            debounce (float): seconds store_later() waits before writing
     """
-    def __init__(self, directory, autopath=True):
+    def __init__(self, directory, autopath=True, sync=None, debounce=None):
         super(SkillSettings, self).__init__()
-        self.api = DeviceApi()
+        self._touched = set()  # keys set or deleted since the last store
+        self._stored = {}  # key: json of the value in the file
+        self._store_lock = Lock()
+        self._store_timer = None
+        if debounce is None:
+            debounce = ConfigurationManager.get().get("skills", {}).get(
+                "settings_store", {}).get("debounce", 5)
+        self.debounce = debounce
+        self.sync = sync or get_settings_sync()
+        self.api = self.sync.api
         self._device_identity = self.api.identity.uuid
         # set file paths
         if autopath:
@@ -61,30 +103,77 @@ class SkillSettings(dict):
         self._meta_path = join(directory, 'settingsmeta.json')
         self._api_path = "/" + self._device_identity + "/skill"
 
-        self.loaded_hash = hash(str(self))
-
         # if settingsmeta.json exists
         if isfile(self._meta_path):
             self.settings_meta = self._load_settings_meta()
             self.settings = self._get_settings()
             self._send_settings_meta()
-            # start polling timer
-            Timer(60, self._poll_skill_settings).start()
+            # polled by the settings sync of the process
+            self.sync.register(self)
 
         self.load_skill_settings()
 
-    @property
-    def _is_stored(self):
-        return hash(str(self)) == self.loaded_hash
-
-    def __getitem__(self, key):
-        return super(SkillSettings, self).__getitem__(key)
-
     def __setitem__(self, key, value):
         """
             Add/Update key and note that the file needs saving.
         """
-        return super(SkillSettings, self).__setitem__(key, value)
+        super(SkillSettings, self).__setitem__(key, value)
+        self._touched.add(key)
+
+    def __delitem__(self, key):
+        super(SkillSettings, self).__delitem__(key)
+        self._touched.add(key)
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def pop(self, key, *args):
+        self._touched.add(key)
+        return super(SkillSettings, self).pop(key, *args)
+
+    def popitem(self):
+        key, value = super(SkillSettings, self).popitem()
+        self._touched.add(key)
+        return key, value
+
+    def clear(self):
+        self._touched.update(self.keys())
+        super(SkillSettings, self).clear()
+
+    def _changed_keys(self):
+        """
+            Keys whose value differs from the file. Changes made in place
+            to lists and dicts are not tracked, so every list or dict value
+            is serialized and compared on each call, whether it changed
+            or not.
+        """
+        keys = set(self._touched)
+        keys.update(k for k, v in self.items()
+                    if isinstance(v, (list, dict)))
+        changed = []
+        for key in keys:
+            if key not in self:
+                if key in self._stored:
+                    changed.append(key)
+            elif json.dumps(self[key], sort_keys=True) != \
+                    self._stored.get(key):
+                changed.append(key)
+        return changed
+
+    def _mark_stored(self):
+        self._stored = dict((k, json.dumps(v, sort_keys=True))
+                            for k, v in self.items())
+        self._touched = set()
+
+    @property
+    def _is_stored(self):
+        return not self._changed_keys()
 
     def _load_settings_meta(self):
         with open(self._meta_path) as f:
@@ -96,7 +185,7 @@ class SkillSettings(dict):
             see if skill settings already exist in the backend
         """
         skill_identity = self._get_skill_identity()
-        for skill_setting in self.settings:
+        for skill_setting in self.settings or []:
             if skill_identity == skill_setting["identifier"]:
                 return True
         return False
@@ -106,40 +195,37 @@ class SkillSettings(dict):
             send settingsmeta.json to the backend if skill doesn't
             already exist
         """
+        if self.settings is None:
+            # backend not reachable, do not create the skill again
+            return
         try:
             if self._skill_exist_in_backend() is False:
                 response = self._put_metadata(self.settings_meta)
         except Exception as e:
             logger.error(e)
 
-    def _poll_skill_settings(self):
+    def update_remote(self, remote):
         """
-            If identifier exists for this skill poll to backend to
-            request settings and store it if it changes
+            Apply the backend values of this skill and store them if they
+            changed, called by the settings sync with the settings of every
+            skill of the device
             TODO: implement as websocket
         """
-        if self._skill_exist_in_backend():
-            try:
-                # update settings
-                self.settings = self._get_settings()
-                skill_identity = self._get_skill_identity()
-                for skill_setting in self.settings:
-                    if skill_setting['identifier'] == skill_identity:
-                        sections = skill_setting['skillMetadata']['sections']
-                        for section in sections:
-                            for field in section["fields"]:
-                                self.__setitem__(field["name"], field["value"])
-
-                # store value if settings has changed from backend
-                if not self._is_stored:
-                    self.store()
-                    self.loaded_hash = hash(str(self))
-
-            except Exception as e:
-                logger.error(e)
-
-            # poll backend every 60 seconds for new settings
-            Timer(60, self._poll_skill_settings).start()
+        self.settings = remote
+        skill_identity = self._get_skill_identity()
+        for skill_setting in remote:
+            if skill_setting['identifier'] == skill_identity:
+                sections = skill_setting['skillMetadata']['sections']
+                for section in sections:
+                    for field in section["fields"]:
+                        self.__setitem__(field["name"], field["value"])
+
+        # store value if settings has changed from backend
+        self.store()
+
+    def stop_sync(self):
+        """ Stop updating these settings from the backend """
+        self.sync.unregister(self)
 
     def _get_skill_identity(self):
         """
@@ -161,6 +247,7 @@ class SkillSettings(dict):
                     json_data = json.load(f)
                     for key in json_data:
                         self.__setitem__(key, json_data[key])
+                    self._mark_stored()
                 except Exception as e:
                     # TODO: Show error on webUI.  Dev will have to fix
                     # metadata to be able to edit later.
@@ -168,12 +255,10 @@ class SkillSettings(dict):
 
     def _get_settings(self):
         """
-            Get skill settings for this device from backend
+            Get skill settings for this device from backend, shared with
+            the other skills
         """
-        return self.api.request({
-            "method": "GET",
-            "path": self._api_path
-        })
+        return self.sync.get_settings()
 
     def _put_metadata(self, settings_meta):
         """
@@ -186,9 +271,55 @@ class SkillSettings(dict):
             "json": settings_meta
         })
 
-    def store(self):
+    def store(self, force=False):
+        """
+            Store dictionary to file if it changed, cancelling a pending
+            store_later()
+
+            Args:
+                force (bool): write even if nothing changed
+
+            Returns:
+                bool: True if the file was written
+        """
+        with self._store_lock:
+            if self._store_timer is not None:
+                self._store_timer.cancel()
+                self._store_timer = None
+            with _pending_lock:
+                _pending[:] = [s for s in _pending if s is not self]
+            if not force and isfile(self._settings_path) and \
+                    not self._changed_keys():
+                return False
+            self._write()
+            self._mark_stored()
+            return True
+
+    def store_later(self):
+        """
+            Store dictionary to file once the debounce window passed,
+            changes made meanwhile are written together
+        """
+        if self.debounce <= 0:
+            self.store()
+            return
+        with self._store_lock:
+            if self._store_timer is not None:
+                return
+            self._store_timer = Timer(self.debounce, self.store)
+            self._store_timer.daemon = True
+            self._store_timer.start()
+            with _pending_lock:
+                _pending.append(self)
+
+    def _write(self):
         """
-            Store dictionary to file
+            Write to a temporary file renamed over the settings file, so a
+            crash never leaves a truncated file
         """
-        with open(self._settings_path, 'w') as f:
+        tmp_path = self._settings_path + ".tmp"
+        with open(tmp_path, 'w') as f:
             json.dump(self, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.rename(tmp_path, self._settings_path)
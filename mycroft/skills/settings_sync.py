@@ -0,0 +1,147 @@
+# Copyright 2017 Mycroft AI, Inc.
+#
+# This file is part of Mycroft Core.
+#
+# Mycroft Core is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Mycroft Core is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Mycroft Core.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+    Skill settings sync
+
+    The backend returns the settings of every skill of the device in one
+    request, so a single thread fetches them once per interval and hands
+    them to each SkillSettings with a settingsmeta.json.
+"""
+
+import time
+from threading import Thread, Event, Lock
+
+from mycroft.api import DeviceApi
+from mycroft.configuration import ConfigurationManager
+from mycroft.util.log import getLogger
+
+logger = getLogger(__name__)
+
+
+class SettingsSync(object):
+    """
+        Args:
+            api (DeviceApi): backend api
+            interval (float): seconds between fetches
+            max_backoff (float): longest wait after failed fetches
+    """
+    def __init__(self, api, interval=60, max_backoff=900):
+        self.api = api
+        self.interval = interval
+        self.max_backoff = max_backoff
+        self.skills = []  # registered SkillSettings
+        self.lock = Lock()
+        self.remote = None  # last fetched settings of the device skills
+        self.fetched = 0
+        self.delay = interval
+        self.stopped = Event()
+        self.thread = None
+
+    def fetch(self):
+        """ GET the settings of every skill of the device """
+        remote = self.api.request({
+            "method": "GET",
+            "path": "/" + self.api.identity.uuid + "/skill"
+        })
+        self.remote = remote
+        self.fetched = time.time()
+        return remote
+
+    def get_settings(self):
+        """
+            Settings of every skill of the device, fetched at most once per
+            interval however many skills ask for them
+
+            Returns:
+                list: skill settings, None if the backend can't be reached
+        """
+        with self.lock:
+            if self.remote is not None and \
+                    time.time() - self.fetched < self.interval:
+                return self.remote
+            try:
+                return self.fetch()
+            except Exception as e:
+                logger.error("Could not get skill settings: " + str(e))
+                return None
+
+    def register(self, settings):
+        """ Keep a SkillSettings in sync, starting the sync thread """
+        with self.lock:
+            if not any(s is settings for s in self.skills):
+                self.skills.append(settings)
+            if self.thread is None:
+                self.thread = Thread(target=self._run)
+                self.thread.daemon = True
+                self.thread.start()
+
+    def unregister(self, settings):
+        with self.lock:
+            # SkillSettings are dicts, compare them by identity
+            self.skills = [s for s in self.skills if s is not settings]
+
+    def sync(self):
+        """
+            Fetch the settings once and update every registered skill
+
+            Returns:
+                bool: False if the fetch failed
+        """
+        with self.lock:
+            try:
+                remote = self.fetch()
+            except Exception as e:
+                logger.error("Could not get skill settings: " + str(e))
+                return False
+            skills = list(self.skills)
+        for settings in skills:
+            try:
+                settings.update_remote(remote)
+            except Exception as e:
+                logger.error("Could not update skill settings: " + str(e))
+        return True
+
+    def _run(self):
+        while not self.stopped.wait(self.delay):
+            if not self.skills:
+                continue
+            if self.sync():
+                self.delay = self.interval
+            else:
+                # back off while the backend fails
+                self.delay = min(self.delay * 2, self.max_backoff)
+
+    def stop(self):
+        self.stopped.set()
+
+
+_settings_sync = None
+_settings_sync_lock = Lock()
+
+
+def get_settings_sync():
+    """ The SettingsSync shared by all the skills of the process """
+    global _settings_sync
+    with _settings_sync_lock:
+        if _settings_sync is None:
+            config = ConfigurationManager.get().get(
+                "skills", {}).get("settings_sync", {})
+            _settings_sync = SettingsSync(DeviceApi(),
+                                          config.get("interval", 60),
+                                          config.get("max_backoff", 900))
+        return _settings_sync
@@ -0,0 +1,131 @@
+# Copyright 2017 Mycroft AI, Inc.
+#
+# This file is part of Mycroft Core.
+#
+# Mycroft Core is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Mycroft Core is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Mycroft Core.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+    What was recorded about each skill on a previous run, kept in a file
+    with a fingerprint of the skill folder. Entries of skills that changed
+    since are not used.
+
+    The intent snapshot and the lazy skill manifest are stored this way.
+"""
+
+import hashlib
+import json
+import os
+from os.path import join, exists, isdir, dirname
+from threading import Lock
+
+from mycroft.util.log import getLogger
+
+logger = getLogger(__name__)
+
+SOURCE_EXTENSIONS = ('.py',)
+# every file of these folders decides what a skill registers
+REGISTRATION_FOLDERS = ['vocab', 'regex']
+
+
+def skill_fingerprint(skill_dir):
+    """
+        Fingerprint of the files that decide what a skill registers, every
+        python module of the skill and its vocab and regex folders.
+
+        Args:
+            skill_dir (str): path to the skill folder
+
+        Returns:
+            str: hex digest, None if the skill folder does not exist
+    """
+    if not isdir(skill_dir):
+        return None
+    paths = []
+    for root, dirs, files in os.walk(skill_dir):
+        dirs[:] = [d for d in dirs if not d.startswith('.')]
+        folder = os.path.relpath(root, skill_dir).split(os.sep)[0]
+        paths += [join(root, f) for f in files
+                  if f.endswith(SOURCE_EXTENSIONS) or
+                  folder in REGISTRATION_FOLDERS]
+    md5 = hashlib.md5()
+    for path in sorted(paths):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        md5.update("%s %d %d\n" % (path[len(skill_dir):],
+                                   stat.st_mtime, stat.st_size))
+    return md5.hexdigest()
+
+
+class SkillCache(object):
+    """
+        Entries of every skill keyed by skill folder, each with the
+        "fingerprint" of the skill when it was recorded
+
+        Args:
+            path (str): file the entries are saved to
+    """
+    version = 1
+
+    def __init__(self, path):
+        self.path = path
+        self.skills = {}
+        self.lock = Lock()  # skills are recorded from other threads
+
+    def load(self):
+        """ Read the file, a missing or broken file is empty """
+        self.skills = {}
+        if not exists(self.path):
+            return self.skills
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+            if data.get("version") == self.version:
+                self.skills = data.get("skills", {})
+        except Exception as e:
+            logger.error("Could not read " + self.path + ": " + str(e))
+        return self.skills
+
+    def save(self):
+        """ Write the file, replacing the old one atomically """
+        if not exists(dirname(self.path)):
+            os.makedirs(dirname(self.path))
+        tmp_path = self.path + ".tmp"
+        with self.lock:
+            with open(tmp_path, 'w') as f:
+                json.dump({"version": self.version, "skills": self.skills},
+                          f)
+            os.rename(tmp_path, self.path)
+
+    def valid_skills(self, skills_dir, blacklist=None):
+        """
+            Entries of the skills that did not change since recorded.
+
+            Args:
+                skills_dir (str): folder with the skills
+                blacklist (list): skill folders that will not be loaded
+
+            Returns:
+                dict: {skill_folder: entry}
+        """
+        blacklist = blacklist or []
+        valid = {}
+        for folder, skill in self.skills.iteritems():
+            if folder in blacklist:
+                continue
+            fingerprint = skill_fingerprint(join(skills_dir, folder))
+            if fingerprint and fingerprint == skill.get("fingerprint"):
+                valid[folder] = skill
+        return valid
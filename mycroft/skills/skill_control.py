@@ -0,0 +1,95 @@
+# Copyright 2017 Mycroft AI, Inc.
+#
+# This file is part of Mycroft Core.
+#
+# Mycroft Core is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Mycroft Core is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Mycroft Core.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+    Dispatch of skill addressed control messages
+
+    enable_intent and disable_intent are handled once per process and
+    handed to the skill owning the intent, found through an index of the
+    registered intents, instead of to every skill. The target is the
+    "skill_id" of the message, the "skill_id:" prefix of the intent name,
+    or else every skill that registered an intent of that name.
+"""
+
+from threading import Lock
+
+from mycroft.util.log import getLogger
+
+logger = getLogger(__name__)
+
+
+class SkillControl(object):
+    def __init__(self):
+        self.emitter = None
+        self.lock = Lock()
+        self.skills = {}  # skill_id: skill
+        self.intents = {}  # intent name: [skill]
+
+    def bind(self, emitter):
+        """ Listen to the control messages on emitter, once per process """
+        if self.emitter is not None:
+            return
+        self.emitter = emitter
+        emitter.on('enable_intent', self.handle_enable_intent)
+        emitter.on('disable_intent', self.handle_disable_intent)
+
+    def add_intent(self, skill, name):
+        """ Index an intent registered by skill """
+        with self.lock:
+            self.skills[str(skill.skill_id)] = skill
+            skills = self.intents.setdefault(name, [])
+            if not any(s is skill for s in skills):
+                skills.append(skill)
+
+    def remove(self, skill):
+        """ Remove a skill being shut down from the index """
+        with self.lock:
+            skill_id = str(skill.skill_id)
+            if self.skills.get(skill_id) is skill:
+                del self.skills[skill_id]
+            for name in list(self.intents):
+                skills = [s for s in self.intents[name] if s is not skill]
+                if skills:
+                    self.intents[name] = skills
+                else:
+                    del self.intents[name]
+
+    def get_targets(self, message):
+        """
+            Returns:
+                list: (skill, intent name) the message is addressed to
+        """
+        name = message.data.get("intent_name", "")
+        skill_id = message.data.get("skill_id")
+        if skill_id is None and ":" in name:
+            skill_id, name = name.split(":", 1)
+        with self.lock:
+            if skill_id is not None:
+                skill = self.skills.get(str(skill_id))
+                return [(skill, name)] if skill else []
+            return [(owner, name) for owner in self.intents.get(name, [])]
+
+    def handle_enable_intent(self, message):
+        for skill, name in self.get_targets(message):
+            skill.enable_intent(name)
+
+    def handle_disable_intent(self, message):
+        for skill, name in self.get_targets(message):
+            skill.disable_intent(name)
+
+
+skill_control = SkillControl()
@@ -0,0 +1,423 @@
+# Copyright 2017 Mycroft AI, Inc.
+#
+# This file is part of Mycroft Core.
+#
+# Mycroft Core is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Mycroft Core is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Mycroft Core.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+    Skill groups run in worker processes supervised by the skills service.
+
+    CPU bound skills get their own interpreter, so they do not hold the
+    GIL of the skills service. Each worker loads the skills of its group
+    with the skill ids given by the skills service and handles the reload,
+    shutdown and converse requests of those skills. The supervisor restarts
+    workers that exit and keeps the status each worker reports.
+
+    Fallback skills are refused by the workers: the fallback chain runs in
+    the skills service, so their handlers would never be called. The skills
+    service loads refused skills itself.
+
+    Worker usage:
+        python -m mycroft.skills.skill_group --group 0 --dir SKILLS_DIR \
+            3:service_RBM 7:service_deep_dream
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from os.path import join, exists, dirname
+from threading import Thread, Event, Lock
+
+from mycroft.messagebus.client.ws import WebsocketClient
+from mycroft.messagebus.message import Message
+from mycroft.skills.core import load_skill, create_skill_descriptor, \
+    FallbackSkill
+from mycroft.skills.skill_control import skill_control
+from mycroft.util.log import getLogger
+
+logger = getLogger(__name__)
+
+
+def assign_groups(skills, workers, groups=None, costs=None):
+    """
+        Spread skills over worker groups, the most costly skills first, each
+        to the group with the lowest cost so far.
+
+        Args:
+            skills (list): skill folders to assign
+            workers (int): number of groups
+            groups (list): skill folders pinned to each group
+            costs (dict): measured CPU seconds of each skill folder, skills
+                          without a measure cost the average
+
+        Returns:
+            list: skill folders of each group
+    """
+    workers = max(1, workers)
+    groups = groups or []
+    costs = costs or {}
+    default = sum(costs.values()) / len(costs) if costs else 1.0
+    assigned = [[] for _ in range(workers)]
+    totals = [0.0] * workers
+    for index, pinned in enumerate(groups[:workers]):
+        for folder in pinned:
+            if folder in skills:
+                assigned[index].append(folder)
+                totals[index] += costs.get(folder, default)
+    free = [f for f in skills if not any(f in g for g in assigned)]
+    for folder in sorted(free, key=lambda f: (-costs.get(f, default), f)):
+        index = totals.index(min(totals))
+        assigned[index].append(folder)
+        totals[index] += costs.get(folder, default)
+    return assigned
+
+
+class SkillGroupProcess(object):
+    """
+        Worker process of one skill group, seen from the supervisor
+
+        Args:
+            index (int): group number
+            skills (list): [(skill_id, skill folder)] of the group
+            skills_dir (str): folder containing the skills
+    """
+    def __init__(self, index, skills, skills_dir):
+        self.index = index
+        self.skills = skills
+        self.skills_dir = skills_dir
+        self.process = None
+        self.started = 0
+        self.restarts = 0
+
+    def start(self):
+        args = [sys.executable, '-m', 'mycroft.skills.skill_group',
+                '--group', str(self.index), '--dir', self.skills_dir]
+        args += ['%d:%s' % (skill_id, folder)
+                 for skill_id, folder in self.skills]
+        self.process = subprocess.Popen(args)
+        self.started = time.time()
+        logger.info("Started skill group %d, pid %d: %s" %
+                    (self.index, self.process.pid,
+                     ", ".join(f for _, f in self.skills)))
+
+    def is_running(self):
+        return self.process is not None and self.process.poll() is None
+
+    def stop(self):
+        if self.is_running():
+            self.process.terminate()
+            self.process.wait()
+
+
+class SkillGroupSupervisor(object):
+    """
+        Starts the worker processes of the skill groups and restarts them
+        when they exit.
+
+        Args:
+            emitter: messagebus emitter
+            skills_dir (str): folder containing the skills
+            config (dict): "skill_groups" section of the skills config
+    """
+    def __init__(self, emitter, skills_dir, config):
+        self.emitter = emitter
+        self.skills_dir = skills_dir
+        self.config = config
+        self.restart_delay = config.get("restart_delay", 2)
+        self.costs_path = os.path.expanduser(
+            config.get("costs", "~/.jarbas/skill_costs.json"))
+        self.costs = self.load_costs()
+        self.groups = []
+        self.status = {}  # {group: [{"folder", "id", "name", "loaded"}]}
+        self.lock = Lock()
+        self.stopped = Event()
+        self.emitter.on("skills.group.status", self.handle_status)
+        self.emitter.on("skills.group.refused", self.handle_refused)
+
+    def load_costs(self):
+        try:
+            with open(self.costs_path) as f:
+                return json.load(f)
+        except (IOError, ValueError):
+            return {}
+
+    def save_costs(self):
+        try:
+            if not exists(dirname(self.costs_path)):
+                os.makedirs(dirname(self.costs_path))
+            with open(self.costs_path, 'w') as f:
+                json.dump(self.costs, f)
+        except Exception as e:
+            logger.error("Could not save skill costs: " + str(e))
+
+    def start(self, skills):
+        """
+            Start the worker processes
+
+            Args:
+                skills (dict): {skill folder: skill id} of the skills to run
+                               in worker processes
+        """
+        assigned = assign_groups(sorted(skills),
+                                 self.config.get("workers", 2),
+                                 self.config.get("groups"), self.costs)
+        for index, folders in enumerate(assigned):
+            if folders:
+                group = SkillGroupProcess(
+                    index, [(skills[f], f) for f in folders],
+                    self.skills_dir)
+                group.start()
+                self.groups.append(group)
+        thread = Thread(target=self._supervise)
+        thread.daemon = True
+        thread.start()
+        return dict((f, group.index) for group in self.groups
+                    for _, f in group.skills)
+
+    def _supervise(self):
+        while not self.stopped.wait(1):
+            for group in self.groups:
+                if group.is_running() or self.stopped.is_set():
+                    continue
+                code = group.process.returncode
+                with self.lock:
+                    self.status.pop(group.index, None)
+                # back off when a group keeps crashing right after starting
+                if time.time() - group.started > 60:
+                    group.restarts = 0
+                delay = min(self.restart_delay * 2 ** group.restarts, 60)
+                group.restarts += 1
+                logger.error("Skill group %d exited with code %s, "
+                             "restarting in %d seconds" %
+                             (group.index, code, delay))
+                if self.stopped.wait(delay):
+                    return
+                group.start()
+                self.emitter.emit(Message("skills.group.restarted",
+                                          {"group": group.index,
+                                           "exit_code": code}))
+
+    def handle_status(self, message):
+        group = message.data.get("group")
+        skills = message.data.get("skills", [])
+        with self.lock:
+            self.status[group] = skills
+        changed = False
+        for skill in skills:
+            if skill.get("cpu") is not None:
+                self.costs[skill["folder"]] = skill["cpu"]
+                changed = True
+        if changed:
+            self.save_costs()
+
+    def handle_refused(self, message):
+        """ Do not start a refused skill again when its worker restarts """
+        folder = message.data.get("skill_folder")
+        for group in self.groups:
+            if group.index == message.data.get("group"):
+                group.skills = [(i, f) for i, f in group.skills
+                                if f != folder]
+
+    def get_skills(self):
+        """ Last reported status of every skill run by a worker """
+        with self.lock:
+            return [s for skills in self.status.values() for s in skills]
+
+    def stop(self):
+        self.stopped.set()
+        for group in self.groups:
+            group.stop()
+
+
+def _cpu_time():
+    times = os.times()
+    return times[0] + times[1]
+
+
+class SkillGroup(object):
+    """
+        Worker process loading the skills of one group
+
+        Args:
+            args (list): command line arguments
+    """
+    def __init__(self, args):
+        params = self.__build_params(args)
+        self.group = params.group
+        self.skills_dir = params.dir
+        self.skills = {}  # {skill id: {"folder", "instance", "cpu"}}
+        for skill in params.skills:
+            skill_id, folder = skill.split(":", 1)
+            self.skills[int(skill_id)] = {"folder": folder,
+                                          "instance": None, "cpu": None}
+        self.parent = os.getppid()
+        self.ws = WebsocketClient()
+        skill_control.bind(self.ws)
+
+    @staticmethod
+    def __build_params(args):
+        parser = argparse.ArgumentParser()
+        parser.add_argument("--group", type=int, default=0)
+        parser.add_argument("--dir", required=True)
+        parser.add_argument("skills", nargs='*')
+        return parser.parse_args(args)
+
+    def load_skill(self, skill_id):
+        skill = self.skills[skill_id]
+        start = _cpu_time()
+        skill["instance"] = load_skill(create_skill_descriptor(
+            join(self.skills_dir, skill["folder"])), self.ws, skill_id)
+        skill["cpu"] = round(_cpu_time() - start, 3)
+        data = {"skill": skill_id, "skill_folder": skill["folder"]}
+        if isinstance(skill["instance"], FallbackSkill):
+            self.refuse_skill(skill_id)
+        elif skill["instance"]:
+            self.ws.emit(Message("skill.loaded", data))
+        else:
+            self.ws.emit(Message("skill.loaded.fail", data))
+
+    def refuse_skill(self, skill_id):
+        """ Hand a fallback skill back to the skills service """
+        skill = self.skills.pop(skill_id)
+        logger.error(skill["folder"] + " is a fallback skill, it can not "
+                     "run in a skill group")
+        skill["instance"].shutdown()
+        self.ws.emit(Message("skills.group.refused",
+                             {"group": self.group, "skill": skill_id,
+                              "skill_folder": skill["folder"]}))
+
+    def shutdown_skill(self, skill_id):
+        instance = self.skills[skill_id]["instance"]
+        if instance:
+            instance.shutdown()
+            self.skills[skill_id]["instance"] = None
+
+    def load_skills(self):
+        for skill_id in sorted(self.skills):
+            self.load_skill(skill_id)
+        self.emit_status()
+
+    def emit_status(self):
+        skills = []
+        for skill_id, skill in self.skills.items():
+            instance = skill["instance"]
+            skills.append({"folder": skill["folder"], "id": skill_id,
+                           "name": instance.name if instance else
+                           "unloaded",
+                           "loaded": instance is not None,
+                           "cpu": skill["cpu"]})
+        self.ws.emit(Message("skills.group.status",
+                             {"group": self.group, "skills": skills}))
+
+    def get_skill_id(self, message):
+        try:
+            skill_id = int(message.data.get("skill_id"))
+        except (TypeError, ValueError):
+            return None
+        return skill_id if skill_id in self.skills else None
+
+    def handle_reload_request(self, message):
+        skill_id = self.get_skill_id(message)
+        if skill_id is None:
+            return
+        instance = self.skills[skill_id]["instance"]
+        if instance and not instance.external_reload:
+            self.ws.emit(Message("reload_skill_response",
+                                 {"status": "forbidden",
+                                  "skill_id": skill_id}))
+            return
+        self.ws.emit(Message("reload_skill_response",
+                             {"status": "reloading", "skill_id": skill_id}))
+        self.shutdown_skill(skill_id)
+        self.load_skill(skill_id)
+        self.emit_status()
+
+    def handle_shutdown_request(self, message):
+        skill_id = self.get_skill_id(message)
+        if skill_id is None:
+            return
+        instance = self.skills[skill_id]["instance"]
+        if instance and not instance.external_shutdown:
+            status = "forbidden"
+        else:
+            self.shutdown_skill(skill_id)
+            status = "shutdown"
+        self.ws.emit(Message("shutdown_skill_response",
+                             {"status": status, "skill_id": skill_id}))
+        self.emit_status()
+
+    def handle_conversation_request(self, message):
+        skill_id = self.get_skill_id(message)
+        if skill_id is None:
+            return
+        result = False
+        instance = self.skills[skill_id]["instance"]
+        if instance:
+            try:
+                instance.handle_update_message_context(message)
+                result = instance.converse(message.data["utterances"],
+                                           message.data["lang"])
+            except Exception:
+                logger.error("Converse method malformed for skill " +
+                             str(skill_id), exc_info=True)
+        self.ws.emit(message.reply("skill.converse.response", {
+            "skill_id": skill_id if instance else 0, "result": result,
+            "request_id": message.data.get("request_id")}))
+
+    def watch_parent(self):
+        """ Exit when the skills service that started this worker dies """
+        while os.getppid() == self.parent:
+            time.sleep(1)
+        logger.info("Skills service exited, stopping skill group " +
+                    str(self.group))
+        self.stop()
+        os._exit(0)
+
+    def run(self):
+        thread = Thread(target=self.watch_parent)
+        thread.daemon = True
+        thread.start()
+        self.ws.once('open', self.load_skills)
+        self.ws.on('reload_skill_request', self.handle_reload_request)
+        self.ws.on('shutdown_skill_request', self.handle_shutdown_request)
+        self.ws.on('skill.converse.request',
+                   self.handle_conversation_request)
+        self.ws.on('skills.group.status.request',
+                   lambda message: self.emit_status())
+        self.ws.run_forever()
+
+    def stop(self):
+        for skill_id in self.skills:
+            try:
+                self.shutdown_skill(skill_id)
+            except Exception:
+                logger.error("Failed to shutdown skill " + str(skill_id),
+                             exc_info=True)
+
+
+def main():
+    group = SkillGroup(sys.argv[1:])
+    try:
+        group.run()
+    except KeyboardInterrupt:
+        group.stop()
+    finally:
+        sys.exit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+# Copyright 2017 Mycroft AI, Inc.
+#
+# This file is part of Mycroft Core.
+#
+# Mycroft Core is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Mycroft Core is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Mycroft Core.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+    Loads skills concurrently while respecting the order they depend on.
+
+    A skill can declare the skills it must be loaded after by listing their
+    folder names, one per line, in a load_after.txt file in its folder, or
+    in the "load_after" section of the skills configuration.
+"""
+
+from multiprocessing.pool import ThreadPool
+from os.path import join, isfile
+from threading import Condition
+
+from mycroft.util.log import getLogger
+
+logger = getLogger(__name__)
+
+LOAD_AFTER_FILE = "load_after.txt"
+
+
+def read_load_after(skill_path):
+    """ Read the skill folders a skill declares it must load after """
+    path = join(skill_path, LOAD_AFTER_FILE)
+    if not isfile(path):
+        return []
+    with open(path) as f:
+        return [line.strip() for line in f
+                if line.strip() and not line.startswith("#")]
+
+
+class SkillLoader(object):
+    """
+        Runs a load function for a set of skill folders in a thread pool.
+        A skill starts loading only once every skill it depends on, that is
+        part of the same set, finished loading.
+
+        Args:
+            load (callable): function loading a skill folder
+            workers (int): number of skills loaded at the same time
+    """
+    def __init__(self, load, workers=4):
+        self.load = load
+        self.workers = max(1, workers)
+
+    def load_all(self, folders, dependencies=None):
+        """
+            Load folders, dependencies maps a folder to the folders it must
+            be loaded after. Returns when every folder was loaded.
+        """
+        dependencies = dependencies or {}
+        pending = set(folders)
+        waiting_for = {}
+        for folder in pending:
+            deps = set(dependencies.get(folder, [])) - set([folder])
+            waiting_for[folder] = deps & pending
+        done = set()
+        running = set()
+        cond = Condition()
+        pool = ThreadPool(min(self.workers, len(pending) or 1))
+
+        def run(folder):
+            try:
+                self.load(folder)
+            except Exception:
+                logger.exception("Failed to load " + folder)
+            finally:
+                with cond:
+                    running.discard(folder)
+                    done.add(folder)
+                    cond.notify()
+
+        try:
+            with cond:
+                while pending or running:
+                    ready = [f for f in sorted(pending)
+                             if waiting_for[f] <= done]
+                    if not ready and not running:
+                        # circular dependency, break it on the first one
+                        folder = sorted(pending)[0]
+                        logger.warning("Circular load_after dependency for " +
+                                       folder + ": " +
+                                       str(sorted(waiting_for[folder])))
+                        ready = [folder]
+                    for folder in ready:
+                        pending.remove(folder)
+                        running.add(folder)
+                        pool.apply_async(run, (folder,))
+                    if running:
+                        cond.wait()
+        finally:
+            # every load finished, the workers exit on their own
+            pool.close()
@@ -0,0 +1,363 @@
+# Copyright 2017 Mycroft AI, Inc.
+#
+# This file is part of Mycroft Core.
+#
+# Mycroft Core is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Mycroft Core is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Mycroft Core.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+    Installs and updates the skills cloned from git
+
+    The skill repos are updated by a bounded pool of workers. A repo is
+    only fetched when the branch on its remote moved, checked with a
+    single git ls-remote, and repos with local changes are left alone.
+    The skills index, the .gitmodules of the mycroft-skills repo, is kept
+    on disk for a time to live.
+
+    Usage:
+        python -m mycroft.skills.skill_manager install <url or name>
+        python -m mycroft.skills.skill_manager list
+        python -m mycroft.skills.skill_manager update
+        python -m mycroft.skills.skill_manager default
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from multiprocessing.pool import ThreadPool
+from os.path import basename, exists, isdir, isfile, join, expanduser, \
+    dirname
+from threading import Lock
+
+import requests
+
+from mycroft.util.log import getLogger
+
+logger = getLogger(__name__)
+
+SKILLS_INDEX = "https://raw.githubusercontent.com/MycroftAI/" \
+               "mycroft-skills/master/.gitmodules"
+DEFAULT_SKILLS = ["alarm", "audio-record", "configuration", "date-time",
+                  "desktop-launcher", "ip", "joke", "hello-world", "media",
+                  "npr-news", "naptime", "pairing", "personal", "reminder",
+                  "installer", "singing", "speak", "spelling", "stop",
+                  "stock", "volume", "weather", "wiki", "wolfram-alpha",
+                  "mark1-demo", "playback-control"]
+DEFAULT_SKILL_URL = "https://github.com/MycroftAI/skill-%s.git"
+
+# states of a skill after update_skill()
+UPDATED = "updated"
+UNCHANGED = "unchanged"
+MODIFIED = "modified"  # local changes, not updated
+FAILED = "failed"
+
+# pip installs are not safe to run at once in the same environment
+pip_lock = Lock()
+
+
+class GitError(Exception):
+    pass
+
+
+def git(args, cwd=None):
+    """ Run git, returns its output or raises GitError """
+    try:
+        return subprocess.check_output(["git"] + args, cwd=cwd,
+                                       stderr=subprocess.STDOUT)
+    except subprocess.CalledProcessError as e:
+        raise GitError("git %s failed: %s" % (args[0], e.output.strip()))
+
+
+def parse_gitmodules(text):
+    """
+        Returns:
+            dict: {submodule name: url}
+    """
+    skills = {}
+    name = None
+    for line in text.splitlines():
+        line = line.strip()
+        match = re.match(r'\[submodule\s+"(.*)"\]', line)
+        if match:
+            name = match.group(1)
+        elif name and line.startswith("url"):
+            skills[name] = line.split("=", 1)[1].strip()
+    return skills
+
+
+def repo_folder(url):
+    """ Folder a repo is cloned to, its name without .git """
+    name = basename(url.rstrip("/"))
+    return name[:-4] if name.endswith(".git") else name
+
+
+class SkillsIndex(object):
+    """
+        Names and urls of the known skills, kept in path for ttl seconds
+
+        Args:
+            url (str): .gitmodules listing the skills
+            path (str): file the index is cached to, None to not cache it
+            ttl (float): seconds before the index is downloaded again
+            fetch (callable): returns the text at an url
+    """
+    def __init__(self, url=SKILLS_INDEX, path=None, ttl=3600, fetch=None):
+        self.url = url
+        self.path = expanduser(path) if path else None
+        self.ttl = ttl
+        self.fetch = fetch or self._fetch
+        self.lock = Lock()
+        self.skills = None
+        self.fetched = 0
+
+    @staticmethod
+    def _fetch(url):
+        response = requests.get(url, timeout=10)
+        response.raise_for_status()
+        return response.text
+
+    def _load(self):
+        if not self.path or not isfile(self.path):
+            return
+        try:
+            with open(self.path) as f:
+                cached = json.load(f)
+        except Exception as e:
+            logger.error("Could not load the skills index: " + str(e))
+            return
+        if cached.get("url") == self.url:
+            self.skills = cached["skills"]
+            self.fetched = cached["time"]
+
+    def _save(self):
+        if not self.path:
+            return
+        if not exists(dirname(self.path)):
+            os.makedirs(dirname(self.path))
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"url": self.url, "time": self.fetched,
+                       "skills": self.skills}, f)
+        os.rename(tmp_path, self.path)
+
+    def get(self):
+        """
+            Returns:
+                dict: {name: url}, an outdated index if it can't be
+                      downloaded
+        """
+        with self.lock:
+            if self.skills is None:
+                self._load()
+            if self.skills is None or time.time() - self.fetched > self.ttl:
+                try:
+                    self.skills = parse_gitmodules(self.fetch(self.url))
+                    self.fetched = time.time()
+                    self._save()
+                except Exception as e:
+                    if self.skills is None:
+                        raise
+                    logger.warning("Using an outdated skills index: " +
+                                   str(e))
+            return dict(self.skills)
+
+    def search(self, name):
+        """
+            Returns:
+                list: names of the skills matching name, the exact match,
+                      with or without the skill- prefix, alone if there is
+                      one
+        """
+        skills = self.get()
+        name = name.lower()
+        exact = [s for s in skills if s.lower() in (name, "skill-" + name)]
+        return exact or sorted(s for s in skills if name in s.lower())
+
+
+class SkillManager(object):
+    """
+        Args:
+            skills_dir (str): folder the skills are cloned to
+            index (SkillsIndex): index to resolve skill names with
+            workers (int): repos updated or installed at once
+            branch (str): branch the skills follow
+    """
+    def __init__(self, skills_dir, index=None, workers=4, branch="master"):
+        self.skills_dir = skills_dir
+        self.index = index or SkillsIndex()
+        self.workers = workers
+        self.branch = branch
+
+    def get_repos(self):
+        """ Folders of the skills cloned with git """
+        return sorted(f for f in os.listdir(self.skills_dir)
+                      if isdir(join(self.skills_dir, f, ".git")))
+
+    def update_skill(self, folder):
+        """
+            Fetch and reset the skill to its remote branch if it moved
+
+            Returns:
+                str: UPDATED, UNCHANGED, MODIFIED or FAILED
+        """
+        path = join(self.skills_dir, folder)
+        try:
+            if git(["status", "--porcelain"], path).strip():
+                return MODIFIED
+            remote = git(["ls-remote", "origin", "refs/heads/" + self.branch],
+                         path).split()
+            if not remote:
+                raise GitError("no branch " + self.branch + " on origin")
+            if remote[0] == git(["rev-parse", "HEAD"], path).strip():
+                return UNCHANGED
+            git(["fetch", "origin", self.branch], path)
+            git(["reset", "--hard", "origin/" + self.branch], path)
+            return UPDATED
+        except Exception as e:
+            logger.error("Could not update " + folder + ": " + str(e))
+            return FAILED
+
+    def resolve(self, name_or_url):
+        """ Url of a skill, looked up in the index unless it is one """
+        if re.match(r"(git@|https?://|file://|/)", name_or_url):
+            return name_or_url
+        matches = self.index.search(name_or_url)
+        if not matches:
+            raise ValueError("Skill not found: " + name_or_url)
+        if len(matches) > 1:
+            raise ValueError("Multiple skills match " + name_or_url + ": " +
+                             ", ".join(matches))
+        return self.index.get()[matches[0]]
+
+    def install(self, name_or_url):
+        """
+            Clone a skill and install its requirements
+
+            Returns:
+                str: folder of the skill
+        """
+        url = self.resolve(name_or_url)
+        folder = repo_folder(url)
+        path = join(self.skills_dir, folder)
+        if exists(path):
+            return folder
+        git(["clone", "-b", self.branch, url, path])
+        requirements = join(path, "requirements.txt")
+        if isfile(requirements):
+            with pip_lock:
+                subprocess.check_call([sys.executable, "-m", "pip",
+                                       "install", "-r", requirements])
+        logger.info("Installed " + folder)
+        return folder
+
+    def _map(self, func, items):
+        if not items:
+            return []
+        pool = ThreadPool(min(self.workers, len(items)))
+        try:
+            return pool.map(func, items)
+        finally:
+            pool.close()
+            pool.join()
+
+    def _install(self, url):
+        try:
+            return self.install(url)
+        except Exception as e:
+            logger.error("Could not install " + url + ": " + str(e))
+            return None
+
+    def update_all(self, urls=None):
+        """
+            Install the skills of urls missing from the skills folder and
+            update every cloned skill
+
+            Returns:
+                dict: {"installed", "updated", "unchanged", "modified",
+                       "failed": [folders], "duration"}
+        """
+        start = time.time()
+        summary = {"installed": [], UPDATED: [], UNCHANGED: [],
+                   MODIFIED: [], FAILED: []}
+        missing = [u for u in urls or []
+                   if not exists(join(self.skills_dir, repo_folder(u)))]
+        for url, folder in zip(missing, self._map(self._install, missing)):
+            if folder:
+                summary["installed"].append(folder)
+            else:
+                summary[FAILED].append(repo_folder(url))
+        repos = [f for f in self.get_repos()
+                 if f not in summary["installed"]]
+        for folder, state in zip(repos, self._map(self.update_skill, repos)):
+            summary[state].append(folder)
+        summary["duration"] = time.time() - start
+        return summary
+
+    def install_defaults(self, names=None):
+        """ update_all() installing the default skills """
+        return self.update_all([DEFAULT_SKILL_URL % n
+                                for n in names or DEFAULT_SKILLS])
+
+
+def main():
+    from mycroft import MYCROFT_ROOT_PATH
+    from mycroft.configuration import ConfigurationManager
+
+    parser = argparse.ArgumentParser(description="Mycroft Skill Manager")
+    parser.add_argument("command",
+                        choices=["install", "list", "update", "default"])
+    parser.add_argument("skill", nargs="?",
+                        help="git url or name of the skill to install")
+    args = parser.parse_args()
+
+    skills_config = ConfigurationManager.instance().get("skills")
+    config = skills_config.get("skill_manager", {})
+    skills_dir = skills_config.get("directory", "default")
+    if skills_dir == "default":
+        skills_dir = join(MYCROFT_ROOT_PATH, "jarbas_skills")
+    index = SkillsIndex(config.get("index_url", SKILLS_INDEX),
+                        config.get("index_cache"),
+                        config.get("index_ttl", 3600))
+    manager = SkillManager(skills_dir, index, config.get("workers", 4),
+                           config.get("branch", "master"))
+
+    if args.command == "install":
+        if not args.skill:
+            parser.error("You must pass the git url or skill name")
+        try:
+            print("Installed " + manager.install(args.skill))
+        except ValueError as e:
+            print(e)
+            return 2
+    elif args.command == "list":
+        print("\n".join(sorted(index.get())))
+    else:
+        if args.command == "default":
+            summary = manager.install_defaults(
+                config.get("default_skills"))
+        else:
+            summary = manager.update_all()
+        for state in ["installed", UPDATED, MODIFIED, FAILED]:
+            if summary[state]:
+                print(state + ": " + ", ".join(summary[state]))
+        if summary[FAILED]:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
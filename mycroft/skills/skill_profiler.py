@@ -0,0 +1,170 @@
+# Copyright 2017 Mycroft AI, Inc.
+#
+# This file is part of Mycroft Core.
+#
+# Mycroft Core is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Mycroft Core is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Mycroft Core.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+    Sampling profiler of a running skill
+
+    Samples the stacks of the executor threads of a skill at a fixed
+    interval, so only the time spent in its handlers is seen and the skill
+    runs at full speed between samples. Idle executor threads are not
+    counted. The stacks are saved folded, one "frame;frame count" line per
+    stack, for flamegraph.pl.
+"""
+
+import os
+import sys
+import time
+from os.path import basename, dirname, exists, join
+from threading import Thread, Event
+
+from mycroft.util.log import getLogger
+
+logger = getLogger(__name__)
+
+WORKER = "_work"  # executor method running the jobs of the threads
+
+
+def frame_name(frame):
+    code = frame.f_code
+    return "%s:%s:%d" % (basename(code.co_filename), code.co_name,
+                         frame.f_lineno)
+
+
+def job_stack(frame):
+    """
+        Frames of the job run by an executor thread, outermost first, None
+        if the thread waits for a job
+    """
+    stack = []
+    while frame is not None and frame.f_code.co_name != WORKER:
+        stack.append(frame)
+        frame = frame.f_back
+    if frame is None or not stack:
+        return None
+    stack.reverse()
+    job = stack[0].f_code
+    if job.co_name == "get" and \
+            basename(job.co_filename).startswith("Queue."):
+        return None
+    return [frame_name(f) for f in stack]
+
+
+class SkillProfiler(object):
+    """
+        Args:
+            skill: MycroftSkill to profile
+            interval (float): seconds between samples
+            duration (float): seconds before stopping by itself, 0 to run
+                              until stopped
+            on_stop (callable): called with the profiler once stopped
+    """
+    def __init__(self, skill, interval=0.005, duration=30, on_stop=None):
+        self.skill = skill
+        self.interval = interval
+        self.duration = duration
+        self.on_stop = on_stop
+        self.stacks = {}  # folded stack: samples
+        self.samples = 0  # samples taken, idle ones included
+        self.started = None
+        self.stopped = None
+        self.finished = Event()
+        self.thread = None
+
+    def start(self):
+        self.started = time.time()
+        self.thread = Thread(target=self._run,
+                             name="profile-" + self.skill.name)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def sample(self):
+        idents = set(t.ident for t in list(self.skill.executor.threads))
+        frames = sys._current_frames()
+        self.samples += 1
+        for ident in idents:
+            stack = job_stack(frames.get(ident))
+            if stack:
+                folded = ";".join(stack)
+                self.stacks[folded] = self.stacks.get(folded, 0) + 1
+
+    def _run(self):
+        end = self.started + self.duration if self.duration else None
+        while not self.finished.wait(self.interval):
+            if end and time.time() >= end:
+                break
+            try:
+                self.sample()
+            except Exception as e:
+                logger.error("Could not sample " + self.skill.name + ": " +
+                             str(e))
+                break
+        self.stopped = time.time()
+        self.finished.set()
+        if self.on_stop:
+            self.on_stop(self)
+
+    def stop(self):
+        """ Stop sampling, on_stop is called by the sampling thread """
+        self.finished.set()
+        if self.thread:
+            self.thread.join()
+
+    def report(self, top=20):
+        """
+            Returns:
+                dict: {"name", "duration", "interval", "samples", "busy",
+                       "functions": [{"function", "self", "total"}]}, busy
+                      being the samples with a handler running and
+                      functions the ones seen in most samples, self counts
+                      the samples they were the innermost frame of
+        """
+        self_samples = {}
+        total_samples = {}
+        busy = 0
+        for folded, count in self.stacks.items():
+            busy += count
+            frames = [f.rsplit(":", 1)[0] for f in folded.split(";")]
+            leaf = frames[-1]
+            self_samples[leaf] = self_samples.get(leaf, 0) + count
+            for function in set(frames):
+                total_samples[function] = \
+                    total_samples.get(function, 0) + count
+        functions = sorted(total_samples, key=lambda f: (
+            -total_samples[f], -self_samples.get(f, 0), f))
+        return {"name": self.skill.name,
+                "duration": (self.stopped or time.time()) -
+                (self.started or time.time()),
+                "interval": self.interval, "samples": self.samples,
+                "busy": busy,
+                "functions": [{"function": f,
+                               "self": self_samples.get(f, 0),
+                               "total": total_samples[f]}
+                              for f in functions[:top]]}
+
+    def save(self, path):
+        """ Write the folded stacks, prefixed with the skill name """
+        if not exists(dirname(path)):
+            os.makedirs(dirname(path))
+        with open(path, "w") as f:
+            for folded, count in sorted(self.stacks.items()):
+                f.write("%s;%s %d\n" % (self.skill.name, folded, count))
+        return path
+
+
+def profile_path(directory, skill_name):
+    return join(os.path.expanduser(directory), "%s-%d.folded" % (
+        skill_name.replace(" ", "_"), time.time()))
@@ -0,0 +1,151 @@
+# Copyright 2017 Mycroft AI, Inc.
+#
+# This file is part of Mycroft Core.
+#
+# Mycroft Core is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Mycroft Core is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Mycroft Core.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+    Watches the skills folder for changes to skill sources.
+
+    Uses inotify through pyinotify when it is installed, otherwise falls
+    back to polling the modification times of skill files. In both cases
+    files and folders matching the ignore globs, such as data and model
+    folders of skills, are never looked at.
+"""
+
+import os
+from fnmatch import fnmatch
+from os.path import join, relpath, isdir
+from threading import Event, Lock
+import time
+
+from mycroft.util.log import getLogger
+
+logger = getLogger(__name__)
+
+DEFAULT_IGNORE = ["*.pyc", "*.pyo", ".*", "*/.*", "settings.json",
+                  "*.log", "*.tmp"]
+
+
+class PollingWatcher(object):
+    """
+        Computes the last modification of a skill by walking its folder,
+        skipping ignored files and folders.
+
+        Args:
+            skills_dir (str): folder containing the skills
+            ignore (list): glob patterns of paths, relative to skills_dir,
+                           or of file names to ignore
+            interval (float): seconds between polls
+    """
+    def __init__(self, skills_dir, ignore=None, interval=2):
+        self.skills_dir = skills_dir
+        self.ignore = DEFAULT_IGNORE + list(ignore or [])
+        self.interval = interval
+        self.stopped = Event()
+
+    def is_ignored(self, path):
+        """ Check a path, absolute or relative to the skills folder """
+        if os.path.isabs(path):
+            path = relpath(path, self.skills_dir)
+        name = os.path.basename(path)
+        return any(fnmatch(path, p) or fnmatch(name, p) for p in self.ignore)
+
+    def get_last_modified(self, skill_folder):
+        path = join(self.skills_dir, skill_folder)
+        last_date = 0
+        for root, dirs, files in os.walk(path):
+            dirs[:] = [d for d in dirs if not self.is_ignored(join(root, d))]
+            for f in files:
+                if self.is_ignored(join(root, f)):
+                    continue
+                try:
+                    last_date = max(last_date, os.path.getmtime(join(root, f)))
+                except OSError:
+                    pass  # removed while walking
+        return last_date
+
+    def wait(self, timeout=None):
+        """ Wait until the next scan should happen """
+        self.stopped.wait(self.interval if timeout is None else timeout)
+
+    def stop(self):
+        self.stopped.set()
+
+
+class InotifyWatcher(PollingWatcher):
+    """
+        Tracks the last modification of each skill from inotify events.
+        Nothing is read from disk unless something changed.
+    """
+    def __init__(self, skills_dir, ignore=None, interval=2):
+        super(InotifyWatcher, self).__init__(skills_dir, ignore, interval)
+        import pyinotify
+        self.last_modified = {}  # {skill_folder: time of last change}
+        self.lock = Lock()
+        self.changed = Event()
+        mask = pyinotify.IN_CREATE | pyinotify.IN_DELETE | \
+            pyinotify.IN_MODIFY | pyinotify.IN_MOVED_FROM | \
+            pyinotify.IN_MOVED_TO | pyinotify.IN_CLOSE_WRITE
+        self.manager = pyinotify.WatchManager()
+        self.notifier = pyinotify.ThreadedNotifier(self.manager,
+                                                   self._handle_event)
+        self.notifier.daemon = True
+        self.notifier.start()
+        self.manager.add_watch(skills_dir, mask, rec=True, auto_add=True,
+                               exclude_filter=self.is_ignored)
+
+    def _handle_event(self, event):
+        if self.is_ignored(event.pathname):
+            return
+        path = relpath(event.pathname, self.skills_dir)
+        skill_folder = path.split(os.sep)[0]
+        if skill_folder in ('.', '..'):
+            return
+        with self.lock:
+            self.last_modified[skill_folder] = time.time()
+        self.changed.set()
+
+    def get_last_modified(self, skill_folder):
+        with self.lock:
+            return self.last_modified.get(skill_folder, 0)
+
+    def wait(self, timeout=None):
+        """ Wait until something changed or the timeout passed """
+        self.changed.wait(self.interval if timeout is None else timeout)
+        self.changed.clear()
+
+    def stop(self):
+        super(InotifyWatcher, self).stop()
+        self.notifier.stop()
+
+
+def create_watcher(skills_dir, config=None):
+    """
+        Create a watcher for the skills folder, using inotify if available.
+
+        Args:
+            skills_dir (str): folder containing the skills
+            config (dict): "watcher" section of the skills configuration
+    """
+    config = config or {}
+    ignore = config.get("ignore", [])
+    interval = config.get("interval", 2)
+    if config.get("inotify", True) and isdir(skills_dir):
+        try:
+            return InotifyWatcher(skills_dir, ignore, interval)
+        except Exception as e:
+            logger.warning("inotify not available, polling skills "
+                           "instead: " + str(e))
+    return PollingWatcher(skills_dir, ignore, interval)
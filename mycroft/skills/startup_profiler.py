@@ -0,0 +1,220 @@
+# Copyright 2017 Mycroft AI, Inc.
+#
+# This file is part of Mycroft Core.
+#
+# Mycroft Core is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Mycroft Core is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Mycroft Core.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+    Startup profiler
+
+    Times the import, data files loading and initialize of every skill
+    loaded on startup and the memory each one adds. The registration
+    messages sent meanwhile are counted and timed, that time is part of
+    the data files loading and initialize. The report is emitted as
+    skills.startup.report and saved as JSON, with a folded stacks file
+    next to it for flamegraph.pl.
+
+    Skills load concurrently, so memory deltas of skills loading at the
+    same time overlap, set load_workers to 1 for exact numbers.
+
+    Print the top offenders of the last startup:
+        python -m mycroft.skills.startup_profiler [--top 10] \
+            [--sort total] [report.json]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from os.path import dirname, exists, expanduser, splitext
+from threading import Lock
+
+from mycroft.util.log import getLogger
+
+logger = getLogger(__name__)
+
+DEFAULT_REPORT = "~/.jarbas/startup_profile.json"
+REGISTRATION_TYPES = ["register_vocab", "register_intent",
+                      "padatious:register_intent"]
+# registration time is spent within load_data and initialize
+PHASES = ["import", "load_data", "initialize"]
+
+try:
+    PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+except (AttributeError, ValueError, OSError):
+    PAGE_SIZE = 4096
+
+
+def get_rss():
+    """ Resident memory of this process in bytes, None if unknown """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+    except (IOError, IndexError, ValueError):
+        return None
+
+
+class SkillProfile(object):
+    """ Timings of one skill, in seconds """
+    def __init__(self, name, skill_id):
+        self.name = name
+        self.skill_id = skill_id
+        self.phases = dict((phase, 0.0) for phase in PHASES)
+        self.phases["registration"] = 0.0
+        self.registrations = 0
+        self.start_time = time.time()
+        self.total = 0.0
+        self.rss_start = get_rss()
+        self.rss_delta = None
+        self.loaded = False
+
+    def add(self, phase, seconds):
+        self.phases[phase] += seconds
+
+    def finish(self, loaded):
+        self.total = time.time() - self.start_time
+        self.loaded = loaded
+        rss = get_rss()
+        if rss is not None and self.rss_start is not None:
+            self.rss_delta = rss - self.rss_start
+
+    def serialize(self):
+        data = {"name": self.name, "skill_id": self.skill_id,
+                "start": self.start_time, "total": self.total,
+                "registrations": self.registrations,
+                "rss_delta": self.rss_delta, "loaded": self.loaded}
+        data.update(self.phases)
+        return data
+
+
+class ProfilingEmitter(object):
+    """
+        Emitter given to a skill while it loads, times the registration
+        messages the skill sends until the profile is finished.
+    """
+    def __init__(self, emitter, profile):
+        self.emitter = emitter
+        self.profile = profile
+
+    def __getattr__(self, name):
+        return getattr(self.emitter, name)
+
+    def emit(self, message):
+        profile = self.profile
+        if profile is None or message.type not in REGISTRATION_TYPES:
+            return self.emitter.emit(message)
+        start = time.time()
+        try:
+            return self.emitter.emit(message)
+        finally:
+            profile.registrations += 1
+            profile.add("registration", time.time() - start)
+
+
+class StartupProfiler(object):
+    """
+        Collects the profiles of the skills loaded until stop is called
+
+        Args:
+            path (str): where the report is saved
+    """
+    def __init__(self, path=DEFAULT_REPORT):
+        self.path = expanduser(path)
+        self.active = True
+        self.lock = Lock()
+        self.started = time.time()
+        self.profiles = []
+
+    def start(self, name, skill_id):
+        """ Start the profile of a skill, None once profiling stopped """
+        if not self.active:
+            return None
+        profile = SkillProfile(name, skill_id)
+        with self.lock:
+            self.profiles.append(profile)
+        return profile
+
+    def report(self):
+        with self.lock:
+            skills = [p.serialize() for p in self.profiles]
+        skills.sort(key=lambda s: -s["total"])
+        return {"started": self.started,
+                "duration": time.time() - self.started,
+                "skills": skills}
+
+    def stop(self):
+        """ Stop profiling, save and return the report """
+        self.active = False
+        report = self.report()
+        try:
+            self.save(report)
+        except Exception as e:
+            logger.error("Could not save startup profile: " + str(e))
+        return report
+
+    def save(self, report):
+        if not exists(dirname(self.path)):
+            os.makedirs(dirname(self.path))
+        with open(self.path, "w") as f:
+            json.dump(report, f, indent=2)
+        # folded stacks, in microseconds: skills;name;phase count
+        with open(splitext(self.path)[0] + ".folded", "w") as f:
+            for skill in report["skills"]:
+                other = skill["total"] - sum(skill[p] for p in PHASES)
+                for phase, seconds in [(p, skill[p]) for p in PHASES] + \
+                        [("other", other)]:
+                    if seconds > 0:
+                        f.write("skills;%s;%s %d\n" % (
+                            skill["name"], phase, seconds * 1000000))
+
+
+def format_report(report, top=10, sort="total"):
+    """ Table of the skills that took the most time or memory """
+    skills = sorted(report["skills"], key=lambda s: -(s.get(sort) or 0))
+    lines = ["Startup took %.2f s, %d skills" %
+             (report["duration"], len(report["skills"])),
+             "%-30s %8s %8s %8s %8s %8s %6s %8s" %
+             ("skill", "total", "import", "data", "init", "regist", "count",
+              "rss MB")]
+    for skill in skills[:top]:
+        rss = skill["rss_delta"]
+        lines.append("%-30s %8.3f %8.3f %8.3f %8.3f %8.3f %6d %8s" % (
+            skill["name"][:30], skill["total"], skill["import"],
+            skill["load_data"], skill["initialize"], skill["registration"],
+            skill["registrations"],
+            "%.1f" % (rss / 1048576.0) if rss is not None else "-"))
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Print the skills slowing down startup")
+    parser.add_argument("report", nargs="?", default=DEFAULT_REPORT)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--sort", default="total",
+                        choices=["total", "registration", "registrations",
+                                 "rss_delta"] + PHASES)
+    args = parser.parse_args()
+    try:
+        with open(expanduser(args.report)) as f:
+            report = json.load(f)
+    except (IOError, ValueError) as e:
+        print("Could not read " + args.report + ": " + str(e))
+        sys.exit(1)
+    print(format_report(report, args.top, args.sort))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+    Dialog rendering benchmark.
+
+    Renders dialogs of mycroft/res/text the way mycroft.dialog.get did
+    before the dialog cache, resolving and reading the file and parsing
+    the template on every call, then through mycroft.dialog.get, and
+    reports the time per call of both.
+
+    Usage:
+        python -m test.integrationtests.skills.dialog_render_benchmark \
+            [lang] [repetitions]
+"""
+import os
+import sys
+import time
+from os.path import join, dirname, abspath
+
+import pystache
+
+from mycroft import dialog
+from mycroft.util import resolve_resource_file
+
+TEXT_DIR = abspath(join(dirname(__file__), '..', '..', '..', 'mycroft',
+                        'res', 'text'))
+CONTEXT = {'skill': 'weather', 'name': 'Mycroft'}
+
+
+def get_uncached(phrase, lang):
+    filename = resolve_resource_file("text/" + lang + "/" + phrase +
+                                     ".dialog")
+    with open(filename) as f:
+        templates = [line.strip() for line in f]
+    return pystache.render(templates[0], CONTEXT)
+
+
+def get_cached(phrase, lang):
+    return dialog.get(phrase, lang, CONTEXT)
+
+
+def main():
+    lang = sys.argv[1] if len(sys.argv) > 1 else 'en-us'
+    repetitions = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    phrases = [os.path.splitext(f)[0]
+               for f in sorted(os.listdir(join(TEXT_DIR, lang)))
+               if f.endswith('.dialog')]
+    results = []
+    for name, get in [('uncached', get_uncached), ('cached', get_cached)]:
+        for phrase in phrases:  # fills the cache, not timed
+            get(phrase, lang)
+        start = time.time()
+        for i in range(repetitions):
+            for phrase in phrases:
+                get(phrase, lang)
+        elapsed = (time.time() - start) / (repetitions * len(phrases))
+        results.append(elapsed)
+        print('%-8s %d dialogs: %.1f us per render' %
+              (name, len(phrases), elapsed * 1000000))
+    print('speedup: %.1fx' % (results[0] / results[1]))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,173 @@
+"""
+    Intent matching benchmark over all bundled skills.
+
+    Loads every skill of the skills folder into a real IntentService
+    through an emitter that only lets the intent service subscribe to
+    messages, so skill handlers never run. A labeled utterance corpus,
+    intent_corpus.json plus the test/intent/*.intent.json files of the
+    skills, is then replayed against the intent engine and the latency
+    percentiles, trie size, memory and accuracy are reported.
+
+    Skills that fail to load (usually missing optional dependencies) are
+    listed and their utterances skipped.
+
+    Usage:
+        python -m test.integrationtests.skills.intent_benchmark \
+            [skills folder] [repetitions]
+"""
+import json
+import sys
+import time
+from glob import glob
+from os.path import join, dirname, basename, abspath
+
+import psutil
+from pyee import EventEmitter
+
+from mycroft.skills.core import load_skill
+from mycroft.skills.intent_service import IntentService
+from mycroft.util.parse import normalize
+from test.integrationtests.skills.skill_tester import get_skills
+
+SKILLS_DIR = abspath(join(dirname(__file__), '..', '..', '..',
+                          'jarbas_skills'))
+CORPUS = join(dirname(__file__), 'intent_corpus.json')
+
+
+class RegistrationOnlyEmitter(object):
+    """
+        Emitter delivering messages synchronously, once closed only the
+        handlers already subscribed, those of the IntentService, are kept.
+    """
+    def __init__(self):
+        self.emitter = EventEmitter()
+        self.closed = False
+
+    def on(self, event, f):
+        if not self.closed:
+            self.emitter.on(event, f)
+
+    def once(self, event, f):
+        if not self.closed:
+            self.emitter.once(event, f)
+
+    def remove(self, event_name, func):
+        pass
+
+    def emit(self, message):
+        self.emitter.emit(message.type, message)
+
+
+def load_corpus(skills_dir):
+    with open(CORPUS) as f:
+        corpus = json.load(f)
+    for path in glob(join(skills_dir, '*', 'test', 'intent', '*.intent.json')):
+        with open(path) as f:
+            example = json.load(f)
+        corpus.append({'utterance': example['utterance'],
+                       'intent_type': example['intent_type'],
+                       'skill': basename(dirname(dirname(dirname(path))))})
+    return corpus
+
+
+def percentile(values, p):
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(p / 100.0 * (len(values) - 1))))
+    return values[index]
+
+
+def count_trie_nodes(node):
+    count = 1
+    stack = list(node.children.values())
+    while stack:
+        child = stack.pop()
+        count += 1
+        stack += child.children.values()
+    return count
+
+
+class IntentBenchmark(object):
+    def __init__(self, skills_dir):
+        self.skills_dir = skills_dir
+        self.process = psutil.Process()
+        self.emitter = RegistrationOnlyEmitter()
+        self.service = IntentService(self.emitter)
+        self.emitter.closed = True
+        self.skill_ids = {}  # {skill folder: skill id}
+        self.failed = []
+
+    def load_skills(self):
+        rss = self.process.memory_info().rss
+        start = time.time()
+        skill_id = 0
+        for descriptor in get_skills(self.skills_dir):
+            skill_id += 1
+            if load_skill(descriptor, self.emitter, skill_id):
+                self.skill_ids[descriptor['name']] = skill_id
+            else:
+                self.failed.append(descriptor['name'])
+        return time.time() - start, self.process.memory_info().rss - rss
+
+    def determine(self, utterance):
+        session = self.service.context_manager.get_session()
+        for intent in self.service.engine.determine_intent(
+                normalize(utterance, 'en-us'), 100, include_tags=True,
+                context_manager=session):
+            return intent.get('intent_type')
+        return None
+
+    def run(self, corpus, repetitions):
+        latencies = []
+        correct = 0
+        tested = 0
+        errors = []
+        for example in corpus:
+            skill_id = self.skill_ids.get(example['skill'])
+            if skill_id is None:
+                continue
+            expected = str(skill_id) + ':' + example['intent_type']
+            for _ in range(repetitions):
+                start = time.time()
+                intent_type = self.determine(example['utterance'])
+                latencies.append(time.time() - start)
+            tested += 1
+            if intent_type == expected:
+                correct += 1
+            else:
+                errors.append((example['utterance'], expected, intent_type))
+        return latencies, tested, correct, errors
+
+
+def main():
+    skills_dir = sys.argv[1] if len(sys.argv) > 1 else SKILLS_DIR
+    repetitions = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    benchmark = IntentBenchmark(skills_dir)
+    load_time, load_rss = benchmark.load_skills()
+    corpus = load_corpus(skills_dir)
+    latencies, tested, correct, errors = benchmark.run(corpus, repetitions)
+    engine = benchmark.service.engine
+
+    print "skills loaded: %d in %.2f s, failed: %d" % (
+        len(benchmark.skill_ids), load_time, len(benchmark.failed))
+    if benchmark.failed:
+        print "  failed: " + ", ".join(sorted(benchmark.failed))
+    print "trie nodes: %d, regex entities: %d, intent parsers: %d" % (
+        count_trie_nodes(engine.trie.root),
+        len(engine.regular_expressions_entities), len(engine.intent_parsers))
+    print "rss: %.1f MB, loading skills added %.1f MB" % (
+        benchmark.process.memory_info().rss / 1048576.0,
+        load_rss / 1048576.0)
+    print "utterances: %d tested, %d skipped" % (
+        tested, len(corpus) - tested)
+    if latencies:
+        print "latency ms: p50 %.2f, p90 %.2f, p99 %.2f, max %.2f" % tuple(
+            percentile(latencies, p) * 1000 for p in [50, 90, 99, 100])
+    if tested:
+        print "accuracy: %.1f%% (%d/%d)" % (100.0 * correct / tested,
+                                            correct, tested)
+    for utterance, expected, actual in errors:
+        print "  '%s': expected %s, got %s" % (utterance, expected, actual)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+    Time to first intent of the IntentService, replaying registrations
+    versus restoring them from an intent snapshot.
+
+    Registers the vocab and regex files of every skill the way the skill
+    loader does, plus one intent per vocab keyword standing in for the
+    intents skills build in code, then measures how long a new
+    IntentService takes until it can match an utterance.
+
+    Usage:
+        python -m test.integrationtests.skills.intent_snapshot_benchmark \
+            [skills folder]
+"""
+import os
+import sys
+import tempfile
+import time
+from os.path import join, dirname, isdir, splitext
+
+from adapt.intent import IntentBuilder
+
+from mycroft.messagebus.message import Message
+from mycroft.skills.core import load_vocabulary, load_regex
+from mycroft.skills.intent_service import IntentService
+from mycroft.skills.intent_snapshot import IntentSnapshot
+
+SKILLS_DIR = join(dirname(__file__), '..', '..', '..', 'jarbas_skills')
+
+
+class DirectEmitter(object):
+    """ Delivers messages synchronously to the IntentService """
+    def __init__(self):
+        self.handlers = {}
+
+    def on(self, event, f):
+        self.handlers.setdefault(event, []).append(f)
+
+    def emit(self, message):
+        for handler in self.handlers.get(message.type, []):
+            handler(message)
+
+
+def create_service(skills_dir, snapshot_path):
+    service = IntentService(DirectEmitter())
+    service.skills_dir = skills_dir
+    service.snapshot = IntentSnapshot(snapshot_path)
+    return service
+
+
+def replay(service, skills_dir):
+    emitter = service.emitter
+    skill_id = 0
+    for folder in sorted(os.listdir(skills_dir)):
+        vocab_dir = join(skills_dir, folder, 'vocab', 'en-us')
+        if not isdir(vocab_dir):
+            continue
+        skill_id += 1
+        data = {'skill_id': skill_id, 'skill_folder': folder}
+        load_vocabulary(vocab_dir, emitter, data)
+        regex_dir = join(skills_dir, folder, 'regex', 'en-us')
+        if isdir(regex_dir):
+            load_regex(regex_dir, emitter, data)
+        for voc in os.listdir(vocab_dir):
+            keyword = splitext(voc)[0]
+            intent = IntentBuilder(str(skill_id) + ':' + keyword + 'Intent')
+            intent = dict(intent.require(keyword).build().__dict__)
+            intent.update(data)
+            emitter.emit(Message('register_intent', intent))
+
+
+def first_intent(service, utterance):
+    for _ in service.engine.determine_intent(utterance, 100):
+        return True
+    return False
+
+
+def main():
+    skills_dir = sys.argv[1] if len(sys.argv) > 1 else SKILLS_DIR
+    snapshot_path = join(tempfile.mkdtemp(), 'intent_snapshot.json')
+    utterance = 'what is the weather like'
+
+    start = time.time()
+    service = create_service(skills_dir, snapshot_path)
+    replay(service, skills_dir)
+    matched = first_intent(service, utterance)
+    replay_time = time.time() - start
+    service.snapshot_timer.cancel()
+    service.save_snapshot()
+    print "replaying registrations: %.3f s (matched: %s)" % (
+        replay_time, matched)
+
+    start = time.time()
+    service = create_service(skills_dir, snapshot_path)
+    service.restore_snapshot()
+    matched = first_intent(service, utterance)
+    restore_time = time.time() - start
+    print "restoring snapshot of %d skills: %.3f s (matched: %s)" % (
+        len(service.restored), restore_time, matched)
+
+
+if __name__ == "__main__":
+    main()
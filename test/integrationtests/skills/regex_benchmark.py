@@ -0,0 +1,86 @@
+"""
+    Benchmark of regex entity tagging with the regexes of all skills.
+
+    Loads every .rx file of the skills folder, plus the amount regex
+    ScheduledCRUDSkill registers for each scheduled skill, and tags a set
+    of utterances with adapt's EntityTagger and with the
+    PrefilteredEntityTagger used by the IntentService. Both must produce
+    the same tags.
+
+    Usage:
+        python -m test.integrationtests.skills.regex_benchmark \
+            [skills folder] [repetitions]
+"""
+import re
+import sys
+import time
+from glob import glob
+from os.path import join, dirname
+
+from adapt.entity_tagger import EntityTagger
+from adapt.tools.text.tokenizer import EnglishTokenizer
+from adapt.tools.text.trie import Trie
+
+from mycroft.skills.entity_tagger import PrefilteredEntityTagger
+
+SKILLS_DIR = join(dirname(__file__), '..', '..', '..', 'jarbas_skills')
+
+UTTERANCES = [
+    "what time is it",
+    "what is the weather like in lisbon",
+    "tell me about the history of portugal",
+    "spell the word necessary",
+    "remind me to call mom in 20 minutes",
+    "set an alarm for 7 30 in the morning",
+    "restart skill with id 12",
+    "go to run level dev",
+    "send facebook chat message hello there my friend",
+    "scroll down 10 clicks",
+    "search wikipedia for the meaning of life and tell me about it",
+    "what does wikipedia say about douglas adams and his books",
+]
+
+
+def load_regexes(skills_dir):
+    regexes = []
+    for path in sorted(glob(join(skills_dir, '*', 'regex', 'en-us', '*.rx'))):
+        with open(path) as f:
+            regexes += [l.strip() for l in f.readlines() if l.strip()]
+    for skill in ['Alarm', 'Reminder', 'Event', 'Timer']:
+        regexes.append("(?P<" + skill + "Amount>\d+)")
+    unique = []
+    for regex in regexes:
+        if regex not in unique:
+            unique.append(regex)
+    return [re.compile(r, re.IGNORECASE) for r in unique]
+
+
+def run(tagger, utterances, repetitions):
+    start = time.time()
+    for _ in range(repetitions):
+        tags = [tagger.tag(u) for u in utterances]
+    return (time.time() - start) / (repetitions * len(utterances)), tags
+
+
+def main():
+    skills_dir = sys.argv[1] if len(sys.argv) > 1 else SKILLS_DIR
+    repetitions = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    regexes = load_regexes(skills_dir)
+    tokenizer = EnglishTokenizer()
+    trie = Trie()
+    adapt_tagger = EntityTagger(trie, tokenizer, regexes)
+    prefiltered = PrefilteredEntityTagger(trie, tokenizer, regexes)
+    by_word, unfiltered = prefiltered._get_index()
+
+    print "regexes: %d, indexed by first word: %d, unfiltered: %d" % (
+        len(regexes), len(regexes) - len(unfiltered), len(unfiltered))
+    adapt_time, adapt_tags = run(adapt_tagger, UTTERANCES, repetitions)
+    print "adapt tagger: %.2f ms per utterance" % (adapt_time * 1000)
+    fast_time, fast_tags = run(prefiltered, UTTERANCES, repetitions)
+    print "prefiltered tagger: %.2f ms per utterance" % (fast_time * 1000)
+    print "speedup: %.1fx" % (adapt_time / fast_time)
+    print "same tags: " + str(adapt_tags == fast_tags)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+    Resource loading benchmark.
+
+    Reads the vocab, regex and dialog files of every skill of the skills
+    folder the way MycroftSkill.load_data_files does without the resource
+    cache, then from cached resource bundles, and reports the time taken
+    by both.
+
+    Usage:
+        python -m test.integrationtests.skills.resource_bundle_benchmark \
+            [skills folder] [repetitions]
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+from os.path import join, dirname, abspath, isfile
+
+from mycroft.dialog import DialogLoader
+from mycroft.skills.core import load_vocabulary, load_regex, register_vocab, \
+    register_regex
+from mycroft.skills.resource_bundle import ResourceCache
+
+SKILLS_DIR = abspath(join(dirname(__file__), '..', '..', '..',
+                          'jarbas_skills'))
+LANG = 'en-us'
+
+
+class CountingEmitter(object):
+    def __init__(self):
+        self.count = 0
+
+    def emit(self, message):
+        self.count += 1
+
+
+def load_files(skill_dir, emitter):
+    dialog_dir = join(skill_dir, 'dialog', LANG)
+    if os.path.exists(dialog_dir):
+        DialogLoader().load(dialog_dir)
+    vocab_dir = join(skill_dir, 'vocab', LANG)
+    if os.path.exists(vocab_dir):
+        load_vocabulary(vocab_dir, emitter)
+    regex_dir = join(skill_dir, 'regex', LANG)
+    if os.path.exists(regex_dir):
+        load_regex(regex_dir, emitter)
+
+
+def load_bundle(cache, skill_dir, emitter):
+    bundle = cache.load(skill_dir, LANG)
+    if bundle['dialog_dir']:
+        DialogLoader().load_templates(bundle['dialog'])
+    register_vocab(bundle['vocab'], emitter)
+    register_regex(bundle['regex'], emitter)
+
+
+def main():
+    skills_dir = sys.argv[1] if len(sys.argv) > 1 else SKILLS_DIR
+    repetitions = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    skill_dirs = [join(skills_dir, f) for f in sorted(os.listdir(skills_dir))
+                  if isfile(join(skills_dir, f, '__init__.py'))]
+    cache_dir = tempfile.mkdtemp()
+    cache = ResourceCache(cache_dir)
+    try:
+        results = []
+        for name, load in [('files', load_files),
+                           ('bundles', lambda d, e: load_bundle(cache, d, e))]:
+            emitter = CountingEmitter()
+            start = time.time()
+            load(skill_dirs[0], emitter)  # builds the bundles, not timed
+            for skill_dir in skill_dirs:
+                load(skill_dir, emitter)
+            emitter.count = 0
+            start = time.time()
+            for i in range(repetitions):
+                for skill_dir in skill_dirs:
+                    load(skill_dir, emitter)
+            elapsed = (time.time() - start) / repetitions
+            results.append(elapsed)
+            print('%-8s %d skills, %d registrations: %.1f ms per load' %
+                  (name, len(skill_dirs), emitter.count / repetitions,
+                   elapsed * 1000))
+        print('speedup: %.1fx' % (results[0] / results[1]))
+    finally:
+        shutil.rmtree(cache_dir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""
+    Skill loading boot time benchmark.
+
+    Loads every skill of the skills folder through the startup loading of
+    the skills service, priority skills first, and reports the wall clock
+    time and the resident memory afterwards. Each run is made in its own
+    process so modules imported by one run do not speed up the next.
+
+    With --lazy two more runs are made with lazy loading, the first one
+    records the skill manifest and the second one only imports the skills
+    that can not be loaded on first use.
+
+    Usage:
+        python -m test.integrationtests.skills.skill_load_benchmark \
+            [skills folder] [workers, ...] [--lazy]
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from os.path import join, dirname, abspath
+from threading import Lock
+
+import psutil
+
+import mycroft.skills.main as skills_main
+from mycroft.skills.intent_service import IntentService
+from mycroft.skills.skill_watcher import PollingWatcher
+from test.integrationtests.skills.intent_benchmark import \
+    RegistrationOnlyEmitter
+
+SKILLS_DIR = abspath(join(dirname(__file__), '..', '..', '..',
+                          'jarbas_skills'))
+MANIFEST = join(tempfile.gettempdir(), 'skill_load_benchmark.json')
+
+
+class LockedEmitter(RegistrationOnlyEmitter):
+    """ Delivers one message at a time, as skills load concurrently """
+    def __init__(self):
+        super(LockedEmitter, self).__init__()
+        self.lock = Lock()
+
+    def remove(self, event, f):
+        self.emitter.remove_listener(event, f)
+
+    def emit(self, message):
+        with self.lock:
+            super(LockedEmitter, self).emit(message)
+
+
+def run(skills_dir, workers, lazy):
+    emitter = LockedEmitter()
+    IntentService(emitter)
+    emitter.closed = True
+
+    skills_main.ws = emitter
+    skills_main.SKILLS_DIR = skills_dir
+    skills_main.LOAD_WORKERS = workers
+    skills_main.LAZY_CONFIG = {'enabled': lazy, 'eager_skills': []}
+    skills_main.skill_manifest.path = MANIFEST
+    skills_main.skill_watcher = PollingWatcher(skills_dir)
+    for skill_id, folder in enumerate(sorted(os.listdir(skills_dir))):
+        skills_main.loaded_skills[folder] = {
+            'id': skill_id + 1, 'loaded': False, 'do_not_reload': False,
+            'do_not_load': False, 'reload_request': False,
+            'shutdown': False}
+
+    start = time.time()
+    skills_main.load_startup_skills()
+    elapsed = time.time() - start
+    skills = skills_main.loaded_skills.values()
+    loaded = len([s for s in skills if s.get('instance')])
+    deferred = len([s for s in skills if s.get('lazy')])
+    failed = len([s for s in skills if s['loaded'] and
+                  not s.get('instance') and not s.get('lazy')])
+    rss = psutil.Process(os.getpid()).memory_info().rss / 1024.0 / 1024.0
+    print('workers: %d loaded: %d deferred: %d failed: %d boot time: %.2f s '
+          'rss: %.1f MB' % (workers, loaded, deferred, failed, elapsed, rss))
+
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    lazy = '--lazy' in sys.argv
+    skills_dir = args[0] if args else SKILLS_DIR
+    workers = [int(w) for w in args[1:]] or [1, 4]
+    if '--run' in sys.argv:
+        run(skills_dir, workers[0], lazy)
+        return
+
+    def call(count, *flags):
+        subprocess.call([sys.executable, '-m',
+                         'test.integrationtests.skills.skill_load_benchmark',
+                         skills_dir, str(count), '--run'] + list(flags))
+
+    for count in workers:
+        call(count)
+    if lazy:
+        # the first run records the manifest the second one uses
+        if os.path.exists(MANIFEST):
+            os.remove(MANIFEST)
+        call(workers[-1], '--lazy')
+        call(workers[-1], '--lazy')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+"""
+    Load test for the utterance pipeline of the IntentService.
+
+    Pushes many recognizer_loop:utterance messages from distinct sources
+    at once into a real IntentService and reports throughput. Every
+    session has an active skill whose converse takes a while to answer,
+    so sessions only finish quickly if they are handled concurrently.
+
+    Usage:
+        python -m test.integrationtests.skills.utterance_load \
+            [sessions] [utterances per session] [converse delay]
+"""
+import sys
+import time
+from multiprocessing.pool import ThreadPool
+from threading import Event, Lock
+
+from adapt.intent import IntentBuilder
+from pyee import EventEmitter
+
+from mycroft.messagebus.message import Message
+from mycroft.skills.intent_service import IntentService
+
+
+class ThreadedEmitter(object):
+    """ Dispatches messages on a thread pool, like the websocket client """
+    def __init__(self, workers=10):
+        self.emitter = EventEmitter()
+        self.pool = ThreadPool(workers)
+
+    def on(self, event, f):
+        self.emitter.on(event, f)
+
+    def once(self, event, f):
+        self.emitter.once(event, f)
+
+    def remove(self, event_name, func):
+        self.emitter.remove_listener(event_name, func)
+
+    def emit(self, message):
+        self.pool.apply_async(self.emitter.emit, (message.type, message))
+
+
+class UtteranceLoad(object):
+    def __init__(self, sessions, utterances, converse_delay):
+        self.sessions = sessions
+        self.utterances = utterances
+        self.converse_delay = converse_delay
+        self.expected = sessions * utterances
+        self.handled = 0
+        self.order = {}  # {session: [utterance index]}
+        self.lock = Lock()
+        self.done = Event()
+        self.emitter = ThreadedEmitter()
+        self.service = IntentService(self.emitter)
+        self.emitter.on('skill.converse.request', self.handle_converse)
+        self.emitter.on('1:TimeIntent', self.handle_intent)
+        self.emitter.on('intent_failure', self.handle_intent)
+        self.register()
+
+    def register(self):
+        for word in ['time', 'clock', 'hour']:
+            self.emitter.emit(Message('register_vocab',
+                                      {'start': word, 'end': 'TimeKeyword'}))
+        intent = IntentBuilder('1:TimeIntent').require('TimeKeyword').build()
+        self.emitter.emit(Message('register_intent', intent.__dict__))
+        time.sleep(0.5)
+
+    def handle_converse(self, message):
+        time.sleep(self.converse_delay)
+        self.emitter.emit(message.reply('skill.converse.response', {
+            'skill_id': message.data['skill_id'], 'result': False,
+            'request_id': message.data['request_id']}))
+
+    def handle_intent(self, message):
+        session = message.context.get('user')
+        index = int(message.data['utterance'].split()[-1])
+        with self.lock:
+            self.order.setdefault(session, []).append(index)
+            self.handled += 1
+            if self.handled >= self.expected:
+                self.done.set()
+
+    def run(self):
+        for session in range(self.sessions):
+            self.service.add_active_skill(2, str(session))
+        start = time.time()
+        for i in range(self.utterances):
+            for session in range(self.sessions):
+                # delivered synchronously so each session sees its
+                # utterances in the order they were sent
+                self.service.handle_utterance(Message(
+                    'recognizer_loop:utterance',
+                    {'utterances': ['what time is it %d' % i]},
+                    {'source': 'client:%d' % session,
+                     'user': str(session)}))
+        self.done.wait(600)
+        elapsed = time.time() - start
+        in_order = all(o == sorted(o) for o in self.order.values())
+        return elapsed, in_order
+
+
+def main():
+    args = [float(a) for a in sys.argv[1:]]
+    sessions = int(args[0]) if len(args) > 0 else 20
+    utterances = int(args[1]) if len(args) > 1 else 5
+    converse_delay = args[2] if len(args) > 2 else 0.05
+    load = UtteranceLoad(sessions, utterances, converse_delay)
+    elapsed, in_order = load.run()
+    print "sessions: %d, utterances: %d, handled: %d" % (
+        sessions, sessions * utterances, load.handled)
+    print "elapsed: %.3f s, throughput: %.1f utterances/s" % (
+        elapsed, load.handled / elapsed)
+    print "per session order kept: " + str(in_order)
+
+
+if __name__ == "__main__":
+    main()
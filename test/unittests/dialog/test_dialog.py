@@ -0,0 +1,61 @@
+import os
+import shutil
+import tempfile
+import unittest
+from os.path import join
+
+from mycroft.dialog import DialogCache, MustacheDialogRenderer
+
+
+class TestMustacheDialogRenderer(unittest.TestCase):
+    def test_render(self):
+        renderer = MustacheDialogRenderer()
+        renderer.add_templates('greet', ['hello {{name}}', 'hi {{name}}'])
+        self.assertEqual(renderer.render('greet', {'name': 'bob'}, 0),
+                         'hello bob')
+        self.assertEqual(renderer.render('greet', {'name': 'ann'}, 0),
+                         'hello ann')
+        self.assertEqual(renderer.render('greet', {}, 1), 'hi ')
+        self.assertEqual(len(renderer.parsed), 2)
+
+    def test_missing(self):
+        with self.assertRaises(NotImplementedError):
+            MustacheDialogRenderer().render('missing')
+
+
+class TestDialogCache(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = join(self.dir, 'test.dialog')
+        self.write('one {{x}}')
+        self.cache = DialogCache()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def write(self, text, mtime=None):
+        with open(self.path, 'w') as f:
+            f.write(text + '\n')
+        if mtime:
+            os.utime(self.path, (mtime, mtime))
+
+    def test_cached(self):
+        renderer = self.cache.get_renderer(self.path)
+        self.assertIs(self.cache.get_renderer(self.path), renderer)
+        self.assertEqual(renderer.render('template', {'x': 1}), 'one 1')
+
+    def test_file_changed(self):
+        self.write('one {{x}}', 1000)
+        self.cache.get_renderer(self.path)
+        self.write('two {{x}}', 2000)
+        renderer = self.cache.get_renderer(self.path)
+        self.assertEqual(renderer.render('template', {'x': 1}), 'two 1')
+
+    def test_file_removed(self):
+        self.cache.get_renderer(self.path)
+        os.remove(self.path)
+        self.assertIsNone(self.cache.get_renderer(self.path))
+
+
+if __name__ == '__main__':
+    unittest.main()
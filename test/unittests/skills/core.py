@@ -3,8 +3,11 @@ import unittest
 from os.path import join, dirname, abspath
 from re import error
 
+from mycroft.client.enclosure.api import EnclosureAPI
+from mycroft.messagebus.message import Message
 from mycroft.skills.core import load_regex_from_file, load_regex, \
-    load_vocab_from_file, load_vocabulary
+    load_vocab_from_file, load_vocabulary, MycroftSkill
+from mycroft.skills.intent_service import get_session_id
 from mycroft.util.log import getLogger
 
 __author__ = 'eward'
@@ -18,6 +21,7 @@ class MockEmitter(object):
     def emit(self, message):
         self.types.append(message.type)
         self.results.append(message.data)
+        self.messages.append(message)
 
     def get_types(self):
         return self.types
@@ -28,6 +32,7 @@ class MockEmitter(object):
     def reset(self):
         self.types = []
         self.results = []
+        self.messages = []
 
 
 class MycroftSkillTest(unittest.TestCase):
@@ -158,3 +163,19 @@ class MycroftSkillTest(unittest.TestCase):
                                   'vocab_test_fail'))
         except OSError as e:
             self.assertEquals(e.strerror, 'No such file or directory')
+
+
+class SpeakContextTest(unittest.TestCase):
+    def test_context_in_session_of_intent(self):
+        emitter = MockEmitter()
+        skill = MycroftSkill(name='Test')
+        skill.emitter = emitter
+        skill.enclosure = EnclosureAPI(emitter, skill.name)
+        skill.handle_update_message_context(
+            Message('intent', {}, {'user': 3, 'source': 'cli'}))
+        skill.speak('hello', metadata={'Location': 'Lisbon'})
+        batch = [m for m in emitter.messages
+                 if m.type == 'add_context_batch']
+        self.assertEqual(len(batch), 1)
+        self.assertEqual(get_session_id(batch[0].context), '3')
+        skill.executor.shutdown()
@@ -0,0 +1,61 @@
+import re
+import unittest
+
+from adapt.entity_tagger import EntityTagger
+from adapt.tools.text.tokenizer import EnglishTokenizer
+from adapt.tools.text.trie import Trie
+
+from mycroft.skills.entity_tagger import PrefilteredEntityTagger, \
+    get_first_words
+
+
+class FirstWordsTest(unittest.TestCase):
+    def test_literal(self):
+        self.assertEqual(get_first_words('follow (?P<User>.*)'),
+                         set(['follow']))
+
+    def test_alternatives(self):
+        self.assertEqual(
+            get_first_words('(reload skill|Restart) (?P<Skill>.*)'),
+            set(['reload', 'restart']))
+
+    def test_unfiltered(self):
+        self.assertIsNone(get_first_words('(?P<Amount>\d+)'))
+        self.assertIsNone(get_first_words('spell(?P<Word>.*)'))
+        self.assertIsNone(get_first_words('(spell )?(?P<Word>.*)'))
+
+
+class PrefilteredEntityTaggerTest(unittest.TestCase):
+    regexes = ['follow (?P<User>.*)',
+               '(with|about) (?P<Target>.*)',
+               '(?P<Amount>\d+)',
+               '(reload|restart) (skill id|skill) (?P<Skill>.*)']
+    utterances = ['follow the white rabbit',
+                  'tell me about dogs',
+                  'remind me in 20 minutes',
+                  'restart skill id 12',
+                  'nothing to see here']
+
+    def setUp(self):
+        regexes = [re.compile(r, re.IGNORECASE) for r in self.regexes]
+        tokenizer = EnglishTokenizer()
+        self.adapt_tagger = EntityTagger(Trie(), tokenizer, regexes)
+        self.tagger = PrefilteredEntityTagger(Trie(), tokenizer, regexes)
+
+    def test_same_tags_as_adapt(self):
+        for utterance in self.utterances:
+            self.assertEqual(self.tagger.tag(utterance),
+                             self.adapt_tagger.tag(utterance))
+
+    def test_candidates(self):
+        self.assertEqual([r.pattern for r in self.tagger.candidates('Follow')],
+                         ['follow (?P<User>.*)', '(?P<Amount>\d+)'])
+
+    def test_new_regex_indexed(self):
+        self.tagger.regex_entities.append(re.compile('spell (?P<Word>.*)'))
+        self.assertIn('spell (?P<Word>.*)',
+                      [r.pattern for r in self.tagger.candidates('spell')])
+
+
+if __name__ == '__main__':
+    unittest.main()
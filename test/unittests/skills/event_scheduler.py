@@ -0,0 +1,119 @@
+import json
+import shutil
+import tempfile
+import time
+import unittest
+from os.path import join
+
+from mycroft.messagebus.message import Message
+from mycroft.skills.core import MycroftSkill
+from mycroft.skills.event_scheduler import EventScheduler
+
+
+class MockEmitter(object):
+    def __init__(self):
+        self.messages = []
+        self.handlers = {}
+
+    def emit(self, message):
+        self.messages.append(message)
+        for handler in self.handlers.get(message.type, []):
+            handler(message)
+
+    def on(self, event, f):
+        self.handlers.setdefault(event, []).append(f)
+
+    def remove(self, event, f):
+        self.handlers[event].remove(f)
+
+    def types(self):
+        return [m.type for m in self.messages]
+
+
+class EventSchedulerTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = join(self.dir, 'schedule.json')
+        self.emitter = MockEmitter()
+        self.scheduler = EventScheduler(self.emitter, self.path,
+                                        autostart=False)
+
+    def tearDown(self):
+        self.scheduler.stop()
+        shutil.rmtree(self.dir)
+
+    def test_pop_due(self):
+        self.scheduler.schedule('b', 200)
+        self.scheduler.schedule('a', 100, data={'x': 1})
+        self.scheduler.schedule('c', 300)
+        self.assertEqual(self.scheduler.pop_due(250),
+                         [('a', {'x': 1}), ('b', {})])
+        self.assertEqual([e['event'] for e in self.scheduler.get_events()],
+                         ['c'])
+
+    def test_reschedule_and_remove(self):
+        self.scheduler.schedule('a', 100)
+        self.scheduler.schedule('a', 300)
+        self.scheduler.schedule('b', 100)
+        self.assertTrue(self.scheduler.remove('b'))
+        self.assertFalse(self.scheduler.remove('b'))
+        self.assertEqual(self.scheduler.pop_due(200), [])
+        self.assertEqual(self.scheduler.pop_due(300), [('a', {})])
+
+    def test_repeat(self):
+        self.scheduler.schedule('a', 100, repeat=10)
+        self.assertEqual(self.scheduler.pop_due(125), [('a', {})])
+        self.assertEqual(self.scheduler.get_events()[0]['time'], 130)
+
+    def test_saved(self):
+        self.scheduler.schedule('a', 100, repeat=10, data={'x': 1})
+        with open(self.path) as f:
+            self.assertEqual(json.load(f), {
+                'a': {'time': 100, 'repeat': 10, 'data': {'x': 1}}})
+        scheduler = EventScheduler(MockEmitter(), self.path, autostart=False)
+        self.assertEqual(scheduler.get_events(), [
+            {'event': 'a', 'time': 100, 'repeat': 10, 'data': {'x': 1}}])
+
+    def test_bus_api(self):
+        self.emitter.emit(Message('mycroft.scheduler.schedule_event',
+                                  {'event': 'a', 'time': 100}))
+        self.emitter.emit(Message('mycroft.scheduler.list'))
+        response = self.emitter.messages[-1]
+        self.assertEqual(response.type, 'mycroft.scheduler.list.response')
+        self.assertEqual(response.data['events'][0]['event'], 'a')
+        self.emitter.emit(Message('mycroft.scheduler.remove_event',
+                                  {'event': 'a'}))
+        self.assertEqual(self.scheduler.get_events(), [])
+
+    def test_thread(self):
+        self.scheduler.start()
+        self.scheduler.schedule('later', time.time() + 60)
+        self.scheduler.schedule('soon', time.time() + 0.1)
+        time.sleep(0.3)
+        self.assertIn('soon', self.emitter.types())
+        self.assertNotIn('later', self.emitter.types())
+
+
+class ScheduleEventTest(unittest.TestCase):
+    def test_schedule_event(self):
+        emitter = MockEmitter()
+        skill = MycroftSkill(name='Test')
+        skill.emitter = emitter
+        handled = []
+        skill.schedule_event(handled.append, 30, name='ping', data={'x': 1})
+        message = emitter.messages[-1]
+        self.assertEqual(message.type, 'mycroft.scheduler.schedule_event')
+        self.assertEqual(message.data['event'], 'Test:ping')
+        self.assertTrue(time.time() + 29 < message.data['time'])
+
+        # scheduling again replaces the handler
+        skill.schedule_event(handled.append, 60, name='ping')
+        self.assertEqual(len(emitter.handlers['Test:ping']), 1)
+
+        skill.cancel_scheduled_event('ping')
+        self.assertEqual(emitter.messages[-1].data, {'event': 'Test:ping'})
+        skill.executor.shutdown()
+
+
+if __name__ == '__main__':
+    unittest.main()
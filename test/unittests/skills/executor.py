@@ -0,0 +1,144 @@
+import time
+import unittest
+from threading import Event
+
+from adapt.intent import IntentBuilder
+
+from mycroft.messagebus.message import Message
+from mycroft.skills.core import MycroftSkill
+from mycroft.skills.executor import SkillExecutor
+
+
+class MockEmitter(object):
+    def __init__(self):
+        self.messages = []
+        self.handlers = {}
+
+    def emit(self, message):
+        self.messages.append(message)
+
+    def on(self, event, f):
+        self.handlers.setdefault(event, []).append(f)
+
+    def remove(self, event, f):
+        self.handlers[event].remove(f)
+
+    def deliver(self, message):
+        for f in self.handlers.get(message.type, []):
+            f(message)
+
+
+def wait_for(condition, timeout=2):
+    end = time.time() + timeout
+    while not condition() and time.time() < end:
+        time.sleep(0.01)
+
+
+class SkillExecutorTest(unittest.TestCase):
+    def test_max_workers(self):
+        executor = SkillExecutor('test', max_workers=2, timeout=0)
+        release = Event()
+        done = []
+        for i in range(5):
+            executor.submit('job', lambda queue_time: (release.wait(),
+                                                       done.append(1)))
+        time.sleep(0.1)
+        self.assertEqual(len(executor.threads), 2)
+        release.set()
+        wait_for(lambda: len(done) == 5)
+        executor.shutdown()
+        stats = executor.get_stats()['job']
+        self.assertEqual(stats['count'], 5)
+        self.assertGreater(stats['max_queue_time'], 0.05)
+
+    def test_reuse_idle_thread(self):
+        executor = SkillExecutor('test', max_workers=4, timeout=0)
+        done = []
+        for i in range(3):
+            executor.submit('job', lambda queue_time: done.append(1))
+            wait_for(lambda: len(done) == i + 1)
+            time.sleep(0.05)
+        self.assertEqual(len(executor.threads), 1)
+        self.assertEqual(executor.busy, 0)
+        executor.shutdown()
+        self.assertEqual(len(done), 3)
+        self.assertEqual(executor.get_stats()['job']['count'], 3)
+
+    def test_serial_by_default(self):
+        executor = SkillExecutor('test', timeout=0)
+        done = []
+        for i in range(5):
+            executor.submit('job', lambda queue_time, i=i: (
+                time.sleep(0.01), done.append(i)))
+        wait_for(lambda: len(done) == 5)
+        self.assertEqual(len(executor.threads), 1)
+        executor.shutdown()
+        self.assertEqual(done, range(5))
+
+    def test_timeout(self):
+        timeouts = []
+        executor = SkillExecutor('test', timeout=0.05,
+                                 on_timeout=lambda n, t: timeouts.append(n))
+        executor.submit('slow', lambda queue_time: time.sleep(0.2))
+        executor.submit('fast', lambda queue_time: None)
+        wait_for(lambda: len(executor.get_stats()) == 2)
+        executor.shutdown()
+        self.assertEqual(timeouts, ['slow'])
+        self.assertEqual(executor.get_stats()['slow']['timeouts'], 1)
+        self.assertEqual(executor.get_stats()['fast']['timeouts'], 0)
+
+
+class TimeSkill(MycroftSkill):
+    def initialize(self):
+        self.register_intent(IntentBuilder('TimeIntent').require('Time'),
+                             self.handle_time)
+
+    def handle_time(self, message):
+        time.sleep(message.data.get('sleep', 0))
+
+
+class SkillExecutionTest(unittest.TestCase):
+    def setUp(self):
+        self.emitter = MockEmitter()
+        self.skill = TimeSkill()
+        self.skill.bind(self.emitter)
+        self.skill.skill_id = 3
+        self.skill.initialize()
+
+    def tearDown(self):
+        self.skill.executor.shutdown()
+
+    def messages(self, message_type):
+        return [m.data for m in self.emitter.messages
+                if m.type == message_type]
+
+    def test_handler_off_the_bus_thread(self):
+        self.skill.executor.timeout = 0.05
+        start = time.time()
+        self.emitter.deliver(Message('3:TimeIntent', {'sleep': 0.2}))
+        self.assertLess(time.time() - start, 0.1)
+        wait_for(lambda: self.messages('intent.execution.end'))
+        error = self.messages('intent.execution.error')
+        self.assertEqual(error, [{'status': 'timeout',
+                                  'intent': '3:TimeIntent',
+                                  'timeout': 0.05}])
+        end = self.messages('intent.execution.end')[0]
+        self.assertEqual(end['status'], 'executed')
+        self.assertGreater(end['execution_time'], 0.15)
+
+    def test_stats_request(self):
+        self.emitter.deliver(Message('3:TimeIntent', {}))
+        wait_for(lambda: self.messages('intent.execution.end'))
+        time.sleep(0.05)
+        self.emitter.deliver(Message('skill.executor.stats.request',
+                                     {'skill_id': 4}))
+        self.assertEqual(self.messages('skill.executor.stats.response'), [])
+        self.emitter.deliver(Message('skill.executor.stats.request',
+                                     {'skill_id': 3}))
+        stats = self.messages('skill.executor.stats.response')[0]
+        self.assertEqual(stats['name'], 'TimeSkill')
+        self.assertEqual(stats['intents']['3:TimeIntent']['count'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,184 @@
+import time
+import unittest
+
+from mycroft.messagebus.message import Message
+from mycroft.skills.core import FallbackSkill
+from mycroft.skills.fallback_chain import SpeculativeFallbackChain, \
+    fallback_cancelled
+
+
+class MockEmitter(object):
+    def __init__(self):
+        self.messages = []
+
+    def emit(self, message):
+        self.messages.append(message)
+
+    def on(self, event, f):
+        pass
+
+
+def fallback(delay, result, calls=None):
+    def handler(message):
+        if calls is not None:
+            calls.append(delay)
+        time.sleep(delay)
+        return result
+    return handler
+
+
+class SpeculativeFallbackChainTest(unittest.TestCase):
+    def run_chain(self, handlers, concurrency=3, timeout=2):
+        chain = SpeculativeFallbackChain(
+            [(str(i), h, None) for i, h in enumerate(handlers)],
+            concurrency, timeout)
+        start = time.time()
+        result = chain.run(Message('intent_failure'))
+        return result, time.time() - start, chain
+
+    def test_concurrent(self):
+        result, elapsed, _ = self.run_chain([fallback(0.2, False),
+                                             fallback(0.2, False),
+                                             fallback(0.2, True)])
+        self.assertTrue(result)
+        self.assertLess(elapsed, 0.35)
+
+    def test_priority(self):
+        _, _, chain = self.run_chain([fallback(0.2, True),
+                                      fallback(0.0, True)])
+        self.assertTrue(chain.runs[1].cancelled)
+        self.assertFalse(chain.runs[0].cancelled)
+
+    def test_declined(self):
+        result, _, _ = self.run_chain([fallback(0, False)] * 3)
+        self.assertFalse(result)
+
+    def test_exception_declines(self):
+        def broken(message):
+            raise ValueError('broken')
+        result, _, _ = self.run_chain([broken, fallback(0, True)])
+        self.assertTrue(result)
+
+    def test_concurrency(self):
+        calls = []
+        result, elapsed, _ = self.run_chain(
+            [fallback(0.1, False, calls), fallback(0.1, True, calls),
+             fallback(0.1, True, calls)], concurrency=1)
+        self.assertTrue(result)
+        self.assertEqual(len(calls), 2)
+        self.assertGreater(elapsed, 0.19)
+
+    def test_timeout(self):
+        result, elapsed, chain = self.run_chain(
+            [fallback(0.5, True), fallback(0, True)], timeout=0.1)
+        self.assertFalse(result)
+        self.assertLess(elapsed, 0.3)
+        self.assertTrue(all(r.cancelled for r in chain.runs))
+
+    def test_cancelled(self):
+        checks = []
+
+        def slow(message):
+            time.sleep(0.1)
+            checks.append(fallback_cancelled())
+            return True
+        self.run_chain([fallback(0, True), slow])
+        time.sleep(0.2)
+        self.assertEqual(checks, [True])
+
+
+class SpeakingFallback(FallbackSkill):
+    def __init__(self, name, delay, result):
+        FallbackSkill.__init__(self, name)
+        self.delay = delay
+        self.result = result
+
+    def handle_fallback(self, message):
+        self.speak(self.name)
+        time.sleep(self.delay)
+        self.emitter.emit(Message('fallback.' + self.name))
+        return self.result
+
+
+class FallbackSkillTest(unittest.TestCase):
+    def setUp(self):
+        self.handlers = dict(FallbackSkill.fallback_handlers)
+        self.folders = dict(FallbackSkill.folders)
+        self.override = FallbackSkill.override
+        self.order = FallbackSkill.order
+        self.speculative = FallbackSkill.speculative
+        FallbackSkill.fallback_handlers.clear()
+        FallbackSkill.folders.clear()
+        FallbackSkill.override = False
+        self.emitter = MockEmitter()
+        for priority, (name, delay, result) in enumerate(
+                [('first', 0.1, False), ('second', 0, True),
+                 ('third', 0, True)]):
+            skill = SpeakingFallback(name, delay, result)
+            skill.bind(self.emitter)
+            skill._dir = '/tmp/skills/' + name
+            skill.register_fallback(skill.handle_fallback, priority)
+
+    def tearDown(self):
+        FallbackSkill.fallback_handlers.clear()
+        FallbackSkill.fallback_handlers.update(self.handlers)
+        FallbackSkill.folders.clear()
+        FallbackSkill.folders.update(self.folders)
+        FallbackSkill.override = self.override
+        FallbackSkill.order = self.order
+        FallbackSkill.speculative = self.speculative
+
+    def spoken(self):
+        return [m.data['utterance'] for m in self.emitter.messages
+                if m.type == 'speak']
+
+    def fail_intent(self):
+        handler = FallbackSkill.make_intent_failure_handler(self.emitter)
+        handler(Message('intent_failure', {'utterance': 'hello'}))
+
+    def test_sequential(self):
+        FallbackSkill.speculative = {}
+        self.fail_intent()
+        self.assertEqual(self.spoken(), ['first', 'second'])
+
+    def test_speculative(self):
+        FallbackSkill.speculative = {'enabled': True, 'concurrency': 3}
+        self.fail_intent()
+        self.assertEqual(self.spoken(), ['second'])
+        self.assertEqual([m.type for m in self.emitter.messages
+                          if m.type.startswith('fallback.')],
+                         ['fallback.second'])
+
+    def test_cancelled_dropped(self):
+        FallbackSkill.speculative = {'enabled': True, 'concurrency': 3}
+        FallbackSkill.fallback_handlers.clear()
+        slow = SpeakingFallback('slow', 0.1, True)
+        slow.bind(self.emitter)
+        slow._dir = '/tmp/skills/slow'
+        fast = SpeakingFallback('fast', 0, True)
+        fast.bind(self.emitter)
+        fast._dir = '/tmp/skills/fast'
+        fast.register_fallback(fast.handle_fallback, 0)
+        slow.register_fallback(slow.handle_fallback, 1)
+        self.fail_intent()
+        time.sleep(0.2)
+        self.assertEqual(self.spoken(), ['fast'])
+        self.assertEqual(self.emitter.messages[-1].type, 'fallback.fast')
+
+    def test_override_order(self):
+        FallbackSkill.override = True
+        FallbackSkill.order = ['third', 'first']
+        FallbackSkill.speculative = {'enabled': True}
+        self.fail_intent()
+        self.assertEqual(self.spoken(), ['third'])
+
+    def test_complete_failure(self):
+        FallbackSkill.speculative = {'enabled': True}
+        FallbackSkill.fallback_handlers.clear()
+        self.fail_intent()
+        self.assertEqual([m.type for m in self.emitter.messages],
+                         ['complete_intent_failure'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import json
+import unittest
+import urllib2
+
+from mycroft.messagebus.message import Message
+from mycroft.skills.intent_metrics import IntentMetrics, LatencyHistogram
+
+
+class MockEmitter(object):
+    def __init__(self):
+        self.messages = []
+
+    def emit(self, message):
+        self.messages.append(message)
+
+    def on(self, event, f):
+        pass
+
+
+class LatencyHistogramTest(unittest.TestCase):
+    def test_quantiles(self):
+        histogram = LatencyHistogram()
+        for i in range(90):
+            histogram.add(0.02)
+        for i in range(10):
+            histogram.add(2.0)
+        self.assertTrue(0.01 < histogram.quantile(0.5) <= 0.025)
+        self.assertTrue(1.0 < histogram.quantile(0.95) <= 2.0)
+        self.assertEqual(histogram.quantile(1.0), 2.0)
+        self.assertIsNone(LatencyHistogram().quantile(0.5))
+
+    def test_throughput(self):
+        histogram = LatencyHistogram(window=10)
+        histogram.add(0.1, now=100)
+        histogram.add(0.1, now=105)
+        self.assertEqual(histogram.throughput(now=108), 0.2)
+        self.assertEqual(histogram.throughput(now=112), 0.1)
+        self.assertEqual(histogram.count, 2)
+
+
+class IntentMetricsTest(unittest.TestCase):
+    def setUp(self):
+        self.emitter = MockEmitter()
+        names = {'3': 'TimeSkill'}
+        self.metrics = IntentMetrics(self.emitter, {'port': 0},
+                                     lambda skill_id: names.get(skill_id))
+
+    def execute(self, intent, seconds, status='executed'):
+        message_type = ('intent.execution.end' if status == 'executed'
+                        else 'intent.execution.error')
+        data = {'status': status, 'intent': intent}
+        if status == 'timeout':
+            data['timeout'] = 30
+        else:
+            data['execution_time'] = seconds
+        handler = (self.metrics.handle_end if status == 'executed'
+                   else self.metrics.handle_error)
+        handler(Message(message_type, data))
+
+    def test_metrics(self):
+        self.execute('3:TimeIntent', 0.1)
+        self.execute('3:TimeIntent', 0.3, 'failed')
+        self.execute('3:DateIntent', 0.2)
+        self.execute('3:DateIntent', 0, 'timeout')
+        metrics = self.metrics.get_metrics()
+        time_intent = metrics['intents']['3:TimeIntent']
+        self.assertEqual(time_intent['count'], 2)
+        self.assertEqual(time_intent['error_rate'], 0.5)
+        self.assertEqual(metrics['intents']['3:DateIntent']['timeouts'], 1)
+        skill = metrics['skills']['3']
+        self.assertEqual(skill['name'], 'TimeSkill')
+        self.assertEqual(skill['count'], 3)
+        self.assertEqual(skill['max'], 0.3)
+
+    def test_request(self):
+        self.execute('3:TimeIntent', 0.1)
+        self.metrics.handle_request(Message('skills.metrics.request'))
+        response = self.emitter.messages[0]
+        self.assertEqual(response.type, 'skills.metrics.response')
+        self.assertIn('3:TimeIntent', response.data['intents'])
+
+    def test_http(self):
+        self.execute('3:TimeIntent', 0.1)
+        self.metrics.start_server()
+        try:
+            url = 'http://127.0.0.1:%d' % self.metrics.server.server_address[1]
+            text = urllib2.urlopen(url + '/metrics').read()
+            data = json.loads(urllib2.urlopen(url + '/metrics.json').read())
+        finally:
+            self.metrics.stop()
+        self.assertIn('mycroft_intent_count_total{intent="3:TimeIntent"} 1',
+                      text)
+        self.assertIn('mycroft_skill_latency_seconds{skill="3",'
+                      'name="TimeSkill",quantile="0.5"}', text)
+        self.assertEqual(data['skills']['3']['count'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,28 @@
+import shutil
+import tempfile
+import time
 import unittest
-from mycroft.skills.intent_service import IntentService, ContextManager
+from os.path import join
+from threading import Lock, Thread
+from mycroft.configuration import ConfigurationManager
+from mycroft.messagebus.message import Message
+from mycroft.skills.intent_service import IntentService, ContextManager, \
+    get_session_id, DEFAULT_SESSION
+
+snapshot_dir = None
+
+
+def setUpModule():
+    # keep the intent snapshot of the tests out of the home folder
+    global snapshot_dir
+    snapshot_dir = tempfile.mkdtemp()
+    skills = ConfigurationManager.get()['skills']
+    skills['intent_snapshot_enabled'] = False
+    skills['intent_snapshot'] = join(snapshot_dir, 'snapshot.json')
+
+
+def tearDownModule():
+    shutil.rmtree(snapshot_dir)
 
 
 class MockEmitter(object):
@@ -10,6 +33,9 @@ class MockEmitter(object):
         self.types.append(message.type)
         self.results.append(message.data)
 
+    def on(self, event, f):
+        pass
+
     def get_types(self):
         return self.types
 
@@ -36,9 +62,10 @@ class ContextManagerTest(unittest.TestCase):
         entity['match'] = word
         entity['key'] = word
 
-        self.assertEqual(len(self.context_manager.frame_stack), 0)
+        session = self.context_manager.get_session()
+        self.assertEqual(len(session.frame_stack), 0)
         self.context_manager.inject_context(entity)
-        self.assertEqual(len(self.context_manager.frame_stack), 1)
+        self.assertEqual(len(session.frame_stack), 1)
 
     def test_remove_context(self):
         entity = {'confidence': 1.0}
@@ -49,10 +76,240 @@ class ContextManagerTest(unittest.TestCase):
         entity['match'] = word
         entity['key'] = word
 
+        session = self.context_manager.get_session()
         self.context_manager.inject_context(entity)
-        self.assertEqual(len(self.context_manager.frame_stack), 1)
+        self.assertEqual(len(session.frame_stack), 1)
         self.context_manager.remove_context('TestContext')
-        self.assertEqual(len(self.context_manager.frame_stack), 0)
+        self.assertEqual(len(session.frame_stack), 0)
+
+    def _entity(self, word, context):
+        return {'confidence': 1.0, 'data': [(word, context)],
+                'match': word, 'key': word}
+
+    def test_remove_keeps_other_context(self):
+        self.context_manager.inject_context(self._entity('a', 'First'))
+        self.context_manager.inject_context(self._entity('b', 'Second'))
+        self.context_manager.remove_context('First')
+        context = self.context_manager.get_context()
+        self.assertEqual([e['data'][0][1] for e in context], ['Second'])
+
+    def test_sessions_are_separate(self):
+        self.context_manager.inject_context(self._entity('a', 'Loc'),
+                                            session_id='alice')
+        self.context_manager.inject_context(self._entity('b', 'Loc'),
+                                            session_id='bob')
+        alice = self.context_manager.get_context(session_id='alice')
+        bob = self.context_manager.get_context(session_id='bob')
+        self.assertEqual(alice[0]['key'], 'a')
+        self.assertEqual(bob[0]['key'], 'b')
+        self.assertEqual(self.context_manager.get_context(), [])
+
+    def test_latest_keyword_wins(self):
+        self.context_manager.inject_context(self._entity('old', 'Loc'))
+        self.context_manager.inject_context(self._entity('new', 'Loc'))
+        context = self.context_manager.get_context()
+        self.assertEqual(len(context), 1)
+        self.assertEqual(context[0]['key'], 'new')
+        self.assertEqual(context[0]['confidence'], 0.5)
+
+    def test_idle_sessions_expire(self):
+        self.context_manager.timeout = 0
+        self.context_manager.inject_context(self._entity('a', 'Loc'),
+                                            session_id='idle')
+        self.assertIn('idle', self.context_manager.sessions)
+        time.sleep(0.01)
+        self.context_manager.get_session('other')
+        self.assertNotIn('idle', self.context_manager.sessions)
+
+    def test_add_context_batch(self):
+        service = IntentService(MockEmitter())
+        service.handle_add_context_batch(Message('add_context_batch', {
+            'contexts': [{'context': 'Last_Speech', 'word': 'hello'},
+                         {'context': 'Location', 'word': 'Lisbon'}]},
+            {'user': 3}))
+        session = service.context_manager.get_session('3')
+        self.assertEqual(len(session.frame_stack), 1)
+        context = service.context_manager.get_context(session_id='3')
+        self.assertEqual(sorted((e['data'][0][1], e['key']) for e in context),
+                         [('Last_Speech', 'hello'), ('Location', 'Lisbon')])
+
+    def test_batch_frames(self):
+        entities = [self._entity('hello', 'Last_Speech'),
+                    self._entity('Lisbon', 'Location')]
+        # without metadata a batch takes one frame, one per entity before
+        self.context_manager.inject_context_batch(entities)
+        session = self.context_manager.get_session()
+        self.assertEqual(len(session.frame_stack), 1)
+        for entity in entities:
+            self.context_manager.inject_context(entity, session_id='single')
+        single = self.context_manager.get_session('single')
+        self.assertEqual(len(single.frame_stack), 2)
+
+        # with matching metadata it merges into the top frame
+        self.context_manager.inject_context(self._entity('a', 'Intent'),
+                                            {'skill': 'x'}, 'merged')
+        self.context_manager.inject_context_batch(entities, {'skill': 'x'},
+                                                  'merged')
+        merged = self.context_manager.get_session('merged')
+        self.assertEqual(len(merged.frame_stack), 1)
+        self.assertEqual(len(self.context_manager.get_context(
+            session_id='merged')), 3)
+
+    def test_sessions_concurrent(self):
+        # every thread adds to the same new session and creates its own
+        errors = []
+
+        def inject(index):
+            try:
+                self.context_manager.get_session('own' + str(index))
+                self.context_manager.inject_context(
+                    self._entity(str(index), 'Key' + str(index)),
+                    session_id='shared')
+            except Exception as e:
+                errors.append(e)
+        threads = [Thread(target=inject, args=(i,)) for i in range(50)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        session = self.context_manager.sessions['shared']
+        self.assertEqual(len(session.keywords), 50)
+        self.assertEqual(len(self.context_manager.sessions), 51)
+        self.assertEqual(len(self.context_manager.expiry_heap), 51)
+
+    def test_session_id(self):
+        self.assertEqual(get_session_id(None), DEFAULT_SESSION)
+        self.assertEqual(get_session_id({'source': 'cli'}), DEFAULT_SESSION)
+        self.assertEqual(get_session_id({'user': 3}), '3')
+        self.assertEqual(get_session_id({'user': 3, 'session': 'x'}), 'x')
+
+
+class UtterancePipelineTest(unittest.TestCase):
+    def setUp(self):
+        self.service = IntentService(MockEmitter())
+        self.lock = Lock()
+        self.handled = []
+        self.running = 0
+        self.max_running = 0
+        self.service.process_utterance = self.process_utterance
+
+    def process_utterance(self, message, session_id):
+        with self.lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        time.sleep(0.05)
+        with self.lock:
+            self.running -= 1
+            self.handled.append((session_id, message.data['utterances'][0]))
+
+    def utterance(self, user, text):
+        return Message('recognizer_loop:utterance', {'utterances': [text]},
+                       {'user': user})
+
+    def wait(self, count):
+        start = time.time()
+        while len(self.handled) < count and time.time() - start < 5:
+            time.sleep(0.01)
+
+    def test_session_order(self):
+        for i in range(5):
+            self.service.handle_utterance(self.utterance('a', str(i)))
+        self.wait(5)
+        self.assertEqual([u for _, u in self.handled],
+                         ['0', '1', '2', '3', '4'])
+        self.assertEqual(self.max_running, 1)
+
+    def test_sessions_run_concurrently(self):
+        for user in ['a', 'b', 'c']:
+            self.service.handle_utterance(self.utterance(user, 'hi'))
+        self.wait(3)
+        self.assertEqual(len(self.handled), 3)
+        self.assertTrue(self.max_running > 1)
+
+    def test_active_skills_per_session(self):
+        self.service.add_active_skill(1, 'a')
+        self.service.add_active_skill(2, 'b')
+        self.service.add_active_skill(1, 'a')
+        self.assertEqual([s[0] for s in self.service.get_active_skills('a')],
+                         [1])
+        self.assertEqual([s[0] for s in self.service.get_active_skills('b')],
+                         [2])
+
+    def test_active_skills_concurrent(self):
+        # pool threads prune sessions while the bus thread adds skills
+        self.service.converse_timeout = 0
+        errors = []
+
+        def add():
+            try:
+                for i in range(500):
+                    self.service.add_active_skill(i, 'a')
+            except Exception as e:
+                errors.append(e)
+        thread = Thread(target=add)
+        thread.start()
+        for i in range(500):
+            self.service.get_active_skills('a')
+        thread.join()
+        self.assertEqual(errors, [])
+
+
+class EntityRemovalTest(unittest.TestCase):
+    def setUp(self):
+        self.service = IntentService(MockEmitter())
+        self.service.schedule_snapshot = lambda: None
+
+    def vocab(self, message_type, skill_id, data):
+        data = dict(data)
+        data.update({'skill_id': skill_id,
+                     'skill_folder': 'skill_' + str(skill_id)})
+        message = Message(message_type, data)
+        if message_type == 'register_vocab':
+            self.service.handle_register_vocab(message)
+        else:
+            self.service.handle_detach_vocab(message)
+
+    def lookup(self, word):
+        return list(self.service.engine.trie.lookup(word))
+
+    def test_shared_vocab(self):
+        for skill_id in [1, 2]:
+            self.vocab('register_vocab', skill_id,
+                       {'start': 'hour', 'end': 'TimeKeyword'})
+        self.vocab('detach_vocab', 1, {'start': 'hour', 'end': 'TimeKeyword'})
+        self.assertEqual(len(self.lookup('hour')), 1)
+        self.vocab('detach_vocab', 2, {'start': 'hour', 'end': 'TimeKeyword'})
+        self.assertEqual(self.lookup('hour'), [])
+        self.assertEqual(self.lookup('timekeyword'), [])
+        self.assertNotIn('h', self.service.engine.trie.root.children)
+
+    def test_concept_kept_while_used(self):
+        for word in ['hour', 'time']:
+            self.vocab('register_vocab', 1,
+                       {'start': word, 'end': 'TimeKeyword'})
+        self.vocab('detach_vocab', 1, {'start': 'hour', 'end': 'TimeKeyword'})
+        self.assertEqual(len(self.lookup('timekeyword')), 1)
+        self.assertEqual(len(self.lookup('time')), 1)
+
+    def test_detach_skill(self):
+        self.vocab('register_vocab', 1, {'start': 'hour', 'end': 'Time'})
+        self.vocab('register_vocab', 1, {'regex': 'in (?P<Location>.*)'})
+        self.service.detach_skill('1:')
+        self.assertEqual(self.lookup('hour'), [])
+        self.assertEqual(self.service.engine.regular_expressions_entities,
+                         [])
+        self.assertEqual(self.service.engine.tagger.candidates('in'), [])
+        # registered again after a reload
+        self.vocab('register_vocab', 1, {'regex': 'in (?P<Location>.*)'})
+        self.assertEqual(len(self.service.engine.tagger.candidates('in')), 1)
+
+    def test_vocab_without_skill_is_kept(self):
+        self.service.handle_register_vocab(
+            Message('register_vocab', {'start': 'hour', 'end': 'Time'}))
+        self.vocab('register_vocab', 1, {'start': 'hour', 'end': 'Time'})
+        self.service.detach_skill('1:')
+        self.assertEqual(len(self.lookup('hour')), 1)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,198 @@
+import os
+import shutil
+import tempfile
+import unittest
+from os.path import join
+
+from adapt.intent import IntentBuilder
+
+from mycroft.configuration import ConfigurationManager
+from mycroft.messagebus.message import Message
+from mycroft.skills.intent_service import IntentService
+from mycroft.skills.intent_snapshot import IntentSnapshot
+
+snapshot_dir = None
+
+
+def setUpModule():
+    # keep the intent snapshot of the tests out of the home folder
+    global snapshot_dir
+    snapshot_dir = tempfile.mkdtemp()
+    skills = ConfigurationManager.get()['skills']
+    skills['intent_snapshot_enabled'] = False
+    skills['intent_snapshot'] = join(snapshot_dir, 'snapshot.json')
+
+
+def tearDownModule():
+    shutil.rmtree(snapshot_dir)
+
+
+class MockEmitter(object):
+    def __init__(self):
+        self.types = []
+
+    def emit(self, message):
+        self.types.append(message.type)
+
+    def on(self, event, f):
+        pass
+
+
+class IntentSnapshotTest(unittest.TestCase):
+    def setUp(self):
+        self.skills_dir = tempfile.mkdtemp()
+        self.skill_dir = join(self.skills_dir, 'skill_time')
+        for folder in ['skill_time', 'skill_date']:
+            os.makedirs(join(self.skills_dir, folder, 'vocab', 'en-us'))
+            with open(join(self.skills_dir, folder, '__init__.py'),
+                      'w') as f:
+                f.write('# ' + folder + '\n')
+        self.snapshot_path = join(self.skills_dir, 'snapshot.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.skills_dir)
+
+    def create_service(self):
+        service = IntentService(MockEmitter())
+        service.skills_dir = self.skills_dir
+        service.snapshot = IntentSnapshot(self.snapshot_path)
+        return service
+
+    def register(self, service, skill_id=1, name='Time'):
+        data = {'skill_id': skill_id,
+                'skill_folder': 'skill_' + name.lower()}
+        vocab = {'start': name.lower(), 'end': name + 'Keyword'}
+        vocab.update(data)
+        service.handle_register_vocab(Message('register_vocab', vocab))
+        intent = IntentBuilder(str(skill_id) + ':' + name + 'Intent') \
+            .require(name + 'Keyword').build()
+        intent = dict(intent.__dict__)
+        intent.update(data)
+        service.handle_register_intent(Message('register_intent', intent))
+        service.snapshot_timer.cancel()
+
+    def determine(self, service, utterance):
+        for intent in service.engine.determine_intent(utterance, 100):
+            return intent.get('intent_type')
+
+    def test_restore(self):
+        service = self.create_service()
+        self.register(service)
+        service.save_snapshot()
+
+        restored = self.create_service()
+        restored.restore_snapshot()
+        self.assertEqual(list(restored.restored), ['skill_time'])
+        self.assertEqual(self.determine(restored, 'what time is it'),
+                         '1:TimeIntent')
+
+    def test_register_again_replaces_intent(self):
+        service = self.create_service()
+        self.register(service)
+        service.save_snapshot()
+
+        restored = self.create_service()
+        restored.restore_snapshot()
+        self.register(restored)
+        self.assertEqual(len(restored.engine.intent_parsers), 1)
+
+    def test_loaded_without_registering(self):
+        service = self.create_service()
+        self.register(service)
+        service.save_snapshot()
+
+        restored = self.create_service()
+        restored.restore_snapshot()
+        restored.handle_skill_loaded(Message('skill.loaded', {
+            'skill': 1, 'skill_folder': 'skill_time'}))
+        restored.snapshot_timer.cancel()
+        self.assertIsNone(self.determine(restored, 'what time is it'))
+        self.assertNotIn('skill_time', restored.snapshot.skills)
+
+    def test_load_failed(self):
+        service = self.create_service()
+        self.register(service)
+        service.save_snapshot()
+
+        restored = self.create_service()
+        restored.restore_snapshot()
+        restored.handle_skill_load_failed(Message('skill.loaded.fail', {
+            'skill': 2, 'skill_folder': 'skill_time'}))
+        restored.snapshot_timer.cancel()
+        self.assertIsNone(self.determine(restored, 'what time is it'))
+        self.assertEqual(restored.registrations, {})
+
+    def test_registered_again_kept(self):
+        service = self.create_service()
+        self.register(service)
+        service.save_snapshot()
+
+        restored = self.create_service()
+        restored.restore_snapshot()
+        self.register(restored)
+        restored.handle_skill_loaded(Message('skill.loaded', {
+            'skill': 1, 'skill_folder': 'skill_time'}))
+        self.assertEqual(self.determine(restored, 'what time is it'),
+                         '1:TimeIntent')
+
+    def test_ids_swapped(self):
+        service = self.create_service()
+        self.register(service, 1, 'Time')
+        self.register(service, 2, 'Date')
+        service.save_snapshot()
+
+        # the skills load in another order and swap their ids
+        restored = self.create_service()
+        restored.restore_snapshot()
+        self.register(restored, 1, 'Date')
+        self.register(restored, 2, 'Time')
+        for folder in ['skill_date', 'skill_time']:
+            restored.handle_skill_loaded(Message('skill.loaded', {
+                'skill_folder': folder}))
+        restored.snapshot_timer.cancel()
+        self.assertEqual(self.determine(restored, 'what date is it'),
+                         '1:DateIntent')
+        self.assertEqual(self.determine(restored, 'what time is it'),
+                         '2:TimeIntent')
+        self.assertEqual(len(restored.engine.intent_parsers), 2)
+        self.assertEqual(restored.skill_ids, {1: ['DateIntent'],
+                                              2: ['TimeIntent']})
+
+    def test_utterance_held_until_loaded(self):
+        service = self.create_service()
+        self.register(service)
+        service.save_snapshot()
+
+        restored = self.create_service()
+        restored.restore_snapshot()
+        handled = []
+        restored.handle_utterance = handled.append
+        message = Message('recognizer_loop:utterance',
+                          {'utterances': ['what time is it']}, {})
+        restored.process_utterance(message)
+        self.assertNotIn('1:TimeIntent', restored.emitter.types)
+        self.assertEqual(handled, [])
+
+        self.register(restored)
+        restored.handle_skill_loaded(Message('skill.loaded', {
+            'skill': 1, 'skill_folder': 'skill_time'}))
+        restored.snapshot_timer.cancel()
+        self.assertEqual(handled, [message])
+        restored.process_utterance(message)
+        self.assertIn('1:TimeIntent', restored.emitter.types)
+
+    def test_changed_skill_not_restored(self):
+        service = self.create_service()
+        self.register(service)
+        service.save_snapshot()
+
+        with open(join(self.skill_dir, '__init__.py'), 'a') as f:
+            f.write('# a new intent\n')
+        restored = self.create_service()
+        restored.restore_snapshot()
+        self.assertEqual(restored.restored, {})
+        self.assertIsNone(self.determine(restored, 'what time is it'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,160 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from os.path import join
+
+from pyee import EventEmitter
+
+from mycroft.messagebus.message import Message
+from mycroft.skills.core import MycroftSkill
+from mycroft.skills.lazy_loader import LazySkill, RecordingEmitter, \
+    SkillManifest
+
+
+class MockEmitter(object):
+    def __init__(self):
+        self.emitter = EventEmitter()
+        self.messages = []
+
+    def on(self, event, f):
+        self.emitter.on(event, f)
+
+    def once(self, event, f):
+        self.emitter.once(event, f)
+
+    def remove(self, event, f):
+        self.emitter.remove_listener(event, f)
+
+    def emit(self, message):
+        self.messages.append(message)
+        self.emitter.emit(message.type, message)
+
+
+class RecordingEmitterTest(unittest.TestCase):
+    def test_record(self):
+        emitter = MockEmitter()
+        recorder = RecordingEmitter(emitter)
+        handled = []
+        recorder.on('mycroft.stop', handled.append)
+        recorder.on('skill.executor.stats.request', handled.append)
+        recorder.on('skill.cache.stats.request', handled.append)
+        recorder.on('1:TimeIntent', handled.append)
+        recorder.emit(Message('register_vocab', {'start': 'time',
+                                                 'end': 'TimeKeyword'}))
+        recorder.emit(Message('speak', {'utterance': 'hello'}))
+        self.assertEqual(recorder.events, ['1:TimeIntent'])
+        self.assertEqual(recorder.registrations,
+                         [{'type': 'register_vocab',
+                           'data': {'start': 'time', 'end': 'TimeKeyword'}}])
+        emitter.emit(Message('1:TimeIntent'))
+        self.assertEqual(len(handled), 1)
+
+    def test_attach(self):
+        emitter = MockEmitter()
+        recorder = RecordingEmitter(emitter, attached=False)
+        handled = []
+        recorder.on('1:TimeIntent', handled.append)
+        emitter.emit(Message('1:TimeIntent'))
+        self.assertEqual(handled, [])
+        recorder.attach()
+        emitter.emit(Message('1:TimeIntent'))
+        self.assertEqual(len(handled), 1)
+        recorder.deliver(Message('1:TimeIntent'))
+        self.assertEqual(len(handled), 2)
+
+
+class LazySkillTest(unittest.TestCase):
+    def setUp(self):
+        self.emitter = MockEmitter()
+        self.handled = []
+        self.activations = 0
+        self.entry = {
+            'skill_id': 3, 'name': 'TimeSkill',
+            'events': ['3:TimeIntent', 'time.request'],
+            'registrations': [
+                {'type': 'register_vocab',
+                 'data': {'start': 'time', 'end': 'TimeKeyword',
+                          'skill_id': 3}},
+                {'type': 'register_intent',
+                 'data': {'name': '3:TimeIntent', 'skill_id': 3}}]}
+
+    def activate(self, skill_folder):
+        self.activations += 1
+        emitter = RecordingEmitter(self.emitter, attached=False)
+        time.sleep(0.1)
+        emitter.on('5:TimeIntent', self.handled.append)
+        return MycroftSkill(), emitter
+
+    def create_lazy(self):
+        lazy = LazySkill('skill_time', self.entry, self.emitter, 5,
+                         self.activate)
+        lazy.register()
+        return lazy
+
+    def wait_active(self, lazy):
+        for i in range(50):
+            if lazy.state == 'active':
+                return
+            time.sleep(0.05)
+
+    def test_register_renumbered(self):
+        self.create_lazy()
+        types = [(m.type, m.data) for m in self.emitter.messages]
+        self.assertEqual(types, [
+            ('register_vocab', {'start': 'time', 'end': 'TimeKeyword',
+                                'skill_id': 5}),
+            ('register_intent', {'name': '5:TimeIntent', 'skill_id': 5})])
+
+    def test_activate_on_first_message(self):
+        lazy = self.create_lazy()
+        self.assertEqual(self.activations, 0)
+        self.emitter.emit(Message('5:TimeIntent', {'n': 1}))
+        self.emitter.emit(Message('5:TimeIntent', {'n': 2}))
+        self.wait_active(lazy)
+        self.assertEqual(self.activations, 1)
+        self.assertEqual([m.data['n'] for m in self.handled], [1, 2])
+
+        self.emitter.emit(Message('5:TimeIntent', {'n': 3}))
+        self.assertEqual([m.data['n'] for m in self.handled], [1, 2, 3])
+
+    def test_cancel(self):
+        lazy = self.create_lazy()
+        lazy.cancel()
+        self.emitter.emit(Message('5:TimeIntent'))
+        self.assertEqual(self.activations, 0)
+        self.assertEqual(self.emitter.messages[-2].type, 'detach_skill')
+
+
+class SkillManifestTest(unittest.TestCase):
+    def setUp(self):
+        self.skills_dir = tempfile.mkdtemp()
+        self.skill_dir = join(self.skills_dir, 'skill_time')
+        os.makedirs(self.skill_dir)
+        with open(join(self.skill_dir, '__init__.py'), 'w') as f:
+            f.write('# time skill\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.skills_dir)
+
+    def test_record(self):
+        path = join(self.skills_dir, 'manifest.json')
+        recorder = RecordingEmitter(MockEmitter())
+        recorder.on('1:TimeIntent', lambda m: None)
+        skill = MycroftSkill()
+        skill.skill_id = 1
+
+        manifest = SkillManifest(path)
+        manifest.record('skill_time', self.skill_dir, skill, recorder)
+        manifest.save()
+
+        loaded = SkillManifest(path)
+        loaded.load()
+        entry = loaded.valid_skills(self.skills_dir)['skill_time']
+        self.assertEqual(entry['events'], ['1:TimeIntent'])
+        self.assertFalse(entry['fallback'])
+
+
+if __name__ == '__main__':
+    unittest.main()
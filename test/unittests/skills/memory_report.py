@@ -0,0 +1,70 @@
+import unittest
+
+from mycroft.skills.memory_report import memory_report, reachable_size, \
+    select_unload, skill_sizes
+
+
+class MockSkill(object):
+    def __init__(self, name, emitter, data):
+        self.name = name
+        self.emitter = emitter
+        self.data = data
+
+
+class MemoryReportTest(unittest.TestCase):
+    def test_reachable_size(self):
+        small, _ = reachable_size({'a': 1}, set())
+        big, objects = reachable_size({'a': [str(i) for i in range(1000)]},
+                                      set())
+        self.assertGreater(big, small + 1000 * 20)
+        self.assertGreater(objects, 1000)
+
+    def test_shared_objects(self):
+        emitter = {'handlers': range(10000)}
+        shared = range(5000)
+        first = MockSkill('first', emitter, [shared])
+        second = MockSkill('second', emitter, [shared, range(100)])
+        (first_size, _), (second_size, _) = skill_sizes([first, second])
+        # the emitter is not counted, the shared list is counted once
+        # 8 bytes per list slot and 24 per int
+        self.assertGreater(first_size, 5000 * 32)
+        self.assertLess(first_size, 10000 * 32)
+        self.assertLess(second_size, 5000 * 8)
+
+    def test_report(self):
+        skills = [{'folder': 'small', 'skill_id': 1, 'idle': 10,
+                   'instance': MockSkill('Small', None, [])},
+                  {'folder': 'big', 'skill_id': 2, 'load_rss': 4096,
+                   'instance': MockSkill('Big', None, range(1000))}]
+        report = memory_report(skills, 10 ** 8)
+        self.assertEqual([s['name'] for s in report['skills']],
+                         ['Big', 'Small'])
+        self.assertEqual(report['skills'][0]['load_rss'], 4096)
+        self.assertEqual(report['rss'], 10 ** 8)
+
+    def test_select_unload(self):
+        skills = [{'folder': 'a', 'size': 100, 'idle': 3600},
+                  {'folder': 'b', 'size': 500, 'idle': 3600},
+                  {'folder': 'c', 'size': 900, 'idle': 10},
+                  {'folder': 'd', 'size': 800, 'idle': None},
+                  {'folder': 'e', 'size': 300, 'idle': 1800}]
+        self.assertEqual(select_unload(skills, 1000, 1000, 1800), [])
+        self.assertEqual(select_unload(skills, 1400, 1000, 1800), ['b'])
+        self.assertEqual(select_unload(skills, 1700, 1000, 1800),
+                         ['b', 'e'])
+        self.assertEqual(select_unload(skills, 9000, 1000, 1800),
+                         ['b', 'e', 'a'])
+
+    def test_select_unload_load_rss(self):
+        # the load RSS includes the size, they are not added up
+        skills = [{'folder': 'a', 'size': 500, 'load_rss': 800,
+                   'idle': 3600},
+                  {'folder': 'b', 'size': 400, 'load_rss': 100,
+                   'idle': 3600}]
+        self.assertEqual(select_unload(skills, 1800, 1000, 1800), ['a'])
+        self.assertEqual(select_unload(skills, 1900, 1000, 1800),
+                         ['a', 'b'])
+
+
+if __name__ == '__main__':
+    unittest.main()
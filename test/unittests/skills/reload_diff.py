@@ -0,0 +1,53 @@
+import unittest
+
+from mycroft.skills.reload_diff import diff_registrations, detach_message
+
+
+def vocab(start, end='TimeKeyword'):
+    return {'type': 'register_vocab',
+            'data': {'start': start, 'end': end, 'skill_id': 1,
+                     'skill_folder': 'skill_time'}}
+
+
+def intent(name, requires):
+    return {'type': 'register_intent',
+            'data': {'name': '1:' + name, 'requires': requires,
+                     'at_least_one': [], 'optional': [], 'skill_id': 1,
+                     'skill_folder': 'skill_time'}}
+
+
+class ReloadDiffTest(unittest.TestCase):
+    def test_unchanged(self):
+        registrations = [vocab('time'), intent('TimeIntent', [['Time']])]
+        self.assertEqual(diff_registrations(registrations,
+                                            list(registrations)), ([], []))
+
+    def test_diff(self):
+        old = [vocab('time'), vocab('hour'), intent('TimeIntent', [['T']]),
+               intent('DateIntent', [['D']])]
+        new = [vocab('time'), vocab('clock'), intent('TimeIntent', [['C']])]
+        added, removed = diff_registrations(old, new)
+        self.assertEqual(added, [vocab('clock'), intent('TimeIntent',
+                                                        [['C']])])
+        self.assertEqual(removed, [vocab('hour'), intent('DateIntent',
+                                                         [['D']])])
+
+    def test_padatious_always_sent(self):
+        registration = {'type': 'padatious:register_intent',
+                        'data': {'file_name': '/tmp/time.intent',
+                                 'intent_name': '1:time.intent'}}
+        added, _ = diff_registrations([registration], [registration])
+        self.assertEqual(added, [registration])
+
+    def test_detach_message(self):
+        message = detach_message(vocab('hour'))
+        self.assertEqual(message.type, 'detach_vocab')
+        self.assertEqual(message.data['start'], 'hour')
+        message = detach_message(intent('DateIntent', []))
+        self.assertEqual(message.type, 'detach_intent')
+        self.assertEqual(message.data, {'intent_name': '1:DateIntent',
+                                        'skill_folder': 'skill_time'})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import os
+import shutil
+import tempfile
+import unittest
+from os.path import join
+from re import error
+
+from mycroft.skills import resource_bundle
+from mycroft.skills.core import MycroftSkill
+from mycroft.skills.resource_bundle import ResourceCache
+
+
+class MockEmitter(object):
+    def __init__(self):
+        self.results = []
+
+    def emit(self, message):
+        self.results.append((message.type, message.data))
+
+    def on(self, event, f):
+        pass
+
+
+class ResourceBundleTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.skill_dir = join(self.tmp, 'skill_time')
+        self.cache = ResourceCache(join(self.tmp, 'cache'))
+        for folder in ['vocab', 'regex', 'dialog']:
+            os.makedirs(join(self.skill_dir, folder, 'en-us'))
+        self.write('vocab', 'Time.voc', 'time|hour\nclock\n')
+        self.write('regex', 'Location.rx', 'in (?P<Location>.*)\n')
+        self.write('dialog', 'time.dialog', 'it is {{time}}\nthe time is\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def write(self, folder, name, text):
+        with open(join(self.skill_dir, folder, 'en-us', name), 'w') as f:
+            f.write(text)
+
+    def test_bundle(self):
+        bundle = self.cache.load(self.skill_dir, 'en-us')
+        self.assertEqual(bundle['vocab'], [['time', 'Time', None],
+                                           ['hour', 'Time', 'time'],
+                                           ['clock', 'Time', None]])
+        self.assertEqual(bundle['regex'], ['in (?P<Location>.*)'])
+        self.assertEqual(bundle['dialog'],
+                         {'time': ['it is {{time}}', 'the time is']})
+
+    def test_cached(self):
+        self.cache.load(self.skill_dir, 'en-us')
+        build_bundle = resource_bundle.build_bundle
+        resource_bundle.build_bundle = None
+        try:
+            bundle = self.cache.load(self.skill_dir, 'en-us')
+        finally:
+            resource_bundle.build_bundle = build_bundle
+        self.assertEqual(bundle['regex'], ['in (?P<Location>.*)'])
+
+    def test_rebuilt_on_change(self):
+        self.cache.load(self.skill_dir, 'en-us')
+        self.write('vocab', 'Time.voc', 'time|hour|clock\n')
+        bundle = self.cache.load(self.skill_dir, 'en-us')
+        self.assertEqual(len(bundle['vocab']), 3)
+        self.assertEqual(bundle['vocab'][2], ['clock', 'Time', 'time'])
+
+    def test_invalid_regex(self):
+        self.write('regex', 'Broken.rx', '(?P<Broken>\n')
+        self.assertRaises(error, self.cache.load, self.skill_dir, 'en-us')
+        self.assertFalse(os.path.exists(
+            self.cache.get_path(self.skill_dir, 'en-us')))
+
+    def test_same_registrations(self):
+        def load(cache):
+            from mycroft.skills import core
+            default = core.resource_cache
+            core.resource_cache = cache
+            try:
+                skill = MycroftSkill()
+                skill.bind(MockEmitter())
+                skill.load_data_files(self.skill_dir)
+            finally:
+                core.resource_cache = default
+            return skill
+
+        direct = load(None)
+        cached = load(self.cache)
+        cached_again = load(self.cache)
+        for skill in [cached, cached_again]:
+            self.assertEqual(sorted(skill.emitter.results),
+                             sorted(direct.emitter.results))
+            self.assertEqual(skill.vocab_dir, direct.vocab_dir)
+            self.assertEqual(skill.dialog_renderer.templates,
+                             direct.dialog_renderer.templates)
+
+
+if __name__ == '__main__':
+    unittest.main()
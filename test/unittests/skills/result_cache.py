@@ -0,0 +1,99 @@
+import shutil
+import tempfile
+import time
+import unittest
+from os.path import join
+from threading import Thread, Event
+
+from mycroft.skills.result_cache import ResultCache, cached
+
+
+class ResultCacheTest(unittest.TestCase):
+    def test_ttl(self):
+        cache = ResultCache('test', ttl=60)
+        cache.set('a', 1)
+        cache.set('b', 2, ttl=-1)
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIsNone(cache.get('b'))
+        stats = cache.get_stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+        self.assertEqual(stats['hit_rate'], 0.5)
+
+    def test_lru(self):
+        cache = ResultCache('test', max_size=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+        self.assertEqual(list(cache.entries), ['a', 'c'])
+
+    def test_fetch_error_not_cached(self):
+        cache = ResultCache('test')
+
+        def fail():
+            raise IOError('offline')
+        self.assertRaises(IOError, cache.get_or_fetch, 'a', fail)
+        self.assertEqual(cache.get_or_fetch('a', lambda: 1), 1)
+        self.assertEqual(cache.get_or_fetch('a', lambda: 2), 1)
+
+    def test_coalescing(self):
+        cache = ResultCache('test')
+        release = Event()
+        fetches = []
+        results = []
+
+        def fetch():
+            fetches.append(1)
+            release.wait()
+            return 'page'
+
+        threads = [Thread(target=lambda: results.append(
+            cache.get_or_fetch('url', fetch))) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.1)
+        release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(fetches), 1)
+        self.assertEqual(results, ['page'] * 4)
+        self.assertEqual(cache.get_stats()['coalesced'], 3)
+
+    def test_persist(self):
+        directory = tempfile.mkdtemp()
+        try:
+            path = join(directory, 'cache.pickle')
+            cache = ResultCache('test', path=path)
+            cache.set('a', {'temp': 20})
+            cache.set('b', 2, ttl=-1)
+            cache.save()
+            cache = ResultCache('test', path=path)
+            self.assertEqual(cache.get('a'), {'temp': 20})
+            self.assertNotIn('b', cache.entries)
+        finally:
+            shutil.rmtree(directory)
+
+
+class CachedSkill(object):
+    def __init__(self):
+        self.cache = ResultCache('test')
+        self.calls = 0
+
+    @cached(ttl=60)
+    def weather(self, location, units='metric'):
+        self.calls += 1
+        return location + units
+
+
+class CachedDecoratorTest(unittest.TestCase):
+    def test_cached(self):
+        skill = CachedSkill()
+        self.assertEqual(skill.weather('Lisbon'), 'Lisbonmetric')
+        skill.weather('Lisbon')
+        skill.weather('Lisbon', units='imperial')
+        skill.weather('Porto')
+        self.assertEqual(skill.calls, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,12 @@
 from datetime import datetime, timedelta
+from threading import Event
+import shutil
+import tempfile
 import unittest
+from os.path import join
 
-from mycroft.skills.scheduled_skills import ScheduledSkill
+from mycroft.skills.event_scheduler import EventScheduler
+from mycroft.skills.scheduled_skills import ScheduledSkill, Timer
 from mycroft.util.log import getLogger
 
 __author__ = 'eward'
@@ -42,3 +47,85 @@ class ScheduledSkillTest(unittest.TestCase):
         self.assertEquals(self.skill.
                           get_formatted_time(float(date.strftime('%s'))),
                           date.strftime("%B %d, %Y at %H:%M"))
+
+
+class MockEmitter(object):
+    def __init__(self):
+        self.handlers = {}
+
+    def emit(self, message):
+        for handler in list(self.handlers.get(message.type, [])):
+            handler(message)
+
+    def on(self, event, f):
+        self.handlers.setdefault(event, []).append(f)
+
+    def remove(self, event, f):
+        self.handlers[event].remove(f)
+
+
+class NotifySkill(ScheduledSkill):
+    def __init__(self):
+        super(NotifySkill, self).__init__(name='NotifySkill')
+        self.notified = Event()
+        self.timestamps = []
+
+    def get_times(self):
+        return [self.get_utc_time() + 1]
+
+    def notify(self, timestamp):
+        self.timestamps.append(timestamp)
+        self.notified.set()
+
+
+class TimerSkill(NotifySkill):
+    """ Schedules with its own Timer, like skills written before """
+    def schedule(self):
+        self.cancel()
+        self.timer = Timer(0.05, self.notify, [0])
+        self.start()
+
+
+class ScheduleTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.emitter = MockEmitter()
+        self.scheduler = EventScheduler(self.emitter,
+                                        join(self.dir, 'schedule.json'))
+
+    def tearDown(self):
+        self.scheduler.stop()
+        shutil.rmtree(self.dir)
+
+    def create_skill(self, cls):
+        skill = cls()
+        skill.bind(self.emitter)
+        self.addCleanup(skill.executor.shutdown)
+        return skill
+
+    def test_schedule_event(self):
+        skill = self.create_skill(NotifySkill)
+        skill.schedule()
+        self.assertEqual(len(self.scheduler.get_events()), 1)
+        self.assertTrue(skill.notified.wait(3))
+        self.assertEqual(len(skill.timestamps), 1)
+
+    def test_cancel(self):
+        skill = self.create_skill(NotifySkill)
+        skill.schedule()
+        skill.cancel()
+        self.assertEqual(self.scheduler.get_events(), [])
+
+    def test_timer(self):
+        skill = self.create_skill(TimerSkill)
+        skill.schedule()
+        self.assertTrue(skill.notified.wait(1))
+
+        skill.schedule()
+        skill.cancel()
+        skill.timer.join(1)
+        self.assertEqual(skill.timestamps, [0])
+
+
+if __name__ == '__main__':
+    unittest.main()
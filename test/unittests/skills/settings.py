@@ -1,8 +1,9 @@
-from mycroft.skills.settings import SkillSettings
+from mycroft.skills.settings import SkillSettings, flush_pending
 
-from os.path import join, dirname, abspath
+from os.path import join, dirname, abspath, exists
 from os import remove
 import json
+import time
 import unittest
 
 
@@ -77,5 +78,84 @@ class SkillSettingsTest(unittest.TestCase):
         self.assertEqual(len(s), 1)
 
 
+class SkillSettingsStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.path = join(dirname(__file__), 'settings', 'settings.json')
+        try:
+            remove(self.path)
+        except OSError:
+            pass
+
+    def create_settings(self, debounce=0):
+        s = SkillSettings(join(dirname(__file__), 'settings'),
+                          debounce=debounce)
+        s.writes = 0
+        write = s._write
+
+        def counted_write():
+            s.writes += 1
+            write()
+        s._write = counted_write
+        return s
+
+    def stored(self):
+        with open(self.path) as f:
+            return json.load(f)
+
+    def test_unchanged_not_written(self):
+        s = self.create_settings()
+        s['a'] = 1
+        self.assertTrue(s.store())
+        self.assertFalse(s.store())
+        s['a'] = 1
+        self.assertFalse(s.store())
+        self.assertEqual(s.writes, 1)
+        self.assertFalse(exists(self.path + '.tmp'))
+
+    def test_new_key_written(self):
+        s = self.create_settings()
+        s['a'] = 1
+        self.assertTrue(s.store())
+        s['b'] = 'two'
+        self.assertTrue(s.store())
+        self.assertEqual(self.stored(), {'a': 1, 'b': 'two'})
+
+    def test_nested_change(self):
+        s = self.create_settings()
+        s['d'] = {'l': []}
+        s.store()
+        s['d']['l'].append(1)
+        self.assertFalse(s._is_stored)
+        self.assertTrue(s.store())
+        self.assertEqual(self.stored(), {'d': {'l': [1]}})
+
+    def test_delete(self):
+        s = self.create_settings()
+        s['a'] = 1
+        s['b'] = 2
+        s.store()
+        s.pop('a')
+        self.assertTrue(s.store())
+        self.assertEqual(self.stored(), {'b': 2})
+
+    def test_store_later(self):
+        s = self.create_settings(debounce=0.1)
+        for i in range(10):
+            s['i'] = i
+            s.store_later()
+        self.assertFalse(exists(self.path))
+        time.sleep(0.3)
+        self.assertEqual(s.writes, 1)
+        self.assertEqual(self.stored(), {'i': 9})
+
+    def test_flush_pending(self):
+        s = self.create_settings(debounce=60)
+        s['a'] = 1
+        s.store_later()
+        flush_pending()
+        self.assertEqual(self.stored(), {'a': 1})
+        self.assertIsNone(s._store_timer)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,112 @@
+import json
+import shutil
+import tempfile
+import time
+import unittest
+from os import makedirs
+from os.path import join
+
+from mycroft.skills.settings import SkillSettings
+from mycroft.skills.settings_sync import SettingsSync
+
+
+class Identity(object):
+    uuid = 'device-uuid'
+
+
+class LocalBackend(object):
+    """ Stands in for the DeviceApi skill settings endpoints """
+    def __init__(self):
+        self.identity = Identity()
+        self.skills = []
+        self.requests = []
+        self.failing = False
+
+    def request(self, params):
+        self.requests.append(params['method'])
+        if self.failing:
+            raise IOError('backend unreachable')
+        self.assertPath(params['path'])
+        if params['method'] == 'PUT':
+            self.skills.append(params['json'])
+            return {}
+        return json.loads(json.dumps(self.skills))
+
+    def assertPath(self, path):
+        assert path == '/device-uuid/skill', path
+
+    def set_value(self, identifier, name, value):
+        for skill in self.skills:
+            if skill['identifier'] == identifier:
+                for section in skill['skillMetadata']['sections']:
+                    for field in section['fields']:
+                        if field['name'] == name:
+                            field['value'] = value
+
+
+def settings_meta(identifier):
+    return {'identifier': identifier,
+            'skillMetadata': {'sections': [{'name': 'Options', 'fields': [
+                {'name': 'volume', 'type': 'number', 'value': 5}]}]}}
+
+
+class SettingsSyncTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.backend = LocalBackend()
+        self.sync = SettingsSync(self.backend, interval=60)
+
+    def tearDown(self):
+        self.sync.stop()
+        shutil.rmtree(self.tmp)
+
+    def create_settings(self, identifier):
+        directory = join(self.tmp, identifier)
+        makedirs(directory)
+        with open(join(directory, 'settingsmeta.json'), 'w') as f:
+            json.dump(settings_meta(identifier), f)
+        return SkillSettings(directory, sync=self.sync)
+
+    def test_one_fetch_for_all_skills(self):
+        skills = [self.create_settings('skill_' + str(i)) for i in range(3)]
+        self.assertEqual(self.backend.requests, ['GET', 'PUT', 'PUT', 'PUT'])
+        self.assertEqual(len(self.sync.skills), 3)
+
+        self.backend.requests = []
+        self.backend.set_value('skill_1', 'volume', 8)
+        self.assertTrue(self.sync.sync())
+        self.assertEqual(self.backend.requests, ['GET'])
+        self.assertEqual([s.get('volume') for s in skills], [5, 8, 5])
+        with open(join(self.tmp, 'skill_1', 'settings.json')) as f:
+            self.assertEqual(json.load(f), {'volume': 8})
+
+    def test_stop_sync(self):
+        settings = self.create_settings('skill_a')
+        settings.stop_sync()
+        self.backend.set_value('skill_a', 'volume', 8)
+        self.sync.sync()
+        self.assertNotIn('volume', settings)
+
+    def test_backend_unreachable(self):
+        self.backend.failing = True
+        settings = self.create_settings('skill_a')
+        # the skill is not created again while the backend is down
+        self.assertEqual(self.backend.requests, ['GET'])
+        self.assertIsNone(settings.settings)
+        self.assertFalse(self.sync.sync())
+
+    def test_backoff(self):
+        self.sync = SettingsSync(self.backend, interval=0.02, max_backoff=0.1)
+        self.create_settings('skill_a')
+        self.backend.failing = True
+        self.backend.requests = []
+        time.sleep(0.5)
+        self.assertEqual(self.sync.delay, 0.1)
+        self.assertLess(len(self.backend.requests), 10)
+        self.backend.failing = False
+        time.sleep(0.2)
+        self.assertEqual(self.sync.delay, 0.02)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import os
+import shutil
+import tempfile
+import unittest
+from os.path import join
+
+from mycroft.skills.skill_cache import SkillCache, skill_fingerprint
+
+
+class SkillFingerprintTest(unittest.TestCase):
+    def setUp(self):
+        self.skills_dir = tempfile.mkdtemp()
+        self.skill_dir = join(self.skills_dir, 'skill_time')
+        os.makedirs(join(self.skill_dir, 'vocab', 'en-us'))
+        with open(join(self.skill_dir, '__init__.py'), 'w') as f:
+            f.write('# time skill\n')
+        self.fingerprint = skill_fingerprint(self.skill_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.skills_dir)
+
+    def write(self, *path):
+        with open(join(self.skill_dir, *path), 'w') as f:
+            f.write('time\n')
+
+    def test_fingerprint(self):
+        self.assertEqual(self.fingerprint, skill_fingerprint(self.skill_dir))
+        self.write('vocab', 'en-us', 'Time.voc')
+        self.assertNotEqual(self.fingerprint,
+                            skill_fingerprint(self.skill_dir))
+        self.assertIsNone(skill_fingerprint(join(self.skills_dir, 'none')))
+
+    def test_other_modules(self):
+        os.makedirs(join(self.skill_dir, 'util'))
+        self.write('util', 'clock.py')
+        self.assertNotEqual(self.fingerprint,
+                            skill_fingerprint(self.skill_dir))
+
+    def test_other_files_ignored(self):
+        os.makedirs(join(self.skill_dir, 'dialog', 'en-us'))
+        self.write('dialog', 'en-us', 'time.dialog')
+        self.write('README.md')
+        self.assertEqual(self.fingerprint, skill_fingerprint(self.skill_dir))
+
+
+class SkillCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.skills_dir = tempfile.mkdtemp()
+        os.makedirs(join(self.skills_dir, 'skill_a'))
+        os.makedirs(join(self.skills_dir, 'skill_b'))
+        self.path = join(self.skills_dir, 'cache', 'cache.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.skills_dir)
+
+    def test_valid_skills(self):
+        cache = SkillCache(self.path)
+        for folder in ['skill_a', 'skill_b']:
+            cache.skills[folder] = {'fingerprint': skill_fingerprint(
+                join(self.skills_dir, folder))}
+        cache.save()
+        with open(join(self.skills_dir, 'skill_b', '__init__.py'), 'w'):
+            pass
+
+        loaded = SkillCache(self.path)
+        self.assertEqual(sorted(loaded.load()), ['skill_a', 'skill_b'])
+        self.assertEqual(list(loaded.valid_skills(self.skills_dir)),
+                         ['skill_a'])
+        self.assertEqual(loaded.valid_skills(self.skills_dir, ['skill_a']),
+                         {})
+
+    def test_broken_file(self):
+        os.makedirs(join(self.skills_dir, 'cache'))
+        with open(self.path, 'w') as f:
+            f.write('{')
+        self.assertEqual(SkillCache(self.path).load(), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+
+from mycroft.messagebus.message import Message
+from mycroft.skills.skill_control import SkillControl
+
+
+class MockEmitter(object):
+    def __init__(self):
+        self.events = []
+
+    def on(self, event, f):
+        self.events.append(event)
+
+
+class MockSkill(object):
+    def __init__(self, skill_id):
+        self.skill_id = skill_id
+        self.calls = []
+
+    def enable_intent(self, name):
+        self.calls.append(('enable', name))
+
+    def disable_intent(self, name):
+        self.calls.append(('disable', name))
+
+
+class SkillControlTest(unittest.TestCase):
+    def setUp(self):
+        self.control = SkillControl()
+        self.time = MockSkill(1)
+        self.date = MockSkill(2)
+        self.control.add_intent(self.time, 'TimeIntent')
+        self.control.add_intent(self.time, 'StopIntent')
+        self.control.add_intent(self.date, 'StopIntent')
+
+    def test_bind_once(self):
+        emitter = MockEmitter()
+        self.control.bind(emitter)
+        self.control.bind(MockEmitter())
+        self.assertEqual(emitter.events, ['enable_intent', 'disable_intent'])
+        self.assertIs(self.control.emitter, emitter)
+
+    def test_by_intent_name(self):
+        self.control.handle_disable_intent(
+            Message('disable_intent', {'intent_name': 'TimeIntent'}))
+        self.assertEqual(self.time.calls, [('disable', 'TimeIntent')])
+        self.assertEqual(self.date.calls, [])
+
+    def test_shared_intent_name(self):
+        self.control.handle_enable_intent(
+            Message('enable_intent', {'intent_name': 'StopIntent'}))
+        self.assertEqual(self.time.calls, [('enable', 'StopIntent')])
+        self.assertEqual(self.date.calls, [('enable', 'StopIntent')])
+
+    def test_by_skill_id(self):
+        self.control.handle_enable_intent(Message(
+            'enable_intent', {'intent_name': 'StopIntent', 'skill_id': 2}))
+        self.control.handle_disable_intent(
+            Message('disable_intent', {'intent_name': '2:StopIntent'}))
+        self.assertEqual(self.time.calls, [])
+        self.assertEqual(self.date.calls, [('enable', 'StopIntent'),
+                                           ('disable', 'StopIntent')])
+
+    def test_remove(self):
+        self.control.remove(self.date)
+        self.control.handle_enable_intent(
+            Message('enable_intent', {'intent_name': 'StopIntent'}))
+        self.control.handle_enable_intent(Message(
+            'enable_intent', {'intent_name': 'StopIntent', 'skill_id': 2}))
+        self.assertEqual(self.date.calls, [])
+        self.assertEqual(self.time.calls, [('enable', 'StopIntent')])
+
+
+if __name__ == '__main__':
+    unittest.main()
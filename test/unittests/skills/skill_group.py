@@ -0,0 +1,174 @@
+import sys
+import tempfile
+import time
+import unittest
+from os.path import join
+
+from mycroft.messagebus.message import Message
+from mycroft.skills import skill_group
+from mycroft.skills.core import FallbackSkill
+from mycroft.skills.skill_group import assign_groups, SkillGroup, \
+    SkillGroupProcess, SkillGroupSupervisor
+
+
+class MockEmitter(object):
+    def __init__(self):
+        self.messages = []
+
+    def emit(self, message):
+        self.messages.append(message)
+
+    def on(self, event, f):
+        pass
+
+
+class MockSkill(object):
+    name = 'MockSkill'
+    external_reload = True
+    external_shutdown = True
+
+    def __init__(self):
+        self.stopped = False
+
+    def handle_update_message_context(self, message):
+        pass
+
+    def converse(self, utterances, lang):
+        return utterances == ['yes']
+
+    def shutdown(self):
+        self.stopped = True
+
+
+class MockFallbackSkill(FallbackSkill):
+    def __init__(self):
+        self.stopped = False
+
+    def shutdown(self):
+        self.stopped = True
+
+
+class AssignGroupsTest(unittest.TestCase):
+    def test_balanced_by_cost(self):
+        costs = {'a': 10, 'b': 6, 'c': 5, 'd': 1}
+        self.assertEqual(assign_groups(['a', 'b', 'c', 'd'], 2, costs=costs),
+                         [['a', 'd'], ['b', 'c']])
+
+    def test_pinned(self):
+        groups = assign_groups(['a', 'b', 'c'], 2, groups=[[], ['a', 'x']])
+        self.assertEqual(groups, [['b', 'c'], ['a']])
+
+    def test_unknown_cost(self):
+        groups = assign_groups(['a', 'b', 'c'], 3, costs={'a': 2})
+        self.assertEqual(sorted(len(g) for g in groups), [1, 1, 1])
+
+
+class SkillGroupTest(unittest.TestCase):
+    def setUp(self):
+        self.group = SkillGroup(['--group', '1', '--dir', '/tmp/skills',
+                                 '3:skill_a', '5:skill_b'])
+        self.group.ws = MockEmitter()
+        self.skill = MockSkill()
+        self.group.skills[3]['instance'] = self.skill
+
+    def converse(self, skill_id, utterances):
+        self.group.handle_conversation_request(Message(
+            'skill.converse.request',
+            {'skill_id': skill_id, 'utterances': utterances,
+             'lang': 'en-us', 'request_id': 'r'}))
+
+    def test_converse_owned_skills(self):
+        self.converse(3, ['yes'])
+        self.converse(4, ['yes'])
+        self.assertEqual(len(self.group.ws.messages), 1)
+        self.assertEqual(self.group.ws.messages[0].data,
+                         {'skill_id': 3, 'result': True, 'request_id': 'r'})
+
+    def test_shutdown(self):
+        self.group.handle_shutdown_request(
+            Message('shutdown_skill_request', {'skill_id': 3}))
+        self.assertTrue(self.skill.stopped)
+        self.assertIsNone(self.group.skills[3]['instance'])
+        types = [m.type for m in self.group.ws.messages]
+        self.assertEqual(types, ['shutdown_skill_response',
+                                 'skills.group.status'])
+        status = self.group.ws.messages[1].data
+        self.assertEqual(status['group'], 1)
+        self.assertEqual(sorted(s['id'] for s in status['skills']), [3, 5])
+
+    def test_fallback_refused(self):
+        fallback = MockFallbackSkill()
+        skills = {3: fallback, 5: MockSkill()}
+        defaults = skill_group.load_skill, skill_group.create_skill_descriptor
+        skill_group.load_skill = lambda descriptor, ws, skill_id: \
+            skills[skill_id]
+        skill_group.create_skill_descriptor = lambda path: path
+        try:
+            self.group.load_skills()
+        finally:
+            skill_group.load_skill, skill_group.create_skill_descriptor = \
+                defaults
+        self.assertTrue(fallback.stopped)
+        self.assertEqual(self.group.skills.keys(), [5])
+        refused = self.group.ws.messages[0]
+        self.assertEqual(refused.type, 'skills.group.refused')
+        self.assertEqual(refused.data, {'group': 1, 'skill': 3,
+                                        'skill_folder': 'skill_a'})
+        status = self.group.ws.messages[-1].data
+        self.assertEqual([s['id'] for s in status['skills']], [5])
+
+
+class CrashingProcess(SkillGroupProcess):
+    starts = 0
+
+    def start(self):
+        CrashingProcess.starts += 1
+        self.process = skill_group.subprocess.Popen(
+            [sys.executable, '-c', 'import sys; sys.exit(3)'])
+        self.started = time.time()
+
+
+class SkillGroupSupervisorTest(unittest.TestCase):
+    def test_restart(self):
+        default = skill_group.SkillGroupProcess
+        skill_group.SkillGroupProcess = CrashingProcess
+        emitter = MockEmitter()
+        costs = join(tempfile.mkdtemp(), 'costs.json')
+        supervisor = SkillGroupSupervisor(
+            emitter, '/tmp/skills', {'restart_delay': 0.1, 'costs': costs})
+        try:
+            supervisor.start({'skill_a': 3})
+            time.sleep(1.5)
+        finally:
+            supervisor.stop()
+            skill_group.SkillGroupProcess = default
+        self.assertGreater(CrashingProcess.starts, 1)
+        restarted = [m for m in emitter.messages
+                     if m.type == 'skills.group.restarted']
+        self.assertEqual(restarted[0].data, {'group': 0, 'exit_code': 3})
+
+    def test_status(self):
+        costs = join(tempfile.mkdtemp(), 'costs.json')
+        supervisor = SkillGroupSupervisor(MockEmitter(), '/tmp/skills',
+                                          {'costs': costs})
+        supervisor.handle_status(Message('skills.group.status', {
+            'group': 0, 'skills': [{'folder': 'skill_a', 'id': 3,
+                                    'name': 'A', 'loaded': True,
+                                    'cpu': 1.5}]}))
+        self.assertEqual([s['name'] for s in supervisor.get_skills()], ['A'])
+        self.assertEqual(supervisor.load_costs(), {'skill_a': 1.5})
+
+    def test_refused_not_restarted(self):
+        costs = join(tempfile.mkdtemp(), 'costs.json')
+        supervisor = SkillGroupSupervisor(MockEmitter(), '/tmp/skills',
+                                          {'costs': costs})
+        group = SkillGroupProcess(0, [(3, 'skill_a'), (5, 'skill_b')],
+                                  '/tmp/skills')
+        supervisor.groups.append(group)
+        supervisor.handle_refused(Message('skills.group.refused', {
+            'group': 0, 'skill': 3, 'skill_folder': 'skill_a'}))
+        self.assertEqual(group.skills, [(5, 'skill_b')])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import shutil
+import tempfile
+import time
+import unittest
+from os.path import join
+from threading import Lock
+
+from mycroft.skills.skill_loader import SkillLoader, read_load_after
+
+
+class SkillLoaderTest(unittest.TestCase):
+    def setUp(self):
+        self.lock = Lock()
+        self.started = []
+        self.finished = []
+        self.running = 0
+        self.max_running = 0
+
+    def load(self, folder):
+        with self.lock:
+            self.started.append(folder)
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        time.sleep(0.05)
+        with self.lock:
+            self.running -= 1
+            self.finished.append(folder)
+
+    def test_concurrent(self):
+        SkillLoader(self.load, 4).load_all(['a', 'b', 'c', 'd'])
+        self.assertEqual(sorted(self.finished), ['a', 'b', 'c', 'd'])
+        self.assertEqual(self.max_running, 4)
+
+    def test_load_after(self):
+        dependencies = {'a': ['b'], 'b': ['c'], 'd': ['missing']}
+        SkillLoader(self.load, 4).load_all(['a', 'b', 'c', 'd'],
+                                           dependencies)
+        self.assertEqual(sorted(self.finished), ['a', 'b', 'c', 'd'])
+        self.assertLess(self.finished.index('c'), self.started.index('b'))
+        self.assertLess(self.finished.index('b'), self.started.index('a'))
+
+    def test_circular_dependency(self):
+        dependencies = {'a': ['b'], 'b': ['a']}
+        SkillLoader(self.load, 4).load_all(['a', 'b', 'c'], dependencies)
+        self.assertEqual(sorted(self.finished), ['a', 'b', 'c'])
+
+    def test_failed_load(self):
+        def load(folder):
+            self.load(folder)
+            if folder == 'a':
+                raise ValueError(folder)
+        SkillLoader(load, 2).load_all(['a', 'b'], {'b': ['a']})
+        self.assertEqual(self.finished, ['a', 'b'])
+
+    def test_read_load_after(self):
+        skill_dir = tempfile.mkdtemp()
+        try:
+            self.assertEqual(read_load_after(skill_dir), [])
+            with open(join(skill_dir, 'load_after.txt'), 'w') as f:
+                f.write('# needs the objectives service\n'
+                        'service_objectives\n\nLILACS_core\n')
+            self.assertEqual(read_load_after(skill_dir),
+                             ['service_objectives', 'LILACS_core'])
+        finally:
+            shutil.rmtree(skill_dir)
+
+
+if __name__ == '__main__':
+    unittest.main()
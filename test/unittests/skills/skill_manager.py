@@ -0,0 +1,193 @@
+import json
+import shutil
+import tempfile
+import time
+import unittest
+from os import makedirs
+from threading import Lock
+from os.path import join, exists
+
+from mycroft.skills import skill_manager
+from mycroft.skills.skill_manager import SkillManager, SkillsIndex, \
+    parse_gitmodules, repo_folder, git, UPDATED, UNCHANGED, MODIFIED, \
+    FAILED
+
+GITMODULES = """[submodule "skill-alpha"]
+    path = skill-alpha
+    url = https://github.com/MycroftAI/skill-alpha.git
+[submodule "skill-alpha-beta"]
+    path = skill-alpha-beta
+    url = https://github.com/MycroftAI/skill-alpha-beta.git
+"""
+
+
+def commit(path, name, content):
+    with open(join(path, name), "w") as f:
+        f.write(content)
+    git(["add", name], path)
+    git(["-c", "user.name=test", "-c", "user.email=test@test",
+         "commit", "-q", "-m", name], path)
+
+
+class GitmodulesTest(unittest.TestCase):
+    def test_parse(self):
+        self.assertEqual(parse_gitmodules(GITMODULES), {
+            "skill-alpha": "https://github.com/MycroftAI/skill-alpha.git",
+            "skill-alpha-beta":
+                "https://github.com/MycroftAI/skill-alpha-beta.git"})
+
+    def test_repo_folder(self):
+        self.assertEqual(repo_folder("https://x/skill-a.git"), "skill-a")
+        self.assertEqual(repo_folder("/tmp/skill-b/"), "skill-b")
+
+
+class SkillsIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = join(self.dir, "index.json")
+        self.fetches = []
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def fetch(self, url):
+        self.fetches.append(url)
+        return GITMODULES
+
+    def test_cached(self):
+        index = SkillsIndex("url", self.path, 60, self.fetch)
+        self.assertEqual(index.search("alpha"), ["skill-alpha"])
+        self.assertEqual(index.search("Beta"), ["skill-alpha-beta"])
+        self.assertEqual(index.search("skill"),
+                         ["skill-alpha", "skill-alpha-beta"])
+        # a new index reads the cache file instead of fetching
+        SkillsIndex("url", self.path, 60, self.fetch).get()
+        self.assertEqual(self.fetches, ["url"])
+
+    def test_expired(self):
+        with open(self.path, "w") as f:
+            json.dump({"url": "url", "time": time.time() - 120,
+                       "skills": {}}, f)
+        index = SkillsIndex("url", self.path, 60, self.fetch)
+        self.assertEqual(len(index.get()), 2)
+        self.assertEqual(self.fetches, ["url"])
+
+    def test_outdated_on_error(self):
+        def fail(url):
+            raise IOError("offline")
+        with open(self.path, "w") as f:
+            json.dump({"url": "url", "time": 0, "skills": {"a": "b"}}, f)
+        self.assertEqual(SkillsIndex("url", self.path, 60, fail).get(),
+                         {"a": "b"})
+
+
+class SkillManagerTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.skills_dir = join(self.dir, "skills")
+        self.work_dir = join(self.dir, "work")
+        makedirs(self.skills_dir)
+        makedirs(self.work_dir)
+        self.remotes = {}
+        for name in ["skill-a", "skill-b", "skill-c"]:
+            self.remotes[name] = self.create_remote(name)
+        self.manager = SkillManager(self.skills_dir, workers=2)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def create_remote(self, name):
+        """ Bare repo of a skill, with a clone to push changes from """
+        bare = join(self.dir, "remotes", name + ".git")
+        git(["init", "-q", "--bare", bare])
+        git(["symbolic-ref", "HEAD", "refs/heads/master"], bare)
+        work = join(self.work_dir, name)
+        git(["clone", "-q", bare, work])
+        git(["checkout", "-q", "-b", "master"], work)
+        commit(work, "__init__.py", "# " + name)
+        git(["push", "-q", "origin", "master"], work)
+        return bare
+
+    def push(self, name, content):
+        work = join(self.work_dir, name)
+        commit(work, "__init__.py", content)
+        git(["push", "-q", "origin", "master"], work)
+
+    def test_install_and_update(self):
+        summary = self.manager.update_all(
+            [self.remotes["skill-a"], self.remotes["skill-b"]])
+        self.assertEqual(summary["installed"], ["skill-a", "skill-b"])
+        self.assertEqual(summary[UPDATED], [])
+        self.assertTrue(exists(join(self.skills_dir, "skill-a",
+                                    "__init__.py")))
+
+        self.push("skill-b", "# new")
+        summary = self.manager.update_all(
+            [self.remotes["skill-a"], self.remotes["skill-b"]])
+        self.assertEqual(summary["installed"], [])
+        self.assertEqual(summary[UPDATED], ["skill-b"])
+        self.assertEqual(summary[UNCHANGED], ["skill-a"])
+        with open(join(self.skills_dir, "skill-b", "__init__.py")) as f:
+            self.assertEqual(f.read(), "# new")
+
+    def test_requirements_installed_one_at_a_time(self):
+        for name in ["skill-a", "skill-b", "skill-c"]:
+            work = join(self.work_dir, name)
+            commit(work, "requirements.txt", "six\n")
+            git(["push", "-q", "origin", "master"], work)
+        lock = Lock()
+        running = []
+        max_running = []
+
+        def check_call(args):
+            with lock:
+                running.append(args)
+                max_running.append(len(running))
+            time.sleep(0.05)
+            with lock:
+                running.remove(args)
+        original = skill_manager.subprocess.check_call
+        skill_manager.subprocess.check_call = check_call
+        try:
+            summary = SkillManager(self.skills_dir, workers=3).update_all(
+                self.remotes.values())
+        finally:
+            skill_manager.subprocess.check_call = original
+        self.assertEqual(len(summary["installed"]), 3)
+        self.assertEqual(max(max_running), 1)
+
+    def test_unchanged_not_fetched(self):
+        self.manager.install(self.remotes["skill-a"])
+        path = join(self.skills_dir, "skill-a")
+        fetch_head = join(path, ".git", "FETCH_HEAD")
+        self.assertEqual(self.manager.update_skill("skill-a"), UNCHANGED)
+        self.assertFalse(exists(fetch_head))
+
+    def test_local_changes_kept(self):
+        self.manager.install(self.remotes["skill-a"])
+        path = join(self.skills_dir, "skill-a", "__init__.py")
+        with open(path, "w") as f:
+            f.write("# mine")
+        self.push("skill-a", "# new")
+        self.assertEqual(self.manager.update_skill("skill-a"), MODIFIED)
+        with open(path) as f:
+            self.assertEqual(f.read(), "# mine")
+
+    def test_failed(self):
+        self.manager.install(self.remotes["skill-c"])
+        shutil.rmtree(self.remotes["skill-c"])
+        summary = self.manager.update_all(["/nonexistent/skill-d.git"])
+        self.assertEqual(sorted(summary[FAILED]), ["skill-c", "skill-d"])
+
+    def test_resolve(self):
+        index = SkillsIndex("url", fetch=lambda url: GITMODULES)
+        manager = SkillManager(self.skills_dir, index)
+        self.assertEqual(manager.resolve("alpha"),
+                         "https://github.com/MycroftAI/skill-alpha.git")
+        self.assertEqual(manager.resolve("/tmp/x.git"), "/tmp/x.git")
+        self.assertRaises(ValueError, manager.resolve, "skill")
+        self.assertRaises(ValueError, manager.resolve, "gamma")
+
+
+if __name__ == '__main__':
+    unittest.main()
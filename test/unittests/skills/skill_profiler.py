@@ -0,0 +1,69 @@
+import shutil
+import tempfile
+import time
+import unittest
+from os.path import join
+
+from mycroft.skills.executor import SkillExecutor
+from mycroft.skills.skill_profiler import SkillProfiler
+
+
+def busy_handler(seconds, queue_time):
+    end = time.time() + seconds
+    while time.time() < end:
+        pass
+
+
+class MockSkill(object):
+    def __init__(self):
+        self.name = 'BusySkill'
+        self.executor = SkillExecutor(self.name, max_workers=2, timeout=0)
+
+
+class SkillProfilerTest(unittest.TestCase):
+    def setUp(self):
+        self.skill = MockSkill()
+        self.stopped = []
+
+    def tearDown(self):
+        self.skill.executor.shutdown()
+
+    def test_idle_not_counted(self):
+        # starts an idle worker thread
+        self.skill.executor.submit('noop', lambda queue_time: None)
+        time.sleep(0.05)
+        profiler = SkillProfiler(self.skill, 0.005, 0)
+        profiler.start()
+        time.sleep(0.1)
+        profiler.stop()
+        self.assertGreater(profiler.samples, 0)
+        self.assertEqual(profiler.report()['busy'], 0)
+
+    def test_profile(self):
+        profiler = SkillProfiler(self.skill, 0.005, 0.3,
+                                 self.stopped.append)
+        profiler.start()
+        self.skill.executor.submit('busy', busy_handler, 0.2)
+        profiler.finished.wait(2)
+        profiler.thread.join()
+        self.assertEqual(self.stopped, [profiler])
+        report = profiler.report()
+        self.assertGreater(report['busy'], 5)
+        leaf = report['functions'][0]
+        self.assertEqual(leaf['function'], 'skill_profiler.py:busy_handler')
+        self.assertEqual(leaf['total'], report['busy'])
+
+        directory = tempfile.mkdtemp()
+        try:
+            path = profiler.save(join(directory, 'profiles', 'busy.folded'))
+            with open(path) as f:
+                lines = f.read().splitlines()
+            self.assertTrue(all(l.startswith('BusySkill;') for l in lines))
+            self.assertEqual(sum(int(l.rsplit(' ', 1)[1]) for l in lines),
+                             report['busy'])
+        finally:
+            shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from os.path import join
+
+from mycroft.skills.skill_watcher import PollingWatcher, InotifyWatcher, \
+    create_watcher
+
+try:
+    import pyinotify
+except ImportError:
+    pyinotify = None
+
+
+class SkillWatcherTest(unittest.TestCase):
+    def setUp(self):
+        self.skills_dir = tempfile.mkdtemp()
+        self.skill_dir = join(self.skills_dir, 'skill_chat')
+        os.makedirs(join(self.skill_dir, 'aiml'))
+        self.write(join(self.skill_dir, '__init__.py'), 1000)
+        self.write(join(self.skill_dir, 'aiml', 'brain.aiml'), 3000)
+        self.write(join(self.skill_dir, 'settings.json'), 4000)
+        self.write(join(self.skill_dir, '__init__.pyc'), 5000)
+
+    def tearDown(self):
+        shutil.rmtree(self.skills_dir)
+
+    def write(self, path, mtime=None):
+        with open(path, 'w') as f:
+            f.write('data\n')
+        if mtime:
+            os.utime(path, (mtime, mtime))
+
+    def test_is_ignored(self):
+        watcher = PollingWatcher(self.skills_dir, ['skill_chat/aiml'])
+        self.assertTrue(watcher.is_ignored('skill_chat/aiml'))
+        self.assertTrue(watcher.is_ignored(join(self.skill_dir, 'aiml')))
+        self.assertTrue(watcher.is_ignored('skill_chat/.git'))
+        self.assertTrue(watcher.is_ignored('skill_chat/settings.json'))
+        self.assertFalse(watcher.is_ignored('skill_chat/__init__.py'))
+        self.assertFalse(watcher.is_ignored('skill_chat/vocab'))
+
+    def test_polling_skips_ignored(self):
+        watcher = PollingWatcher(self.skills_dir)
+        self.assertEqual(watcher.get_last_modified('skill_chat'), 3000)
+        watcher = PollingWatcher(self.skills_dir, ['skill_chat/aiml'])
+        self.assertEqual(watcher.get_last_modified('skill_chat'), 1000)
+        self.assertEqual(watcher.get_last_modified('missing'), 0)
+
+    def test_create_polling(self):
+        watcher = create_watcher(self.skills_dir, {'inotify': False})
+        self.assertIsInstance(watcher, PollingWatcher)
+        self.assertNotIsInstance(watcher, InotifyWatcher)
+
+    @unittest.skipIf(pyinotify is None, 'pyinotify not installed')
+    def test_inotify(self):
+        watcher = create_watcher(self.skills_dir,
+                                 {'ignore': ['skill_chat/aiml']})
+        try:
+            self.assertIsInstance(watcher, InotifyWatcher)
+            self.assertEqual(watcher.get_last_modified('skill_chat'), 0)
+
+            self.write(join(self.skill_dir, 'aiml', 'brain.aiml'))
+            self.write(join(self.skill_dir, 'settings.json'))
+            watcher.wait(0.5)
+            self.assertEqual(watcher.get_last_modified('skill_chat'), 0)
+
+            start = time.time()
+            self.write(join(self.skill_dir, '__init__.py'))
+            watcher.wait(5)
+            self.assertGreaterEqual(watcher.get_last_modified('skill_chat'),
+                                    start)
+        finally:
+            watcher.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
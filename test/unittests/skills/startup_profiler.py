@@ -0,0 +1,94 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from os.path import join
+
+from mycroft.skills import core
+from mycroft.skills.core import load_skill, create_skill_descriptor
+from mycroft.skills.startup_profiler import StartupProfiler, format_report
+
+SKILL = """
+import time
+from adapt.intent import IntentBuilder
+from mycroft.skills.core import MycroftSkill
+
+
+class ProfiledSkill(MycroftSkill):
+    def initialize(self):
+        time.sleep(0.05)
+        self.register_intent(IntentBuilder('TimeIntent').require('Time'),
+                             self.handle_time)
+
+    def handle_time(self, message):
+        pass
+
+
+def create_skill():
+    return ProfiledSkill()
+"""
+
+
+class MockEmitter(object):
+    def __init__(self):
+        self.types = []
+
+    def emit(self, message):
+        self.types.append(message.type)
+
+    def on(self, event, f):
+        pass
+
+
+class StartupProfilerTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        skill_dir = join(self.tmp, 'skill_profiled')
+        os.makedirs(join(skill_dir, 'vocab', 'en-us'))
+        with open(join(skill_dir, '__init__.py'), 'w') as f:
+            f.write(SKILL)
+        with open(join(skill_dir, 'vocab', 'en-us', 'Time.voc'), 'w') as f:
+            f.write('time\nhour\n')
+        self.descriptor = create_skill_descriptor(skill_dir)
+        self.profiler = StartupProfiler(join(self.tmp, 'profile.json'))
+        self.default = core.startup_profiler
+        core.startup_profiler = self.profiler
+
+    def tearDown(self):
+        core.startup_profiler = self.default
+        shutil.rmtree(self.tmp)
+
+    def test_profile(self):
+        emitter = MockEmitter()
+        skill = load_skill(self.descriptor, emitter, 7)
+        self.assertIsNotNone(skill)
+        report = self.profiler.stop()
+        self.assertEqual(len(report['skills']), 1)
+        profile = report['skills'][0]
+        self.assertEqual(profile['skill_id'], 7)
+        self.assertTrue(profile['loaded'])
+        self.assertEqual(profile['registrations'],
+                         emitter.types.count('register_vocab') +
+                         emitter.types.count('register_intent'))
+        self.assertEqual(profile['registrations'], 3)
+        self.assertGreater(profile['initialize'], 0.04)
+        self.assertGreaterEqual(profile['total'], profile['import'] +
+                                profile['load_data'] + profile['initialize'])
+
+        with open(join(self.tmp, 'profile.json')) as f:
+            self.assertEqual(json.load(f)['skills'][0]['skill_id'], 7)
+        with open(join(self.tmp, 'profile.folded')) as f:
+            self.assertIn('skills;skill_profiled;initialize ', f.read())
+        self.assertIn('skill_profiled', format_report(report))
+
+    def test_stopped(self):
+        self.profiler.stop()
+        emitter = MockEmitter()
+        skill = load_skill(self.descriptor, emitter, 7)
+        self.assertIs(skill.emitter, emitter)
+        self.assertEqual(self.profiler.report()['skills'], [])
+
+
+if __name__ == '__main__':
+    unittest.main()